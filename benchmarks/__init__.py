@@ -0,0 +1 @@
+"""Offline benchmarks for the scraper (run with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,98 @@
+"""
+Price, rating and review-count normalization: per record against batches.
+
+Builds ``--records`` products with raw text in every corpus locale (two
+offers each) and times three ways of filling their numeric fields:
+``normalize_product`` one record at a time, ``normalize_products`` over
+chunks of ``--batch-size`` with NumPy, and the same batches with NumPy
+disabled (the pure-Python fallback).
+
+    python -m benchmarks.bench_normalize --records 100000 --batch-size 128
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from benchmarks.corpus import LOCALES, _number, _price  # noqa: E402
+from extractors import normalize  # noqa: E402
+from extractors.records import Offer, Product  # noqa: E402
+
+MODES = ("per_record", "batch", "batch_python")
+
+def build_products(count: int, seed: int = 0) -> List[Product]:
+    """``count`` products with only the raw price, rating and review text set."""
+    rng = random.Random(seed)
+    locales = list(LOCALES.values())
+    products = []
+    for i in range(count):
+        conventions = locales[i % len(locales)]
+        stars = f"{rng.randint(10, 50) / 10:.1f}".replace(".", conventions.decimal)
+        offers = [
+            Offer(price_raw=_price(conventions, rng.randint(5, 500), rng.randint(0, 99)), seller="Shop")
+            for _ in range(2)
+        ]
+        products.append(
+            Product(
+                asin=f"B{i:09d}",
+                price_raw=_price(conventions, rng.randint(5, 500), rng.randint(0, 99)),
+                stars_raw=conventions.stars.format(stars=stars),
+                reviews_raw=conventions.reviews.format(reviews=_number(conventions, rng.randint(1, 99999))),
+                offers=offers,
+            )
+        )
+    return products
+
+def measure(mode: str, products: List[Product], batch_size: int) -> Dict[str, Any]:
+    """Normalize ``products`` in ``mode`` and report records per second."""
+    start = time.perf_counter()
+    if mode == "per_record":
+        for product in products:
+            normalize.normalize_product(product)
+    else:
+        numpy = None if mode == "batch_python" else normalize._numpy()
+        with mock.patch.object(normalize, "_numpy", lambda: numpy):
+            for offset in range(0, len(products), batch_size):
+                normalize.normalize_products(products[offset:offset + batch_size])
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "records": len(products),
+        "seconds": round(seconds, 3),
+        "records_per_second": round(len(products) / seconds) if seconds else None,
+    }
+
+def run(count: int, batch_size: int) -> List[Dict[str, Any]]:
+    products = build_products(count)
+    results = []
+    for mode in MODES:
+        if mode == "batch" and normalize._numpy() is None:
+            continue
+        results.append(measure(mode, products, batch_size))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=128)
+    args = parser.parse_args(argv)
+
+    results = run(args.records, args.batch_size)
+    baseline = results[0]["seconds"]
+    for result in results:
+        speedup = f"  ({baseline / result['seconds']:.2f}x)" if result["seconds"] else ""
+        print(
+            f"{result['mode']:<13} {result['records']:>10,} records {result['seconds']:>8.3f} s "
+            f"{result['records_per_second']:>10,} records/s{speedup}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure per-page CPU cost of parsing a product page.
+
+Compares the old flow (``parse_product_page`` and ``parse_offers`` each build
+their own tree) with a single shared ``parse_document`` handle, and reports
+single-core throughput for each parser backend and prefilter mode.
+
+    python -m benchmarks.bench_parse --pages 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from benchmarks.corpus import build_corpus  # noqa: E402
+from extractors.amazon_parser import extract_product, parse_product_page  # noqa: E402
+from extractors.document import BACKENDS, parse_document  # noqa: E402
+from extractors.offer_extractor import extract_offers, parse_offers  # noqa: E402
+from extractors.page import parse_page  # noqa: E402
+from extractors.prefilter import PREFILTER_MODES  # noqa: E402
+
+def _parse_twice(html: str) -> None:
+    parse_product_page(html, asin="X", url="u")
+    parse_offers(html)
+
+def _shared(backend: str) -> Callable[[str], None]:
+    def parse(html: str) -> None:
+        doc = parse_document(html, backend=backend)
+        extract_product(doc, asin="X", url="u")
+        extract_offers(doc)
+    return parse
+
+def _page(backend: str, prefilter: str) -> Callable[[str], None]:
+    def parse(html: str) -> None:
+        parse_page(html, asin="X", url="u", backend=backend, prefilter=prefilter)
+    return parse
+
+def _cpu_per_page(fn: Callable[[str], None], pages: List[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.process_time()
+        for html in pages:
+            fn(html)
+        best = min(best, (time.process_time() - start) / len(pages))
+    return best
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-bytes", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pages = build_corpus(args.pages, target_bytes=args.page_bytes)
+    avg_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"pages: {len(pages)} x {avg_kb:.0f} KiB")
+
+    twice = _cpu_per_page(_parse_twice, pages, args.rounds)
+    print(f"{'bs4, parse twice (old)':<26} {twice * 1000:8.1f} ms CPU/page {1 / twice:8.1f} pages/s/core")
+    for backend in BACKENDS:
+        cost = _cpu_per_page(_shared(backend), pages, args.rounds)
+        print(
+            f"{backend + ', shared document':<26} {cost * 1000:8.1f} ms CPU/page "
+            f"{1 / cost:8.1f} pages/s/core  ({twice / cost:.1f}x)"
+        )
+    for prefilter in PREFILTER_MODES[1:]:
+        for backend in BACKENDS:
+            cost = _cpu_per_page(_page(backend, prefilter), pages, args.rounds)
+            label = f"{backend}, prefilter={prefilter}"
+            print(
+                f"{label:<26} {cost * 1000:8.1f} ms CPU/page "
+                f"{1 / cost:8.1f} pages/s/core  ({twice / cost:.1f}x)"
+            )
+
+if __name__ == "__main__":
+    main()
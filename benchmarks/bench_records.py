@@ -0,0 +1,115 @@
+"""
+Memory held per product: plain dicts against slotted ``Product`` records.
+
+Each kind is built in a fresh process, ``--records`` of them with two
+offers each, and the growth of that process's RSS is divided by the
+record count. Both kinds get the same field values (a new ASIN, URL and
+numbers per record, strings shared from a small pool as a parser's
+interned values would be), so the difference is the containers alone.
+
+    python -m benchmarks.bench_records --records 1000000
+"""
+import argparse
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from benchmarks.memory import rss_bytes  # noqa: E402
+from extractors.records import Offer, Product  # noqa: E402
+
+KINDS = ("dict", "record")
+
+_TITLES = [f"Product title number {i} with a typical length for a listing" for i in range(100)]
+_SELLERS = [f"Seller {i}" for i in range(50)]
+
+def _fields(i: int) -> Dict[str, Any]:
+    asin = f"B{i:09d}"
+    return {
+        "asin": asin,
+        "url": "https://www.amazon.com/dp/" + asin,
+        "title": _TITLES[i % len(_TITLES)],
+        "brand": "Brand",
+        "thumbnail_image": None,
+        "price_raw": "$19.99",
+        "price_value": 10.0 + i % 5000 / 100,
+        "price_currency": "$",
+        "stars": 3.0 + i % 20 / 10,
+        "reviews_count": 1000 + i,
+        "description": None,
+        "bread_crumbs": "Category > Subcategory",
+    }
+
+def _dict(fields: Dict[str, Any], offers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # The shape the extractors built before records
+    return {
+        "asin": fields["asin"],
+        "url": fields["url"],
+        "title": fields["title"],
+        "brand": fields["brand"],
+        "thumbnailImage": fields["thumbnail_image"],
+        "price_raw": fields["price_raw"],
+        "price.value": fields["price_value"],
+        "price_currency": fields["price_currency"],
+        "stars": fields["stars"],
+        "reviewsCount": fields["reviews_count"],
+        "description": fields["description"],
+        "breadCrumbs": fields["bread_crumbs"],
+        "offers": offers,
+    }
+
+def measure(kind: str, count: int) -> Dict[str, Any]:
+    """Build ``count`` products of ``kind`` and report the memory they hold."""
+    before = rss_bytes()
+    products: List[Any] = []
+    for i in range(count):
+        fields = _fields(i)
+        sellers = (_SELLERS[i % len(_SELLERS)], _SELLERS[(i + 1) % len(_SELLERS)])
+        if kind == "dict":
+            offers: List[Any] = [
+                {"price_raw": "$18.99", "seller": seller, "condition": "New"} for seller in sellers
+            ]
+            products.append(_dict(fields, offers))
+        else:
+            offers = [Offer(price_raw="$18.99", seller=seller, condition="New") for seller in sellers]
+            products.append(Product(offers=offers, **fields))
+    grown = rss_bytes() - before
+    return {
+        "kind": kind,
+        "records": len(products),
+        "mb": round(grown / (1024 * 1024), 1),
+        "bytes_per_record": round(grown / max(1, count)),
+    }
+
+def run(count: int) -> List[Dict[str, Any]]:
+    results = []
+    for kind in KINDS:
+        # A fresh process per kind, so one's freed memory cannot hide the other's
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results.append(pool.submit(measure, kind, count).result())
+    return results
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    if rss_bytes() is None:  # pragma: no cover - Windows
+        parser.error("needs the resource module (Unix only)")
+
+    results = run(args.records)
+    baseline = results[0]["bytes_per_record"]
+    for result in results:
+        ratio = f"  ({result['bytes_per_record'] / baseline:.2f}x)" if baseline else ""
+        print(
+            f"{result['kind']:<8} {result['records']:>10,} records {result['mb']:>9.1f} MiB "
+            f"{result['bytes_per_record']:>6} bytes/record{ratio}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Offline benchmark suite: parsing, fetching, whole scrapes and exporters.
+
+Every stage runs in a fresh process against a synthetic corpus (mixed
+locales) and a local stub server, and reports items per second and peak
+RSS. The stub server runs in the stage's own process, so fetch and scrape
+numbers include its CPU and memory. Results are written as JSON; pass an
+earlier file to ``--compare`` to see the change per stage.
+
+    python -m benchmarks.bench_suite --pages 20 --requests 300
+    python -m benchmarks.bench_suite --stages parse,export --compare benchmarks/results/old.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from benchmarks.corpus import LOCALES, build_corpus  # noqa: E402
+from benchmarks.memory import peak_rss_mb  # noqa: E402
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from extractors.document import BACKENDS  # noqa: E402
+from extractors.page import parse_page  # noqa: E402
+from network.sessions import build_session  # noqa: E402
+from outputs.exporters import EXPORT_FORMATS, open_writer  # noqa: E402
+from runner import DEFAULT_CONFIG, ENGINES, build_product_url, fetch_asin_html, iter_products  # noqa: E402
+
+RESULTS_DIR = ROOT_DIR / "benchmarks" / "results"
+
+def _corpus(options: Dict[str, Any]) -> List[str]:
+    return build_corpus(options["pages"], target_bytes=options["page_bytes"], locales=options["locales"])
+
+def _asins(count: int) -> List[str]:
+    return [f"B0SYN{i:05d}" for i in range(count)]
+
+def _stub(options: Dict[str, Any], pages: List[str]) -> StubAmazonServer:
+    return StubAmazonServer(
+        page_for=lambda asin: pages[int(asin[5:]) % len(pages)],
+        latency=options["latency"],
+        latency_jitter=options["latency_jitter"],
+        error_rate=options["error_rate"],
+        seed=0,
+    )
+
+def _settings(options: Dict[str, Any], base_url: str, **overrides: Any) -> Dict[str, Any]:
+    settings = dict(
+        DEFAULT_CONFIG,
+        base_url=base_url,
+        concurrency=options["concurrency"],
+        # Short backoff so injected errors are retried without idling the run
+        retry_base_delay=0.05,
+        retry_max_delay=0.5,
+    )
+    settings.update(overrides)
+    return settings
+
+# Each stage builds its inputs, then times the work; returns (items, seconds, extra)
+StageResult = Tuple[int, float, Dict[str, Any]]
+
+def _bench_parse(options: Dict[str, Any], backend: str, prefilter: str) -> StageResult:
+    pages = _corpus(options)
+    start = time.perf_counter()
+    for html in pages:
+        parse_page(html, asin="X", url="u", backend=backend, prefilter=prefilter)
+    return len(pages), time.perf_counter() - start, {}
+
+def _bench_fetch(options: Dict[str, Any]) -> StageResult:
+    pages = _corpus(options)
+    asins = _asins(options["requests"])
+    with _stub(options, pages) as server:
+        settings = _settings(options, server.base_url)
+        concurrency = options["concurrency"]
+        with build_session(concurrency) as session, ThreadPoolExecutor(concurrency) as executor:
+
+            def fetch(asin: str) -> Optional[str]:
+                return fetch_asin_html(asin, build_product_url(server.base_url, asin), settings, session)
+
+            start = time.perf_counter()
+            fetched = sum(1 for html in executor.map(fetch, asins) if html is not None)
+            elapsed = time.perf_counter() - start
+        extra = {"requests": server.requests, "errors": server.errors, "connections": server.connections}
+    return fetched, elapsed, extra
+
+def _bench_scrape(options: Dict[str, Any], engine: str) -> StageResult:
+    pages = _corpus(options)
+    asins = _asins(options["requests"])
+    with _stub(options, pages) as server:
+        settings = _settings(options, server.base_url, engine=engine)
+        start = time.perf_counter()
+        products = sum(1 for _ in iter_products(asins, settings))
+        elapsed = time.perf_counter() - start
+        extra = {"requests": server.requests, "errors": server.errors}
+    return products, elapsed, extra
+
+def _products(options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    parsed = [parse_page(html, asin="X", url="u") for html in _corpus(options)]
+    for i in range(options["records"]):
+        yield dict(parsed[i % len(parsed)], asin=f"B0REC{i:05d}")
+
+def _bench_export(options: Dict[str, Any], fmt: str) -> StageResult:
+    products = list(_products(options))
+    with tempfile.TemporaryDirectory() as out:
+        start = time.perf_counter()
+        with open_writer(fmt, Path(out), "bench") as writer:
+            for product in products:
+                writer.write(product)
+        elapsed = time.perf_counter() - start
+        size = sum(path.stat().st_size for path in Path(out).iterdir())
+    return len(products), elapsed, {"bytes": size}
+
+_STAGE_FUNCTIONS: Dict[str, Callable[..., StageResult]] = {
+    "parse": _bench_parse,
+    "fetch": _bench_fetch,
+    "scrape": _bench_scrape,
+    "export": _bench_export,
+}
+
+def stage_names(options: Dict[str, Any]) -> List[Tuple[str, Tuple[str, ...]]]:
+    """Every ``(kind, args)`` stage the options ask for."""
+    stages: List[Tuple[str, Tuple[str, ...]]] = []
+    for backend in options["backends"]:
+        for prefilter in options["prefilters"]:
+            stages.append(("parse", (backend, prefilter)))
+    stages.append(("fetch", ()))
+    for engine in options["engines"]:
+        stages.append(("scrape", (engine,)))
+    for fmt in options["formats"]:
+        stages.append(("export", (fmt,)))
+    return [stage for stage in stages if stage[0] in options["stages"]]
+
+def run_stage(kind: str, args: Tuple[str, ...], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one stage in this process; meant to be called in a fresh one."""
+    # Injected server errors would otherwise log a line per failed request
+    logging.disable(logging.CRITICAL)
+    setup_rss = peak_rss_mb()
+    items, seconds, extra = _STAGE_FUNCTIONS[kind](options, *args)
+    peak_rss = peak_rss_mb()
+    return {
+        "stage": ":".join((kind,) + args),
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items_per_sec": round(items / seconds, 2) if seconds else None,
+        "start_rss_mb": round(setup_rss, 1) if setup_rss is not None else None,
+        "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+        **extra,
+    }
+
+def run_suite(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run every stage, each in its own spawned process, and collect the results."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for kind, args in stage_names(options):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            try:
+                result = pool.submit(run_stage, kind, args, options).result()
+            except Exception as exc:
+                # e.g. the async engine or parquet without their optional packages
+                result = {"stage": ":".join((kind,) + args), "error": f"{type(exc).__name__}: {exc}"}
+        results.append(result)
+        _print_result(result)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": _git_commit(),
+        "options": options,
+        "stages": results,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=str(ROOT_DIR),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _print_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    if "error" in result:
+        print(f"{result['stage']:<28} skipped: {result['error']}")
+        return
+    line = f"{result['stage']:<28} {result['items_per_sec'] or 0:10.1f} items/s"
+    if result["peak_rss_mb"] is not None:
+        line += f" {result['peak_rss_mb']:8.1f} MiB peak"
+    if baseline and baseline.get("items_per_sec") and result["items_per_sec"]:
+        line += f"  ({result['items_per_sec'] / baseline['items_per_sec']:.2f}x"
+        if baseline.get("peak_rss_mb") and result["peak_rss_mb"]:
+            line += f", RSS {result['peak_rss_mb'] / baseline['peak_rss_mb']:.2f}x"
+        line += ")"
+    print(line)
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """Print each stage of ``current`` next to the same stage in ``previous``."""
+    before = {result["stage"]: result for result in previous.get("stages", [])}
+    print(f"compared with {previous.get('commit') or '?'} from {previous.get('created', '?')}:")
+    for result in current["stages"]:
+        _print_result(result, before.get(result["stage"]))
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20, help="Distinct pages in the corpus")
+    parser.add_argument("--page-bytes", type=int, default=1_000_000)
+    parser.add_argument("--locales", type=_csv, default=list(LOCALES), help="Corpus locales, cycled")
+    parser.add_argument("--requests", type=int, default=300, help="ASINs per fetch and scrape stage")
+    parser.add_argument("--records", type=int, default=20_000, help="Products per export stage")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub server latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.03)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of stub responses that are 500s")
+    parser.add_argument("--stages", type=_csv, default=list(_STAGE_FUNCTIONS))
+    parser.add_argument("--backends", type=_csv, default=list(BACKENDS))
+    parser.add_argument("--prefilters", type=_csv, default=["none", "sections"])
+    parser.add_argument("--engines", type=_csv, default=list(ENGINES))
+    parser.add_argument("--formats", type=_csv, default=list(EXPORT_FORMATS))
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    options = {
+        name: value for name, value in vars(args).items() if name not in ("output", "compare")
+    }
+    results = run_suite(options)
+
+    output = args.output or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"results written to {output}")
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text(encoding="utf-8")))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import random
+from typing import Dict, List, NamedTuple, Sequence
+
+# Rough shape of a real product page: most of the bytes are inline scripts,
+# styles and carousel markup that the extractors never read.
+_WORDS = (
+    "wireless ergonomic gaming mouse keyboard rechargeable battery portable "
+    "stainless steel kitchen premium compact adjustable lightweight durable "
+    "bluetooth charger travel outdoor professional waterproof silicone"
+).split()
+
+class Locale(NamedTuple):
+    lang: str
+    site: str
+    decimal: str
+    grouping: str
+    # Where the amount goes, e.g. "${amount}" or "{amount}\xa0€"
+    currency: str
+    # Whether prices have a fractional part (yen do not)
+    cents: bool
+    stars: str
+    reviews: str
+    brand: str
+    conditions: Sequence[str]
+
+# Storefront conventions that change what the extractors see: currency
+# placement, decimal and grouping separators, and the rating wording
+LOCALES: Dict[str, Locale] = {
+    "en_US": Locale(
+        "en-us", "Amazon.com", ".", ",", "${amount}", True,
+        "{stars} out of 5 stars", "{reviews} ratings", "Visit the {brand} Store",
+        ("New", "Used - Like New", "Used - Good"),
+    ),
+    "de_DE": Locale(
+        "de-de", "Amazon.de", ",", ".", "{amount}\xa0€", True,
+        "{stars} von 5 Sternen", "{reviews} Sternebewertungen", "Besuche den {brand}-Store",
+        ("Neu", "Gebraucht - Wie neu", "Gebraucht - Gut"),
+    ),
+    "fr_FR": Locale(
+        "fr-fr", "Amazon.fr", ",", "\u202f", "{amount}\xa0€", True,
+        "{stars} sur 5 étoiles", "{reviews} évaluations", "Visiter la boutique {brand}",
+        ("Neuf", "D'occasion - Comme neuf", "D'occasion - Bon"),
+    ),
+    "ja_JP": Locale(
+        "ja-jp", "Amazon.co.jp", ".", ",", "￥{amount}", False,
+        "5つ星のうち{stars}", "{reviews}個の評価", "{brand}のストアを表示",
+        ("新品", "中古品 - ほぼ新品", "中古品 - 良い"),
+    ),
+}
+
+def _number(conventions: Locale, units: int) -> str:
+    return f"{units:,}".replace(",", conventions.grouping)
+
+def _price(conventions: Locale, units: int, cents: int) -> str:
+    if conventions.cents:
+        amount = f"{_number(conventions, units)}{conventions.decimal}{cents:02d}"
+    else:
+        amount = _number(conventions, units * 100 + cents)
+    return conventions.currency.format(amount=amount)
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+def _script_block(rng: random.Random, size: int) -> str:
+    chunks: List[str] = []
+    written = 0
+    while written < size:
+        chunk = (
+            "P.when('A','ready').execute(function(A){var d="
+            + str(rng.randint(0, 10**9))
+            + ";A.state('cf-"
+            + "".join(rng.choice("abcdef0123456789") for _ in range(16))
+            + "',{\"items\":[1,2,3],\"label\":\"<div class=a-offscreen>x</div>\"});});\n"
+        )
+        chunks.append(chunk)
+        written += len(chunk)
+    return "<script type=\"text/javascript\">\n" + "".join(chunks) + "</script>"
+
+def _style_block(rng: random.Random, rules: int) -> str:
+    lines = [
+        f".c{rng.randint(0, 99999)} {{ margin: {rng.randint(0, 20)}px; color: #{rng.randint(0, 0xFFFFFF):06x}; }}"
+        for _ in range(rules)
+    ]
+    return "<style>\n" + "\n".join(lines) + "\n</style>"
+
+def _carousel(rng: random.Random, cards: int) -> str:
+    items = []
+    for i in range(cards):
+        items.append(
+            '<li class="a-carousel-card">'
+            f'<div class="p13n-sc-uncoverable-faceout" data-asin="B0{rng.randint(10**7, 10**8 - 1)}">'
+            f'<img class="p13n-product-image" src="https://m.media-amazon.com/images/I/{i}.jpg" alt="" />'
+            f'<div class="p13n-sc-truncate">{_sentence(rng, 8)}</div>'
+            f'<span class="a-size-base a-color-price">${rng.randint(5, 300)}.{rng.randint(0, 99):02d}</span>'
+            "</div></li>"
+        )
+    return '<div class="a-carousel-container"><ol class="a-carousel">' + "".join(items) + "</ol></div>"
+
+def build_product_page(
+    asin: str,
+    seed: int = 0,
+    target_bytes: int = 1_000_000,
+    locale: str = "en_US",
+) -> str:
+    """
+    Build a synthetic, full-size Amazon-like product page for ``asin``.
+
+    The page carries every field the extractors read plus enough scripts,
+    styles and carousels to reach roughly ``target_bytes`` of HTML. Prices,
+    ratings and labels follow ``locale``, one of ``LOCALES``.
+    """
+    conventions = LOCALES[locale]
+    rng = random.Random(f"{asin}-{seed}")
+    price = _price(conventions, rng.randint(5, 500), rng.randint(0, 99))
+    stars = f"{rng.randint(10, 50) / 10:.1f}".replace(".", conventions.decimal)
+    reviews = _number(conventions, rng.randint(1, 99999))
+    rating = conventions.stars.format(stars=stars)
+
+    head = [
+        "<!DOCTYPE html>",
+        f"<html lang=\"{conventions.lang}\"><head>",
+        '<meta charset="utf-8" />',
+        f"<title>{conventions.site}: {_sentence(rng, 6)}</title>",
+        _style_block(rng, 200),
+        _script_block(rng, 20_000),
+        "</head><body>",
+    ]
+    core = [
+        '<div id="wayfinding-breadcrumbs_feature_div"><ul class="a-unordered-list">'
+        + "".join(f"<li><a href=\"/b/{i}\">{_sentence(rng, 2)}</a></li>" for i in range(4))
+        + "</ul></div>",
+        '<div id="imgTagWrapperId">'
+        f'<img id="landingImage" src="https://m.media-amazon.com/images/I/{asin}.jpg" '
+        f'data-old-hires="https://m.media-amazon.com/images/I/{asin}._SL1500_.jpg" /></div>',
+        f'<div id="titleSection"><h1 id="title"><span id="productTitle"> {_sentence(rng, 12)} </span></h1></div>',
+        '<a id="bylineInfo" href="/stores/brand">'
+        + conventions.brand.format(brand=rng.choice(_WORDS).capitalize())
+        + "</a>",
+        '<div id="averageCustomerReviews">'
+        f'<span id="acrPopover" title="{rating}"><span class="a-icon-alt">{rating}</span></span>'
+        f'<span id="acrCustomerReviewText">{conventions.reviews.format(reviews=reviews)}</span></div>',
+        '<div id="corePrice_feature_div"><span class="a-price">'
+        f'<span class="a-offscreen">{price}</span><span aria-hidden="true">{price}</span></span></div>',
+        '<div id="feature-bullets"><ul class="a-unordered-list a-vertical">'
+        + "".join(f'<li><span class="a-list-item"> {_sentence(rng, 14)} </span></li>' for _ in range(6))
+        + "</ul></div>",
+        f'<div id="productDescription"><p>{_sentence(rng, 60)}</p></div>',
+        '<table id="productDetails_techSpec_section_1">'
+        f"<tr><th>Brand</th><td>{rng.choice(_WORDS).capitalize()}</td></tr>"
+        f"<tr><th>Item Weight</th><td>{rng.randint(1, 40)} ounces</td></tr></table>",
+    ]
+    offers = [
+        '<div id="aod-container">'
+        + "".join(
+            '<div class="offer">'
+            f'<span class="a-color-price">{_price(conventions, rng.randint(5, 500), rng.randint(0, 99))}</span>'
+            f'<span class="a-size-small">Seller {rng.randint(1, 999)}</span>'
+            f'<span class="offer-condition">{rng.choice(conventions.conditions)}</span>'
+            "</div>"
+            for _ in range(rng.randint(1, 8))
+        )
+        + "</div>"
+    ]
+
+    body: List[str] = head + core + offers
+    size = sum(len(part) for part in body)
+    while size < target_bytes:
+        filler = _carousel(rng, 12) + _script_block(rng, 15_000)
+        body.append(filler)
+        size += len(filler)
+    body.append("</body></html>")
+    return "\n".join(body)
+
+def build_corpus(
+    count: int,
+    seed: int = 0,
+    target_bytes: int = 1_000_000,
+    locales: Sequence[str] = ("en_US",),
+) -> List[str]:
+    """``count`` pages, cycling through ``locales``."""
+    return [
+        build_product_page(f"B0SYN{i:05d}", seed=seed, target_bytes=target_bytes, locale=locales[i % len(locales)])
+        for i in range(count)
+    ]
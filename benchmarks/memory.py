@@ -0,0 +1,31 @@
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+def _maxrss_bytes(who: int) -> int:
+    peak = resource.getrusage(who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak RSS of this process and its finished children, in MiB; None without ``resource``."""
+    if resource is None:
+        return None
+    peak = max(_maxrss_bytes(resource.RUSAGE_SELF), _maxrss_bytes(resource.RUSAGE_CHILDREN))
+    return peak / (1024 * 1024)
+
+def rss_bytes() -> Optional[int]:
+    """Current RSS of this process where the OS reports it, else its peak; None without ``resource``."""
+    if resource is None:
+        return None
+    try:
+        # Current RSS on Linux; the peak below starts out at the parent's
+        # peak there, as a spawned child inherits it across exec
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return _maxrss_bytes(resource.RUSAGE_SELF)
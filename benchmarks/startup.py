@@ -0,0 +1,124 @@
+"""
+Startup-time budget: how long ``import runner`` takes in a fresh interpreter.
+
+Each run starts a new ``python -X importtime`` process, so nothing is
+cached in ``sys.modules``; the best of ``--runs`` is compared with the
+budget, since slower runs only add scheduler noise. Interpreter start-up
+itself (``site`` and friends) is measured separately and left out. The
+check also fails when a module that should load on demand (requests,
+openpyxl, the parser backends, asyncio, ...) is imported at startup.
+Exits non-zero when either check fails, for CI:
+
+    python -m benchmarks.startup --budget-ms 250
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+
+# Modules only the features that need them may import
+LAZY_MODULES = (
+    "requests",
+    "openpyxl",
+    "pyarrow",
+    "bs4",
+    "lxml",
+    "numpy",
+    "aiohttp",
+    "asyncio",
+    "multiprocessing",
+    "cProfile",
+    "http.server",
+)
+
+DEFAULT_STATEMENT = "import runner"
+DEFAULT_BUDGET_MS = 250.0
+
+def _importtime(statement: str) -> Tuple[List[Tuple[str, int, List[Tuple[str, int]]]], Set[str]]:
+    """
+    Run ``statement`` in a fresh interpreter. Returns its top-level imports
+    as (module, cumulative µs, [(direct import, cumulative µs)]) and every
+    module loaded by the end.
+    """
+    code = f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))"
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(SRC_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    children: List[Tuple[str, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two more spaces per level and are
+        # reported before the module that imported them
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), int(cumulative_us)))
+        elif depth == 0:
+            imports.append((name.strip(), int(cumulative_us), children))
+            children = []
+    return imports, set(proc.stdout.split())
+
+def measure(statement: str = DEFAULT_STATEMENT, runs: int = 5) -> Dict[str, Any]:
+    """
+    Best import time of ``statement`` over ``runs`` fresh interpreters,
+    the slowest imports in that run and which lazy modules it loaded.
+    """
+    startup = {name for name, _, _ in _importtime("pass")[0]}
+    best: Optional[Tuple[int, List[Tuple[str, int]], Set[str]]] = None
+    for _ in range(max(1, runs)):
+        imports, modules = _importtime(statement)
+        own = [entry for entry in imports if entry[0] not in startup]
+        total = sum(cumulative for _, cumulative, _ in own)
+        if best is None or total < best[0]:
+            # Break the statement's own imports down one level
+            breakdown = [(name, cumulative) for name, cumulative, _ in own]
+            breakdown += [child for _, _, direct in own for child in direct]
+            best = (total, breakdown, modules)
+    assert best is not None
+    total, breakdown, modules = best
+    return {
+        "statement": statement,
+        "import_ms": round(total / 1000, 1),
+        "slowest": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1)}
+            for name, cumulative in sorted(breakdown, key=lambda entry: -entry[1])[:10]
+        ],
+        "lazy_modules_loaded": sorted(name for name in LAZY_MODULES if name in modules),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--statement", default=DEFAULT_STATEMENT, help="Python code to time")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    result = measure(args.statement, args.runs)
+    print(f"{result['statement']!r}: {result['import_ms']:.1f} ms (budget {args.budget_ms:g} ms)")
+    for entry in result["slowest"]:
+        print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+
+    failed = False
+    if result["import_ms"] > args.budget_ms:
+        print(f"over budget by {result['import_ms'] - args.budget_ms:.1f} ms")
+        failed = True
+    if result["lazy_modules_loaded"]:
+        print("loaded at startup but should load on demand: " + ", ".join(result["lazy_modules_loaded"]))
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
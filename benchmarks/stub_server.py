@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from benchmarks.corpus import build_product_page
+
+def _default_page(asin: str) -> str:
+    return build_product_page(asin, target_bytes=20_000)
+
+class StubAmazonServer:
+    """
+    Local HTTP/1.1 server that answers ``/dp/<ASIN>`` with a product page.
+
+    Counts TCP connections and requests so tests and benchmarks can check
+    connection reuse. With ``etags`` it sends an ``ETag`` per page and
+    answers a matching ``If-None-Match`` with 304, counted in
+    ``not_modified``. ``latency`` delays every answer, plus a random extra
+    of up to ``latency_jitter``; with ``capacity`` set, requests beyond
+    that many at once get a 503, counted in ``throttled``, the way an
+    overloaded storefront sheds load. ``error_rate`` of the requests get
+    a 500 instead of the page, counted in ``errors``; ``seed`` makes the
+    jitter and errors repeatable. Use as a context manager; ``base_url``
+    points at it.
+    """
+
+    def __init__(
+        self,
+        page_for: Optional[Callable[[str], str]] = None,
+        etags: bool = False,
+        latency: float = 0.0,
+        capacity: Optional[int] = None,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.page_for = page_for or _default_page
+        self.etags = etags
+        self.latency = latency
+        self.capacity = capacity
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.throttled = 0
+        self.errors = 0
+        self.active = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                with stub._lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.peak_active = max(stub.peak_active, stub.active)
+                    overloaded = stub.capacity is not None and stub.active > stub.capacity
+                    failing = bool(stub.error_rate) and stub._rng.random() < stub.error_rate
+                    delay = stub.latency + (stub._rng.uniform(0, stub.latency_jitter) if stub.latency_jitter else 0.0)
+                try:
+                    if overloaded:
+                        with stub._lock:
+                            stub.throttled += 1
+                        self._send_empty(503)
+                        return
+                    if delay:
+                        time.sleep(delay)
+                    if failing:
+                        with stub._lock:
+                            stub.errors += 1
+                        self._send_empty(500)
+                        return
+                    self._send_page()
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def _send_empty(self, status: int) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _send_page(self) -> None:
+                asin = self.path.rstrip("/").rsplit("/", 1)[-1]
+                body = stub.page_for(asin).encode("utf-8")
+                etag = f'"{zlib.crc32(body):08x}"' if stub.etags else None
+                if etag and self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "StubAmazonServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from extractors.page_classifier import NonProductPage, check_page
+from extractors.records import Product
+from metrics.counters import COUNTERS
+from metrics.histograms import HISTOGRAMS
+from network.cache import ResponseCache, cache_key, conditional_headers
+from network.marketplaces import accept_language
+from network.retry import RetryPolicy, error_class
+from network.throttle import build_async_throttle
+
+logger = logging.getLogger(__name__)
+
+# (asin, url, html) -> product, or None when parsing failed
+ParseFn = Callable[[str, str, str], Optional[Product]]
+EmitFn = Callable[[Product], None]
+
+def run_async_engine(
+    jobs: Iterable[Tuple[str, str]],
+    settings: Dict[str, Any],
+    parse: ParseFn,
+    emit: EmitFn,
+    cache: Optional[ResponseCache] = None,
+    retry: Optional[RetryPolicy] = None,
+) -> None:
+    """
+    Fetch ``(asin, url)`` jobs on a single event loop and parse the pages.
+
+    Up to ``async_concurrency`` requests are in flight at once, and at most
+    ``per_host_concurrency`` against any one host; with
+    ``adaptive_concurrency`` or ``requests_per_second`` set, the per-host
+    limit is managed by ``network.throttle`` instead. Parsing is CPU-bound, so
+    ``parse`` runs in a pool of ``parse_workers`` threads off the loop and
+    never stalls I/O. Each product is passed to ``emit`` from a parse
+    thread, so a blocking ``emit`` slows the engine down instead of the loop.
+    With a ``cache``, fresh pages are served from it and stale ones are
+    revalidated. With a ``retry`` policy, retryable failures are fetched
+    again by a task that sleeps out the backoff on its own, so no worker
+    waits. Requires the optional ``aiohttp`` package.
+    """
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise RuntimeError("The async engine requires aiohttp (pip install aiohttp)") from exc
+
+    parse_workers = settings.get("parse_workers")
+    with ThreadPoolExecutor(max_workers=parse_workers or None) as parse_executor:
+        asyncio.run(_scrape(iter(jobs), settings, parse, emit, parse_executor, cache, retry))
+
+async def _scrape(
+    jobs: Iterator[Tuple[str, str]],
+    settings: Dict[str, Any],
+    parse: ParseFn,
+    emit: EmitFn,
+    parse_executor: Executor,
+    cache: Optional[ResponseCache] = None,
+    retry: Optional[RetryPolicy] = None,
+) -> None:
+    import aiohttp
+
+    concurrency = max(1, int(settings.get("async_concurrency", 1000)))
+    per_host = max(1, int(settings.get("per_host_concurrency", 100)))
+    timeout = aiohttp.ClientTimeout(total=int(settings.get("timeout_seconds", 20)))
+    headers = {
+        "User-Agent": str(settings.get("user_agent", "")),
+        "Accept-Language": accept_language(settings),
+    }
+
+    cache_only = bool(settings.get("cache_only"))
+    marketplace = str(settings.get("marketplace", ""))
+
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+    throttle = build_async_throttle(settings, per_host)
+    loop = asyncio.get_running_loop()
+    retry_tasks: Set["asyncio.Task[None]"] = set()
+
+    def schedule(session: "aiohttp.ClientSession", asin: str, url: str, attempt: int, delay: float) -> None:
+        async def retry_later() -> None:
+            await asyncio.sleep(delay)
+            await process(session, asin, url, attempt)
+
+        task = loop.create_task(retry_later())
+        retry_tasks.add(task)
+        task.add_done_callback(retry_tasks.discard)
+
+    async def fetch(
+        session: "aiohttp.ClientSession",
+        asin: str,
+        url: str,
+        attempt: int,
+    ) -> Optional[str]:
+        cached = None
+        if cache is not None:
+            # SQLite calls block, so they run off the loop
+            key = cache_key(marketplace, settings["base_url"], asin)
+            cached = await loop.run_in_executor(None, cache.lookup, key)
+            if cached is not None and (cached.fresh or cache_only):
+                return cached.body
+        if cache_only:
+            logger.warning("ASIN %s is not in the cache; skipping it", asin)
+            return None
+
+        if retry is not None:
+            blocked, delay = retry.blocked(asin, url, attempt)
+            if blocked:
+                # Circuit open for this host
+                if delay is not None:
+                    schedule(session, asin, url, attempt + 1, delay)
+                return None
+
+        if throttle is not None:
+            gate: Any = throttle.slot(url)
+        else:
+            host = urlsplit(url).netloc
+            gate = host_limits.get(host)
+            if gate is None:
+                gate = host_limits[host] = asyncio.Semaphore(per_host)
+        # The throttle yields a Slot to report the outcome to; a semaphore yields None
+        async with gate as slot:
+            logger.debug("Requesting URL: %s", url)
+            COUNTERS.inc("fetch.started")
+            start = time.perf_counter()
+            try:
+                async with session.get(url, headers=conditional_headers(cached)) as response:
+                    if slot is not None:
+                        slot.status(response.status)
+                    if response.status == 304 and cached is not None:
+                        html = None
+                    else:
+                        response.raise_for_status()
+                        COUNTERS.inc("fetch.bytes", len(await response.read()))
+                        html = check_page(await response.text(), url)
+                    validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            except Exception as exc:
+                COUNTERS.inc("errors." + (exc.kind if isinstance(exc, NonProductPage) else error_class(exc)))
+                if slot is not None:
+                    if isinstance(exc, NonProductPage):
+                        slot.status(exc.status)
+                    elif not isinstance(exc, aiohttp.ClientResponseError):
+                        slot.status(None)
+                if retry is not None:
+                    delay = retry.failed(asin, url, attempt, exc)
+                    if delay is not None:
+                        schedule(session, asin, url, attempt + 1, delay)
+                        return None
+                logger.error("Failed to fetch ASIN %s at URL %s: %s", asin, url, exc)
+                return None
+            finally:
+                HISTOGRAMS.observe("fetch_seconds", time.perf_counter() - start)
+                COUNTERS.inc("fetch.finished")
+        if retry is not None:
+            retry.succeeded(url)
+
+        if cache is None:
+            return html
+        if html is None:
+            await loop.run_in_executor(None, cache.refresh, key)
+            return cached.body
+        await loop.run_in_executor(None, cache.store, key, html, *validators)
+        return html
+
+    def parse_and_emit(asin: str, url: str, html: str) -> None:
+        product = parse(asin, url, html)
+        if product:
+            emit(product)
+
+    async def process(session: "aiohttp.ClientSession", asin: str, url: str, attempt: int) -> None:
+        html = await fetch(session, asin, url, attempt)
+        if html is not None:
+            await loop.run_in_executor(parse_executor, parse_and_emit, asin, url, html)
+
+    async def worker(session: "aiohttp.ClientSession") -> None:
+        # Workers pull from the shared iterator, so jobs are consumed lazily
+        # and only ``concurrency`` of them exist at any moment
+        for asin, url in jobs:
+            if retry is not None:
+                retry.budget.deposit()
+            await process(session, asin, url, 1)
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        # Retries can schedule further retries
+        while retry_tasks:
+            await asyncio.gather(*list(retry_tasks))
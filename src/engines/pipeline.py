@@ -0,0 +1,162 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from extractors.page import parse_page
+from extractors.records import Product
+from metrics.counters import COUNTERS
+from metrics.histograms import HISTOGRAMS
+
+logger = logging.getLogger(__name__)
+
+# (asin, url) -> html, or None when the fetch failed
+FetchFn = Callable[[str, str], Optional[str]]
+EmitFn = Callable[[Product], None]
+
+_DONE = object()
+
+def _parse_job(
+    asin: str,
+    url: str,
+    html: str,
+    options: Dict[str, Any],
+) -> Tuple[Optional[Product], float]:
+    """Runs in a parse worker process; returns the product and CPU time spent."""
+    start = time.process_time()
+    try:
+        product: Optional[Product] = parse_page(html, asin=asin, url=url, **options)
+    except Exception as exc:
+        logger.error("Failed to parse product for ASIN %s: %s", asin, exc)
+        product = None
+    return product, time.process_time() - start
+
+def run_pipeline(
+    jobs: Iterable[Tuple[str, str]],
+    settings: Dict[str, Any],
+    fetch: FetchFn,
+    parse_options: Dict[str, Any],
+    emit: EmitFn,
+) -> Dict[str, Any]:
+    """
+    Run fetching and parsing as two separately sized stages.
+
+    ``fetch_workers`` I/O threads fetch pages into a queue bounded by
+    ``pipeline_queue_size``; ``parse_workers`` processes parse them, so
+    parsing uses every core instead of contending for the GIL. When the
+    parse stage falls behind, the queue fills and fetch workers block
+    (backpressure); at most two pages per parse worker are in flight inside
+    the process pool.
+
+    Products are passed to ``emit`` as parse workers finish them. Returns
+    per-stage utilization stats, which show which
+    stage to grow: a fetch stage blocked on a full queue needs more parse
+    workers, a parse stage starved on an empty queue needs more fetchers.
+    """
+    fetch_workers = max(1, int(settings.get("fetch_workers") or settings.get("concurrency", 5)))
+    parse_workers = max(1, int(settings.get("parse_workers") or os.cpu_count() or 1))
+    queue_size = max(1, int(settings.get("pipeline_queue_size", 64)))
+
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    job_iter = iter(jobs)
+    lock = threading.Lock()
+    counters = {
+        "fetched": 0,
+        "fetch_busy": 0.0,
+        "fetch_blocked": 0.0,
+        "parsed": 0,
+        "parse_busy": 0.0,
+        "parse_starved": 0.0,
+    }
+
+    def fetch_worker() -> None:
+        while True:
+            with lock:
+                job = next(job_iter, None)
+            if job is None:
+                return
+            asin, url = job
+            start = time.perf_counter()
+            html = fetch(asin, url)
+            fetched = time.perf_counter()
+            if html is not None:
+                pages.put((asin, url, html))
+            with lock:
+                counters["fetch_busy"] += fetched - start
+                counters["fetch_blocked"] += time.perf_counter() - fetched
+                if html is not None:
+                    counters["fetched"] += 1
+
+    def close_queue(threads: List[threading.Thread]) -> None:
+        for thread in threads:
+            thread.join()
+        pages.put(_DONE)
+
+    def collect(future: Future) -> None:
+        in_flight.release()
+        try:
+            product, busy = future.result()
+        except Exception as exc:  # pragma: no cover - worker process died
+            logger.error("Parse worker failed: %s", exc)
+            return
+        with lock:
+            counters["parsed"] += 1
+            counters["parse_busy"] += busy
+        # Parse timings recorded inside the worker processes stay there
+        HISTOGRAMS.observe("parse_seconds", busy)
+        if product is None:
+            COUNTERS.inc("errors.parse")
+        if product:
+            emit(product)
+
+    in_flight = threading.BoundedSemaphore(parse_workers * 2)
+    started = time.perf_counter()
+    fetchers = [
+        threading.Thread(target=fetch_worker, name=f"fetch-{i}", daemon=True)
+        for i in range(fetch_workers)
+    ]
+    for thread in fetchers:
+        thread.start()
+    threading.Thread(target=close_queue, args=(fetchers,), daemon=True).start()
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        while True:
+            waited = time.perf_counter()
+            item = pages.get()
+            counters["parse_starved"] += time.perf_counter() - waited
+            if item is _DONE:
+                break
+            in_flight.acquire()
+            pool.submit(_parse_job, *item, parse_options).add_done_callback(collect)
+
+    wall = max(time.perf_counter() - started, 1e-9)
+    stats = {
+        "wall_seconds": round(wall, 3),
+        "fetch": {
+            "workers": fetch_workers,
+            "pages": counters["fetched"],
+            "utilization": round(counters["fetch_busy"] / (fetch_workers * wall), 3),
+            "blocked_on_queue_seconds": round(counters["fetch_blocked"], 3),
+        },
+        "queue": {"size": queue_size},
+        "parse": {
+            "workers": parse_workers,
+            "pages": counters["parsed"],
+            "utilization": round(counters["parse_busy"] / (parse_workers * wall), 3),
+            "starved_seconds": round(counters["parse_starved"], 3),
+        },
+    }
+    logger.info(
+        "Pipeline: fetch %d workers %.0f%% busy (%.1fs blocked on full queue), "
+        "parse %d workers %.0f%% busy (%.1fs waiting for pages)",
+        fetch_workers,
+        stats["fetch"]["utilization"] * 100,
+        counters["fetch_blocked"],
+        parse_workers,
+        stats["parse"]["utilization"] * 100,
+        counters["parse_starved"],
+    )
+    return stats
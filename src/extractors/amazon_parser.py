@@ -1,38 +1,44 @@
-thonimport logging
+import logging
 import re
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
-from bs4 import BeautifulSoup, Tag
+from extractors.document import DEFAULT_BACKEND, ParsedDocument, Selector, parse_document
+from extractors.normalize import normalize_product
+from extractors.records import Product
 
 logger = logging.getLogger(__name__)
 
-Selector = Tuple[str, Dict[str, Any]]
+_BRAND_HEADER_RE = re.compile(r"brand", re.I)
+_IMAGE_CLASS_RE = re.compile(r"image|img", re.I)
+_BREADCRUMBS_CLASS_RE = re.compile(r"breadcrumbs", re.I)
 
-def _first_text(soup: BeautifulSoup, selectors: Iterable[Selector]) -> Optional[str]:
+def _first_text(doc: ParsedDocument, selectors: Iterable[Selector]) -> Optional[str]:
     for name, attrs in selectors:
-        el = soup.find(name, attrs=attrs)
-        if el and isinstance(el, Tag):
-            text = el.get_text(strip=True)
+        el = doc.find(name, attrs)
+        if el is not None:
+            text = doc.text(el)
             if text:
                 return text
     return None
 
-def _extract_title(soup: BeautifulSoup) -> Optional[str]:
+def _extract_title(doc: ParsedDocument) -> Optional[str]:
     title = _first_text(
-        soup,
+        doc,
         [
             ("span", {"id": "productTitle"}),
             ("span", {"id": "title"}),
             ("h1", {"id": "title"}),
         ],
     )
-    if not title and soup.title:
-        title = soup.title.get_text(strip=True)
+    if not title:
+        title_tag = doc.find("title")
+        if title_tag is not None:
+            title = doc.text(title_tag)
     return title
 
-def _extract_brand(soup: BeautifulSoup) -> Optional[str]:
+def _extract_brand(doc: ParsedDocument) -> Optional[str]:
     brand = _first_text(
-        soup,
+        doc,
         [
             ("a", {"id": "bylineInfo"}),
             ("span", {"id": "bylineInfo"}),
@@ -42,32 +48,23 @@ def _extract_brand(soup: BeautifulSoup) -> Optional[str]:
     )
     if not brand:
         # A more generic guess based on product details table
-        cell = soup.find("th", string=re.compile(r"brand", re.I))
-        if cell and isinstance(cell, Tag):
-            sibling = cell.find_next("td")
-            if sibling:
-                brand = sibling.get_text(strip=True)
+        cell = next(
+            (
+                th
+                for th in doc.find_all("th")
+                if _BRAND_HEADER_RE.search(doc.string(th) or "")
+            ),
+            None,
+        )
+        if cell is not None:
+            sibling = doc.find_next(cell, "td")
+            if sibling is not None:
+                brand = doc.text(sibling)
     return brand
 
-def _parse_price_string(value: str) -> Tuple[Optional[float], Optional[str]]:
-    if not value:
-        return None, None
-    value = value.strip()
-    currency = None
-    match = re.search(r"([€£$¥₹])\s*([\d,.]+)", value)
-    if match:
-        currency = match.group(1)
-        value = match.group(2)
-    value = value.replace(",", "")
-    try:
-        num = float(value)
-    except ValueError:
-        num = None
-    return num, currency
-
-def _extract_price(soup: BeautifulSoup) -> Dict[str, Any]:
-    price_text = _first_text(
-        soup,
+def _extract_price(doc: ParsedDocument) -> Optional[str]:
+    return _first_text(
+        doc,
         [
             ("span", {"id": "priceblock_ourprice"}),
             ("span", {"id": "priceblock_dealprice"}),
@@ -75,128 +72,114 @@ def _extract_price(soup: BeautifulSoup) -> Dict[str, Any]:
             ("span", {"class": "a-offscreen"}),
         ],
     )
-    price_value, currency = _parse_price_string(price_text or "")
 
-    return {
-        "price_raw": price_text,
-        "price.value": price_value,
-        "price_currency": currency,
-    }
-
-def _extract_thumbnail(soup: BeautifulSoup) -> Optional[str]:
-    img = soup.find("img", {"id": "landingImage"})
-    if not img:
+def _extract_thumbnail(doc: ParsedDocument) -> Optional[str]:
+    img = doc.find("img", {"id": "landingImage"})
+    if img is None:
         # Fallback – first product image thumbnail
-        img = soup.find("img", {"data-a-image-name": "landingImage"})
-    if not img:
-        img = soup.find("img", {"class": re.compile(r"image|img", re.I)})
-    if img and isinstance(img, Tag):
+        img = doc.find("img", {"data-a-image-name": "landingImage"})
+    if img is None:
+        img = doc.find("img", {"class": _IMAGE_CLASS_RE})
+    if img is not None:
         for key in ("src", "data-old-hires", "data-a-hires"):
-            url = img.get(key)
+            url = doc.get(img, key)
             if url:
                 return url
     return None
 
-def _extract_description(soup: BeautifulSoup) -> Optional[str]:
-    bullets_container = soup.find("div", {"id": "feature-bullets"})
-    if bullets_container:
+def _extract_description(doc: ParsedDocument) -> Optional[str]:
+    bullets_container = doc.find("div", {"id": "feature-bullets"})
+    if bullets_container is not None:
         bullets = [
-            li.get_text(strip=True)
-            for li in bullets_container.find_all("span", {"class": "a-list-item"})
-            if li.get_text(strip=True)
+            doc.text(li)
+            for li in doc.find_all_in(bullets_container, "span", {"class": "a-list-item"})
+            if doc.text(li)
         ]
         if bullets:
             return " • ".join(bullets)
 
-    desc = soup.find("div", {"id": "productDescription"})
-    if desc:
-        text = desc.get_text(" ", strip=True)
+    desc = doc.find("div", {"id": "productDescription"})
+    if desc is not None:
+        text = doc.text(desc, " ")
         if text:
             return text
 
     return None
 
-def _extract_rating(soup: BeautifulSoup) -> Dict[str, Any]:
+def _extract_rating(doc: ParsedDocument) -> Tuple[Optional[str], Optional[str]]:
     rating_text = _first_text(
-        soup,
+        doc,
         [
             ("span", {"id": "acrPopover"}),
             ("span", {"data-hook": "rating-out-of-text"}),
         ],
     )
-    stars = None
-    if rating_text:
-        match = re.search(r"([\d.]+)\s+out of", rating_text)
-        if match:
-            try:
-                stars = float(match.group(1))
-            except ValueError:
-                stars = None
-
     reviews_text = _first_text(
-        soup,
+        doc,
         [
             ("span", {"id": "acrCustomerReviewText"}),
             ("span", {"data-hook": "total-review-count"}),
         ],
     )
-    reviews_count = None
-    if reviews_text:
-        digits = re.sub(r"[^\d]", "", reviews_text)
-        if digits:
-            try:
-                reviews_count = int(digits)
-            except ValueError:
-                reviews_count = None
-
-    return {"stars": stars, "reviewsCount": reviews_count}
-
-def _extract_breadcrumbs(soup: BeautifulSoup) -> Optional[str]:
-    crumb_container = soup.find("div", {"id": "wayfinding-breadcrumbs_feature_div"})
-    if not crumb_container:
-        crumb_container = soup.find("ul", {"class": re.compile(r"breadcrumbs", re.I)})
-
-    if not crumb_container:
+    return rating_text, reviews_text
+
+def _extract_breadcrumbs(doc: ParsedDocument) -> Optional[str]:
+    crumb_container = doc.find("div", {"id": "wayfinding-breadcrumbs_feature_div"})
+    if crumb_container is None:
+        crumb_container = doc.find("ul", {"class": _BREADCRUMBS_CLASS_RE})
+
+    if crumb_container is None:
         return None
 
     parts: List[str] = []
-    for a in crumb_container.find_all("a"):
-        text = a.get_text(strip=True)
+    for a in doc.find_all_in(crumb_container, "a"):
+        text = doc.text(a)
         if text:
             parts.append(text)
     return " > ".join(parts) if parts else None
 
+def extract_product(
+    doc: ParsedDocument,
+    asin: Optional[str] = None,
+    url: Optional[str] = None,
+    normalize: bool = True,
+) -> Product:
+    """
+    Extract the product fields from an already parsed document.
+
+    Use this together with ``parse_document`` when the same page is also
+    handed to ``extract_offers`` so the tree is only built once. With
+    ``normalize=False`` the price, rating and review count are left as raw
+    text for a batch pass (``extractors.normalize.normalize_products``).
+    """
+    stars_raw, reviews_raw = _extract_rating(doc)
+    product = Product(
+        asin=asin,
+        url=url,
+        title=_extract_title(doc),
+        brand=_extract_brand(doc),
+        thumbnail_image=_extract_thumbnail(doc),
+        price_raw=_extract_price(doc),
+        description=_extract_description(doc),
+        bread_crumbs=_extract_breadcrumbs(doc),
+        stars_raw=stars_raw,
+        reviews_raw=reviews_raw,
+    )
+    if normalize:
+        normalize_product(product)
+    logger.debug("Parsed product: %s", product)
+    return product
+
 def parse_product_page(
     html: str,
     asin: Optional[str] = None,
     url: Optional[str] = None,
-) -> Dict[str, Any]:
+    backend: str = DEFAULT_BACKEND,
+) -> Product:
     """
-    Parse a single Amazon product HTML page into a structured dictionary.
+    Parse a single Amazon product HTML page into a ``Product`` record.
 
     This function is intentionally flexible so it also works with simplified
     HTML snippets for unit tests.
     """
-    soup = BeautifulSoup(html, "lxml")
-
-    product: Dict[str, Any] = {}
-
-    product["asin"] = asin
-    product["url"] = url
-
-    product["title"] = _extract_title(soup)
-    product["brand"] = _extract_brand(soup)
-    product["thumbnailImage"] = _extract_thumbnail(soup)
-
-    price_info = _extract_price(soup)
-    product.update(price_info)
-
-    rating_info = _extract_rating(soup)
-    product.update(rating_info)
-
-    product["description"] = _extract_description(soup)
-    product["breadCrumbs"] = _extract_breadcrumbs(soup)
-
-    # Clean up: If some numeric fields are None but present as keys, that's fine.
-    logger.debug("Parsed product: %s", product)
-    return product
\ No newline at end of file
+    return extract_product(parse_document(html, backend=backend), asin=asin, url=url)
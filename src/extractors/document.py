@@ -0,0 +1,345 @@
+import logging
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple, Union
+
+# bs4 and lxml are imported by the adapters on first use, so importing this
+# module (and the runner) does not pay for a parser it may never need
+
+logger = logging.getLogger(__name__)
+
+Selector = Tuple[str, Dict[str, Any]]
+Element = Any
+
+# Attributes with their own bucket in the index, in order of selectivity
+_INDEXED_ATTRS = ("id", "data-hook", "class")
+
+# Tags whose strings bs4 stores as special NavigableString subclasses; their
+# text is skipped by get_text() on any other element.
+_STRING_CONTAINERS = frozenset({"script", "style", "template", "rt", "rp"})
+
+BACKENDS = ("bs4", "lxml")
+DEFAULT_BACKEND = "bs4"
+
+class _Bs4Adapter:
+    """Element access on a BeautifulSoup tree (the reference backend)."""
+
+    name = "bs4"
+
+    @staticmethod
+    def parse(html: Union[str, bytes]) -> Element:
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(html, "lxml")
+
+    @staticmethod
+    def iter_elements(root: Element) -> Iterator[Element]:
+        from bs4 import Tag
+
+        for node in root.descendants:
+            if isinstance(node, Tag):
+                yield node
+
+    @staticmethod
+    def tag(el: Element) -> str:
+        return el.name
+
+    @staticmethod
+    def attrs(el: Element) -> Dict[str, Any]:
+        return el.attrs
+
+    @staticmethod
+    def get(el: Element, key: str) -> Optional[str]:
+        return el.get(key)
+
+    @staticmethod
+    def text(el: Element, separator: str = "", strip: bool = False) -> str:
+        return el.get_text(separator, strip=strip)
+
+    @staticmethod
+    def string(el: Element) -> Optional[str]:
+        value = el.string
+        return None if value is None else str(value)
+
+class _LxmlAdapter:
+    """
+    Element access on a raw ``lxml.etree`` tree.
+
+    Text and ``string`` follow bs4's rules exactly so both backends produce
+    the same product dicts; see ``tests/test_parser_backends.py``.
+    """
+
+    name = "lxml"
+
+    @staticmethod
+    def parse(html: Union[str, bytes]) -> Element:
+        from lxml import etree
+
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+            parser = etree.HTMLParser(encoding="utf-8")
+        else:
+            parser = etree.HTMLParser()
+        root = etree.fromstring(html, parser) if html.strip() else None
+        if root is None:
+            root = etree.Element("html")
+        # Wrap in a document node so the <html> element itself is indexed,
+        # as it is under BeautifulSoup
+        document = etree.Element("_document")
+        document.append(root)
+        return document
+
+    @staticmethod
+    def iter_elements(root: Element) -> Iterator[Element]:
+        for el in root.iterdescendants():
+            if isinstance(el.tag, str):
+                yield el
+
+    @staticmethod
+    def tag(el: Element) -> str:
+        return el.tag
+
+    @staticmethod
+    def attrs(el: Element) -> Dict[str, Any]:
+        attrib = el.attrib
+        if "class" in attrib:
+            attrib = dict(attrib)
+            attrib["class"] = attrib["class"].split()
+        return attrib
+
+    @staticmethod
+    def get(el: Element, key: str) -> Optional[str]:
+        return el.get(key)
+
+    @staticmethod
+    def text(el: Element, separator: str = "", strip: bool = False) -> str:
+        # bs4 only returns strings of the element's own kind: plain text for
+        # ordinary tags, script text for <script> and so on.
+        own = el.tag if el.tag in _STRING_CONTAINERS else None
+        inherited = None
+        for ancestor in el.iterancestors():
+            if ancestor.tag in _STRING_CONTAINERS:
+                inherited = ancestor.tag
+                break
+        parts: List[str] = []
+
+        def collect(node: Element, container: Optional[str]) -> None:
+            if node.tag in _STRING_CONTAINERS:
+                container = node.tag
+            if node.text and container == own:
+                parts.append(node.text)
+            for child in node:
+                if isinstance(child.tag, str):
+                    collect(child, container)
+                if child.tail and container == own:
+                    parts.append(child.tail)
+
+        collect(el, inherited if own is None else own)
+        if strip:
+            parts = [p.strip() for p in parts]
+            parts = [p for p in parts if p]
+        return separator.join(parts)
+
+    @staticmethod
+    def string(el: Element) -> Optional[str]:
+        while True:
+            children = list(el)
+            count = len(children) + (1 if el.text else 0)
+            count += sum(1 for child in children if child.tail)
+            if count != 1:
+                return None
+            if el.text:
+                return el.text
+            child = children[0]
+            if not isinstance(child.tag, str):
+                # A lone comment is the element's string under bs4
+                return child.text
+            el = child
+
+_ADAPTERS = {"bs4": _Bs4Adapter, "lxml": _LxmlAdapter}
+
+class SelectorIndex:
+    """
+    Lookup tables for a parsed tree, built in a single traversal.
+
+    Every tag is recorded by name, id, class token and ``data-hook`` in
+    document order, so ``find`` resolves the same element as
+    ``soup.find(name, attrs=attrs)`` without rescanning the whole tree.
+    """
+
+    __slots__ = ("by_name", "by_attr", "_position", "_adapter")
+
+    def __init__(self, root: Element, adapter: Any = _Bs4Adapter) -> None:
+        self.by_name: Dict[str, List[Element]] = {}
+        self.by_attr: Dict[str, Dict[str, List[Element]]] = {key: {} for key in _INDEXED_ATTRS}
+        self._position: Dict[int, int] = {}
+        self._adapter = adapter
+
+        by_name = self.by_name
+        by_id = self.by_attr["id"]
+        by_hook = self.by_attr["data-hook"]
+        by_class = self.by_attr["class"]
+        position = self._position
+        tag_of = adapter.tag
+        attrs_of = adapter.attrs
+
+        for tag in adapter.iter_elements(root):
+            position[id(tag)] = len(position)
+            by_name.setdefault(tag_of(tag), []).append(tag)
+            attrs = attrs_of(tag)
+            if not attrs:
+                continue
+            value = attrs.get("id")
+            if value is not None:
+                by_id.setdefault(value, []).append(tag)
+            value = attrs.get("data-hook")
+            if value is not None:
+                by_hook.setdefault(value, []).append(tag)
+            classes = attrs.get("class")
+            if classes:
+                for token in classes:
+                    by_class.setdefault(token, []).append(tag)
+
+    def _candidates(self, name: str, attrs: Dict[str, Any]) -> List[Element]:
+        for key in _INDEXED_ATTRS:
+            expected = attrs.get(key)
+            # Whitespace in a class value would match the joined attribute,
+            # which the token buckets cannot answer
+            if isinstance(expected, str) and not (key == "class" and " " in expected):
+                return self.by_attr[key].get(expected, [])
+        return self.by_name.get(name, [])
+
+    def find_all(self, name: str, attrs: Optional[Dict[str, Any]] = None) -> List[Element]:
+        attrs = attrs or {}
+        return [
+            tag
+            for tag in self._candidates(name, attrs)
+            if _matches(self._adapter, tag, name, attrs)
+        ]
+
+    def find(self, name: str, attrs: Optional[Dict[str, Any]] = None) -> Optional[Element]:
+        attrs = attrs or {}
+        for tag in self._candidates(name, attrs):
+            if _matches(self._adapter, tag, name, attrs):
+                return tag
+        return None
+
+    def find_next(self, tag: Element, name: str) -> Optional[Element]:
+        """Return the first ``name`` tag after ``tag`` in document order."""
+        candidates = self.by_name.get(name, [])
+        if not candidates:
+            return None
+        start = self._position[id(tag)]
+        positions = [self._position[id(c)] for c in candidates]
+        i = bisect_right(positions, start)
+        return candidates[i] if i < len(candidates) else None
+
+def _matches(adapter: Any, tag: Element, name: str, attrs: Dict[str, Any]) -> bool:
+    if adapter.tag(tag) != name:
+        return False
+    tag_attrs = adapter.attrs(tag)
+    return all(_attr_matches(tag_attrs, k, v) for k, v in attrs.items())
+
+def _attr_matches(
+    tag_attrs: Dict[str, Any],
+    key: str,
+    expected: Union[str, Pattern[str]],
+) -> bool:
+    value = tag_attrs.get(key)
+    if value is None:
+        return False
+    if isinstance(value, list):
+        # Multi-valued attributes match on any token or on the joined string
+        values = list(value) + [" ".join(value)]
+    else:
+        values = [value]
+    if isinstance(expected, str):
+        return expected in values
+    return any(expected.search(v) for v in values)
+
+class ParsedDocument:
+    """
+    An HTML page parsed once and shared between extractors.
+
+    Building the tree is the most expensive step per page, so callers that
+    run several extractors over the same HTML should parse it once with
+    ``parse_document`` and pass the handle to each of them. Extractors go
+    through the handle for every element access, which keeps them
+    independent of the parser backend.
+    """
+
+    __slots__ = ("root", "backend", "_adapter", "_index")
+
+    def __init__(self, root: Element, backend: str = DEFAULT_BACKEND) -> None:
+        self.root = root
+        self.backend = backend
+        self._adapter = _ADAPTERS[backend]
+        self._index: Optional[SelectorIndex] = None
+
+    @property
+    def soup(self) -> Element:
+        if self.backend != "bs4":
+            raise AttributeError(f"Document was parsed with the {self.backend!r} backend")
+        return self.root
+
+    @property
+    def index(self) -> SelectorIndex:
+        if self._index is None:
+            self._index = SelectorIndex(self.root, self._adapter)
+        return self._index
+
+    def find(self, name: str, attrs: Optional[Dict[str, Any]] = None) -> Optional[Element]:
+        return self.index.find(name, attrs)
+
+    def find_all(self, name: str, attrs: Optional[Dict[str, Any]] = None) -> List[Element]:
+        return self.index.find_all(name, attrs)
+
+    def find_next(self, el: Element, name: str) -> Optional[Element]:
+        return self.index.find_next(el, name)
+
+    def find_in(
+        self,
+        el: Element,
+        name: str,
+        attrs: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Element]:
+        """Return the first descendant of ``el`` matching ``name``/``attrs``."""
+        attrs = attrs or {}
+        for tag in self._adapter.iter_elements(el):
+            if _matches(self._adapter, tag, name, attrs):
+                return tag
+        return None
+
+    def find_all_in(
+        self,
+        el: Element,
+        name: str,
+        attrs: Optional[Dict[str, Any]] = None,
+    ) -> List[Element]:
+        attrs = attrs or {}
+        return [
+            tag
+            for tag in self._adapter.iter_elements(el)
+            if _matches(self._adapter, tag, name, attrs)
+        ]
+
+    def text(self, el: Element, separator: str = "", strip: bool = True) -> str:
+        return self._adapter.text(el, separator, strip)
+
+    def string(self, el: Element) -> Optional[str]:
+        return self._adapter.string(el)
+
+    def get(self, el: Element, key: str) -> Optional[str]:
+        return self._adapter.get(el, key)
+
+def parse_document(html: Union[str, bytes], backend: str = DEFAULT_BACKEND) -> ParsedDocument:
+    """
+    Build the document tree for ``html`` once.
+
+    ``backend`` selects ``"bs4"`` (the reference implementation) or
+    ``"lxml"``, which works on the raw lxml tree and skips BeautifulSoup's
+    object model. The returned handle is accepted by ``extract_product``
+    and ``extract_offers``.
+    """
+    if backend not in _ADAPTERS:
+        raise ValueError(f"Unsupported parser backend '{backend}'. Valid: {list(BACKENDS)}")
+    return ParsedDocument(_ADAPTERS[backend].parse(html), backend)
@@ -0,0 +1,256 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from extractors.records import Product
+from metrics.histograms import HISTOGRAMS
+
+logger = logging.getLogger(__name__)
+
+# Symbols first would split "US$" and "R$"; codes must stand alone
+_CURRENCY = (
+    r"US\$|R\$|C\$|A\$|"
+    r"(?:USD|EUR|GBP|JPY|INR|CAD|AUD|CHF|SEK|PLN|BRL|MXN|TRY|AED|SGD|CNY)(?![A-Za-z])|"
+    r"[$€£¥₹￥]"
+)
+# Digits with grouping or decimal separators: "1,234.56", "1.234,56",
+# "1 234,56" (a space only groups when three digits follow), "1'234.50"
+_AMOUNT = r"\d+(?:(?:[.,']|[   ](?=\d{3}(?!\d)))\d+)*"
+_GAP = r"[^\S\n]*"
+
+# The batch functions join a column into one string, a value per line, and
+# scan it with a single findall; each pattern matches every line exactly
+# once, with empty groups where the line has nothing to offer.
+
+# Currency before or after the (low) amount, and the high end of a range
+_PRICE_LINE = re.compile(
+    rf"^(?:[^\n]*?(?:({_CURRENCY}){_GAP})?({_AMOUNT})(?:{_GAP}({_CURRENCY}))?"
+    rf"(?:{_GAP}[-–]{_GAP}(?:{_CURRENCY})?{_GAP}({_AMOUNT}))?)?[^\n]*$",
+    re.M,
+)
+# A rating and its scale, as (rating, scale) in "4.5 out of 5", "4,5 von 5"
+# and "4,5 sur 5", or (scale, rating) in "5つ星のうち4.3". A number on its
+# own ("5 stars", "out of 5 stars", "5つ星のうち") is not a rating. _OF
+# covers the languages of network.marketplaces.
+_STARS = r"\d+(?:[.,]\d+)?"
+_OF = r"(?i:out of|von|sur|de|su|van)"
+_RATING_LINE = re.compile(
+    rf"^(?:[^\n]*?(?:({_STARS}){_GAP}{_OF}{_GAP}({_STARS})|({_STARS})つ星のうち{_GAP}({_STARS})))?[^\n]*$",
+    re.M,
+)
+_COUNT_LINE = re.compile(rf"^(?:[^\n]*?({_AMOUNT}))?[^\n]*$", re.M)
+
+# Always thousands separators, whatever the locale
+_GROUPING = ("'", " ", " ", " ")
+
+# Longer digit runs do not fit an int64; they are converted one by one
+_INT64_DIGITS = 18
+
+Price = Tuple[Optional[float], Optional[float], Optional[str]]
+
+def _column(texts: Sequence[Optional[str]]) -> str:
+    # Callers skip empty columns: "" would still be read as one empty line
+    return "\n".join((text or "").replace("\n", " ") for text in texts)
+
+def _amount(token: str, decimal: Optional[str] = None) -> Optional[float]:
+    """
+    The number in an amount token. A separator is the decimal mark when it
+    is the last of two kinds ("1.234,56"), or the only separator and not
+    followed by exactly three digits ("12,99" but not "1,234"). Followed by
+    three digits, it is the decimal mark only if it is the storefront's
+    ``decimal`` mark.
+    """
+    for mark in _GROUPING:
+        token = token.replace(mark, "")
+    if not token:
+        return None
+    last = max(token.rfind("."), token.rfind(","))
+    dots, commas = token.count("."), token.count(",")
+    lone = dots + commas == 1 and (len(token) - last - 1 != 3 or token[last] == decimal)
+    is_decimal = last >= 0 and ((dots and commas) or lone)
+    digits = token.replace(".", "").replace(",", "")
+    return int(digits) / 10.0 ** (len(token) - last - 1 if is_decimal else 0)
+
+def _stars_and_scale(groups: Tuple[str, str, str, str]) -> Tuple[str, str]:
+    stars, scale, scale_first, stars_after = groups
+    return stars or stars_after or "", scale or scale_first or ""
+
+def _rating(stars: str, scale: str) -> Optional[float]:
+    if not stars:
+        return None
+    # Never above the scale
+    return min(float(stars.replace(",", ".")), float(scale.replace(",", ".")))
+
+def _count(token: str) -> Optional[int]:
+    digits = re.sub(r"\D", "", token)
+    return int(digits) if digits else None
+
+def parse_price(text: Optional[str], decimal: Optional[str] = None) -> Price:
+    """(value, high end of a range or None, currency symbol or code) of one price text."""
+    pre, low, post, high = _PRICE_LINE.match(_column([text])).groups()
+    if not low:
+        return None, None, pre or post
+    return _amount(low, decimal), _amount(high, decimal) if high else None, pre or post
+
+def parse_rating(text: Optional[str]) -> Optional[float]:
+    return _rating(*_stars_and_scale(_RATING_LINE.match(_column([text])).groups("")))
+
+def parse_count(text: Optional[str]) -> Optional[int]:
+    (token,) = _COUNT_LINE.match(_column([text])).groups()
+    return _count(token) if token else None
+
+@lru_cache(maxsize=None)
+def _numpy() -> Any:
+    # Imported on first use, as it adds a noticeable share of startup time
+    try:
+        import numpy
+    except ImportError:
+        logger.debug("NumPy is not installed; normalizing values one at a time")
+        return None
+    return numpy
+
+def _amounts(np: Any, tokens: List[str], decimal: Optional[str]) -> Any:
+    """``_amount`` for a whole column at once; NaN where a token is empty."""
+    column = np.array(tokens, dtype=str)
+    for mark in _GROUPING:
+        column = np.char.replace(column, mark, "")
+    length = np.char.str_len(column)
+    last = np.maximum(np.char.rfind(column, "."), np.char.rfind(column, ","))
+    dots, commas = np.char.count(column, "."), np.char.count(column, ",")
+    ambiguous = length - last - 1 == 3
+    if decimal == ".":
+        ambiguous &= dots == 0
+    elif decimal == ",":
+        ambiguous &= commas == 0
+    is_decimal = (last >= 0) & (((dots > 0) & (commas > 0)) | ((dots + commas == 1) & ~ambiguous))
+    digits = np.char.replace(np.char.replace(column, ".", ""), ",", "")
+    empty = length == 0
+    values = np.where(empty, "0", digits).astype(np.float64) / 10.0 ** np.where(is_decimal, length - last - 1, 0)
+    values[empty] = np.nan
+    return values
+
+def _floats(np: Any, tokens: List[str]) -> Any:
+    column = np.char.replace(np.array(tokens, dtype=str), ",", ".")
+    empty = np.char.str_len(column) == 0
+    return np.where(empty, "nan", column).astype(np.float64)
+
+def _optional(values: Any) -> List[Optional[float]]:
+    # NaN marks a missing value in the arrays; records hold None
+    return [None if value != value else value for value in values.tolist()]
+
+def parse_prices(texts: Sequence[Optional[str]], decimal: Optional[str] = None) -> List[Price]:
+    """
+    ``parse_price`` for a column of price texts in one pass: one regex scan
+    over the joined column, then the separator rules and number conversion
+    as NumPy array operations. Without NumPy the same rules run per value.
+    """
+    if not texts:
+        return []
+    rows = _PRICE_LINE.findall(_column(texts))
+    np = _numpy()
+    if np is None:
+        return [
+            (
+                _amount(low, decimal) if low else None,
+                _amount(high, decimal) if low and high else None,
+                pre or post or None,
+            )
+            for pre, low, post, high in rows
+        ]
+    pres, lows, posts, highs = (list(column) for column in zip(*rows))
+    values = _optional(_amounts(np, lows, decimal))
+    # Ranges are rare: convert only the rows that have a high end
+    ranged = [i for i, (low, high) in enumerate(zip(lows, highs)) if low and high]
+    ends: List[Optional[float]] = [None] * len(rows)
+    for i, end in zip(ranged, _optional(_amounts(np, [highs[i] for i in ranged], decimal)) if ranged else ()):
+        ends[i] = end
+    # findall gives "" for groups that did not take part in the match
+    return [(value, end, pre or post or None) for value, end, pre, post in zip(values, ends, pres, posts)]
+
+def parse_ratings(texts: Sequence[Optional[str]]) -> List[Optional[float]]:
+    """``parse_rating`` for a column of rating texts in one pass."""
+    if not texts:
+        return []
+    rows = [_stars_and_scale(groups) for groups in _RATING_LINE.findall(_column(texts))]
+    np = _numpy()
+    if np is None:
+        return [_rating(stars, scale) for stars, scale in rows]
+    stars, scales = (_floats(np, list(column)) for column in zip(*rows))
+    return _optional(np.minimum(stars, scales))
+
+def parse_counts(texts: Sequence[Optional[str]]) -> List[Optional[int]]:
+    """``parse_count`` for a column of review-count texts in one pass."""
+    if not texts:
+        return []
+    tokens = _COUNT_LINE.findall(_column(texts))
+    np = _numpy()
+    if np is None:
+        return [_count(token) if token else None for token in tokens]
+    column = np.array(tokens, dtype=str)
+    for mark in _GROUPING + (".", ","):
+        column = np.char.replace(column, mark, "")
+    length = np.char.str_len(column)
+    empty, overlong = length == 0, length > _INT64_DIGITS
+    counts = np.where(empty | overlong, "0", column).astype(np.int64).tolist()
+    for i in np.flatnonzero(overlong).tolist():
+        counts[i] = _count(tokens[i])
+    return [None if missing else count for missing, count in zip(empty.tolist(), counts)]
+
+def normalize_product(product: Product, decimal: Optional[str] = None) -> Product:
+    """
+    Fill the numeric fields of one product and its offers from their raw
+    text. ``decimal`` is the storefront's decimal mark, when known.
+    """
+    product.price_value, product.price_max, product.price_currency = parse_price(product.price_raw, decimal)
+    product.stars = parse_rating(product.stars_raw)
+    product.reviews_count = parse_count(product.reviews_raw)
+    for offer in product.offers or ():
+        offer.price_value, _, offer.price_currency = parse_price(offer.price_raw, decimal)
+    return product
+
+def normalize_products(products: Sequence[Product], decimal: Optional[str] = None) -> None:
+    """
+    ``normalize_product`` for a chunk of products at once: the prices of
+    the products and of all their offers form one column, ratings and
+    review counts one each.
+    """
+    with HISTOGRAMS.time("normalize_batch_seconds"):
+        _normalize_products(products, decimal)
+
+def _normalize_products(products: Sequence[Product], decimal: Optional[str]) -> None:
+    offers = [offer for product in products for offer in product.offers or ()]
+    prices = parse_prices(
+        [product.price_raw for product in products] + [offer.price_raw for offer in offers],
+        decimal,
+    )
+    for product, price in zip(products, prices):
+        product.price_value, product.price_max, product.price_currency = price
+    for offer, (value, _, currency) in zip(offers, prices[len(products):]):
+        offer.price_value, offer.price_currency = value, currency
+    for product, stars in zip(products, parse_ratings([product.stars_raw for product in products])):
+        product.stars = stars
+    for product, count in zip(products, parse_counts([product.reviews_raw for product in products])):
+        product.reviews_count = count
+
+def normalize_in_batches(
+    products: Iterable[Product],
+    batch_size: int,
+    decimal: Optional[str] = None,
+) -> Iterator[Product]:
+    """
+    Yield ``products`` after normalizing them ``batch_size`` at a time.
+
+    A product is held back until its batch is full (or the input ends), so
+    bigger batches save more work but delay each product a little longer.
+    """
+    batch: List[Product] = []
+    for product in products:
+        batch.append(product)
+        if len(batch) >= batch_size:
+            normalize_products(batch, decimal)
+            yield from batch
+            batch = []
+    if batch:
+        normalize_products(batch, decimal)
+        yield from batch
@@ -1,54 +1,45 @@
-thonimport logging
-from typing import Any, Dict, List, Optional
+import logging
+from typing import List
 
-from bs4 import BeautifulSoup, Tag
+from extractors.document import DEFAULT_BACKEND, Element, ParsedDocument, parse_document
+from extractors.records import Offer
 
 logger = logging.getLogger(__name__)
 
-def _parse_single_offer(offer_tag: Tag) -> Dict[str, Any]:
+def _parse_single_offer(doc: ParsedDocument, offer_tag: Element) -> Offer:
     price = None
     seller = None
     condition = None
 
-    price_span = offer_tag.find("span", {"class": "a-color-price"})
-    if price_span:
-        price_text = price_span.get_text(strip=True)
+    price_span = doc.find_in(offer_tag, "span", {"class": "a-color-price"})
+    if price_span is not None:
+        price_text = doc.text(price_span)
         price = price_text
 
-    seller_span = offer_tag.find("span", {"class": "a-size-small"})
-    if seller_span:
-        seller = seller_span.get_text(strip=True)
+    seller_span = doc.find_in(offer_tag, "span", {"class": "a-size-small"})
+    if seller_span is not None:
+        seller = doc.text(seller_span)
 
-    condition_span = offer_tag.find("span", {"class": "offer-condition"})
-    if condition_span:
-        condition = condition_span.get_text(strip=True)
+    condition_span = doc.find_in(offer_tag, "span", {"class": "offer-condition"})
+    if condition_span is not None:
+        condition = doc.text(condition_span)
 
-    offer: Dict[str, Any] = {
-        "price_raw": price,
-        "seller": seller,
-        "condition": condition,
-    }
-    return offer
+    return Offer(price_raw=price, seller=seller, condition=condition)
 
-def parse_offers(html: str) -> List[Dict[str, Any]]:
+def extract_offers(doc: ParsedDocument) -> List[Offer]:
     """
-    Parse offers from a product or offers-listing HTML page.
-
-    The function is liberal in what it accepts so that it works with both
-    real Amazon pages and synthetic HTML used in unit tests.
+    Extract offers from an already parsed product or offers-listing page.
     """
-    soup = BeautifulSoup(html, "lxml")
-
-    offers: List[Dict[str, Any]] = []
+    offers: List[Offer] = []
 
     # Common container for offers
-    offer_divs: List[Tag] = []
+    offer_divs: List[Element] = []
 
     # Custom "offer" class used in tests or simplified pages
-    offer_divs.extend(soup.find_all("div", {"class": "offer"}))
+    offer_divs.extend(doc.find_all("div", {"class": "offer"}))
 
     # Amazon offers listing examples:
-    offer_divs.extend(soup.find_all("div", {"class": "olpOffer"}))
+    offer_divs.extend(doc.find_all("div", {"class": "olpOffer"}))
 
     seen_ids = set()
     for tag in offer_divs:
@@ -58,14 +49,23 @@ def parse_offers(html: str) -> List[Dict[str, Any]]:
         seen_ids.add(key)
 
         try:
-            offer = _parse_single_offer(tag)
+            offer = _parse_single_offer(doc, tag)
         except Exception as exc:  # pragma: no cover - defensive
             logger.warning("Failed to parse offer: %s", exc)
             continue
 
         # Filter out empty offers (no price and seller)
-        if any(offer.values()):
+        if offer.price_raw or offer.seller or offer.condition:
             offers.append(offer)
 
     logger.debug("Parsed %d offers", len(offers))
-    return offers
\ No newline at end of file
+    return offers
+
+def parse_offers(html: str, backend: str = DEFAULT_BACKEND) -> List[Offer]:
+    """
+    Parse offers from a product or offers-listing HTML page.
+
+    The function is liberal in what it accepts so that it works with both
+    real Amazon pages and synthetic HTML used in unit tests.
+    """
+    return extract_offers(parse_document(html, backend=backend))
@@ -0,0 +1,74 @@
+import logging
+from typing import Iterable, Optional
+
+from extractors.amazon_parser import extract_product
+from extractors.document import DEFAULT_BACKEND, parse_document
+from extractors.normalize import normalize_product
+from extractors.offer_extractor import extract_offers
+from extractors.prefilter import prefilter_html
+from extractors.records import Product
+from metrics.histograms import HISTOGRAMS
+
+logger = logging.getLogger(__name__)
+
+# Fields that trigger a full re-parse when a restricted parse leaves them empty
+DEFAULT_FALLBACK_FIELDS = ("title", "price_raw")
+
+def parse_page(
+    html: str,
+    asin: Optional[str] = None,
+    url: Optional[str] = None,
+    backend: str = DEFAULT_BACKEND,
+    prefilter: str = "none",
+    fallback_fields: Optional[Iterable[str]] = DEFAULT_FALLBACK_FIELDS,
+    normalize: bool = True,
+    decimal: Optional[str] = None,
+) -> Product:
+    """
+    Parse a product page into a ``Product`` record with its ``offers``.
+
+    ``prefilter`` shrinks the HTML before the tree is built (see
+    ``extractors.prefilter``). If that leaves any of ``fallback_fields``
+    empty, the page is parsed again in full; pass ``None`` to disable the
+    fallback. Offer extraction failures are logged and yield no offers.
+    With ``normalize=False`` prices, ratings and review counts are left as
+    raw text for ``extractors.normalize.normalize_products`` to convert a
+    batch of products at once. ``decimal`` is the storefront's decimal mark
+    ("." or ","), when known.
+    """
+    product = _parse_once(html, asin, url, backend, prefilter)
+    if prefilter != "none" and fallback_fields:
+        missing = [name for name in fallback_fields if product.get(name) in (None, "")]
+        if missing:
+            logger.debug(
+                "Prefiltered parse of %s left %s empty; parsing the full page",
+                asin,
+                ", ".join(missing),
+            )
+            product = _parse_once(html, asin, url, backend, "none")
+    if normalize:
+        with HISTOGRAMS.time("parse_normalize_seconds"):
+            normalize_product(product, decimal)
+    return product
+
+def _parse_once(
+    html: str,
+    asin: Optional[str],
+    url: Optional[str],
+    backend: str,
+    prefilter: str,
+) -> Product:
+    with HISTOGRAMS.time("parse_document_seconds"):
+        doc = parse_document(prefilter_html(html, prefilter), backend=backend)
+    with HISTOGRAMS.time("parse_product_seconds"):
+        product = extract_product(doc, asin=asin, url=url, normalize=False)
+
+    try:
+        with HISTOGRAMS.time("parse_offers_seconds"):
+            offers = extract_offers(doc)
+    except Exception as exc:
+        logger.warning("Failed to parse offers for ASIN %s: %s", asin, exc)
+        offers = []
+
+    product.offers = offers
+    return product
@@ -0,0 +1,96 @@
+import logging
+from typing import Tuple
+
+from metrics.counters import COUNTERS
+
+logger = logging.getLogger(__name__)
+
+PRODUCT = "product"
+CAPTCHA = "captcha"
+NOT_FOUND = "not_found"
+ERROR = "error"
+PAGE_KINDS = (PRODUCT, CAPTCHA, NOT_FOUND, ERROR)
+
+# Amazon's interstitials carry their tell-tale markup near the top, so only
+# this much of a page is looked at, whatever its size
+_SNIFF_CHARS = 64 * 1024
+
+# Lowercase markers per kind, checked in this order
+_MARKERS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    (
+        CAPTCHA,
+        (
+            "/errors/validatecaptcha",
+            "captchacharacters",
+            "enter the characters you see below",
+            "type the characters you see in this image",
+            "<title>robot check</title>",
+            "api-services-support@amazon.com",
+        ),
+    ),
+    (
+        NOT_FOUND,
+        (
+            "ref=cs_404_logo",
+            "ref=cs_404_link",
+            "dogsofamazon",
+            "the web address you entered is not a functioning page",
+            "<title>page not found</title>",
+        ),
+    ),
+    (
+        ERROR,
+        (
+            "ref=cs_503_logo",
+            "ref=cs_503_link",
+            "sorry! something went wrong!",
+            "503 - service unavailable error",
+        ),
+    ),
+)
+
+# The HTTP status each kind of page stands in for, so retry and throttling
+# treat a captcha like a 503 and a "dogs of Amazon" page like a 404
+_STATUS_FOR = {CAPTCHA: 503, NOT_FOUND: 404, ERROR: 500}
+
+def classify_page(html: str) -> str:
+    """
+    Tell a product page from a captcha, not-found or error page without
+    parsing it.
+
+    Only the first 64 KiB are scanned for fixed markers, so this costs the
+    same for a 1 MB product page as for a 5 KB robot check. Pages with no
+    marker count as product pages and are left to the parser.
+    """
+    if not html or not html.strip():
+        return ERROR
+    head = html[:_SNIFF_CHARS].lower()
+    for kind, markers in _MARKERS:
+        for marker in markers:
+            if marker in head:
+                return kind
+    return PRODUCT
+
+class NonProductPage(Exception):
+    """
+    Raised when a fetch returns a captcha, not-found or error page.
+
+    ``status`` is the HTTP status the page stands in for, which is what
+    retry classification and throttling look at.
+    """
+
+    def __init__(self, kind: str, url: str = "") -> None:
+        super().__init__(f"{kind.replace('_', '-')} page at {url}" if url else f"{kind} page")
+        self.kind = kind
+        self.status = _STATUS_FOR.get(kind, 500)
+
+def check_page(html: str, url: str = "") -> str:
+    """
+    Classify a fetched page and count it under ``pages.<kind>``; returns
+    ``html`` for a product page and raises ``NonProductPage`` otherwise.
+    """
+    kind = classify_page(html)
+    COUNTERS.inc(f"pages.{kind}")
+    if kind != PRODUCT:
+        raise NonProductPage(kind, url)
+    return html
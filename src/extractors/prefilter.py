@@ -0,0 +1,144 @@
+import logging
+import re
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFILTER_MODES = ("none", "strip", "sections")
+
+# Markup none of the extractors read, as (opening, closing) markers. Scripts
+# and styles are the bulk of a real product page.
+_NOISE_BLOCKS = (("<script", "</script"), ("<style", "</style"), ("<!--", "-->"))
+
+# Regions the extractors look in, addressed by id, data-hook or image name
+_SECTION_IDS = (
+    # title
+    "productTitle", "title", "titleSection",
+    # brand
+    "bylineInfo", "brand", "brandRow", "productOverview_feature_div",
+    "detailBullets_feature_div", "productDetails_feature_div",
+    "productDetails_techSpec_section_1", "productDetails_detailBullets_sections1",
+    # image
+    "imgTagWrapperId", "landingImage", "main-image-container",
+    # price
+    "priceblock_ourprice", "priceblock_dealprice", "price_inside_buybox",
+    "corePrice_feature_div", "corePriceDisplay_desktop_feature_div", "apex_desktop",
+    # description and breadcrumbs
+    "feature-bullets", "productDescription", "wayfinding-breadcrumbs_feature_div",
+    # reviews
+    "averageCustomerReviews", "acrPopover", "acrCustomerReviewText",
+    "rating-out-of-text", "total-review-count",
+    # offers
+    "aod-container", "aod-offer-list", "olpOfferList",
+)
+
+_ATTR_VALUE = r"\s*=\s*[\"']?({values})(?=[\"'\s/>])"
+_SECTION_START_RE = re.compile(
+    r"<([a-zA-Z][\w-]*)\b[^>]*?\s(?:id|data-hook|data-a-image-name)"
+    + _ATTR_VALUE.format(values="|".join(re.escape(v) for v in _SECTION_IDS)),
+)
+# Offer containers and breadcrumb lists, addressed by class
+_CLASS_START_RE = re.compile(r"<(div|ul)\b[^>]*?\sclass\s*=\s*[\"']([^\"']*)[\"']", re.I)
+_OFFER_CLASSES = frozenset({"offer", "olpOffer"})
+_TITLE_RE = re.compile(r"<title\b[^>]*>.*?</title\s*>", re.I | re.S)
+
+_VOID_TAGS = frozenset({"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"})
+
+def strip_noise(html: str) -> str:
+    """
+    Drop ``<script>``, ``<style>`` and comments before the tree is built.
+
+    Each block is replaced by an empty comment rather than nothing, so the
+    text on either side stays two separate strings and ``get_text`` output
+    is unchanged.
+    """
+    # Plain substring searches on a lowercased copy are far cheaper than a
+    # regex walking every character of a 1 MB page
+    lowered = html.lower()
+    parts: List[str] = []
+    pos = 0
+    # Next occurrence of each opening marker, refreshed only once passed
+    next_open = [lowered.find(opening) for opening, _ in _NOISE_BLOCKS]
+    while True:
+        start, close = -1, ""
+        for i, (opening, closing) in enumerate(_NOISE_BLOCKS):
+            if -1 < next_open[i] < pos:
+                next_open[i] = lowered.find(opening, pos)
+            found = next_open[i]
+            if found != -1 and (start == -1 or found < start):
+                start, close = found, closing
+        if start == -1:
+            break
+        end = lowered.find(close, start + 4)
+        end = len(html) if end == -1 else lowered.find(">", end)
+        end = len(html) if end == -1 else end + 1
+        parts.append(html[pos:start])
+        parts.append("<!---->")
+        pos = end
+    parts.append(html[pos:])
+    return "".join(parts)
+
+def _region_end(html: str, tag: str, start_tag_end: int) -> int:
+    if tag.lower() in _VOID_TAGS:
+        return start_tag_end
+    depth = 1
+    pattern = re.compile(rf"<(/?){re.escape(tag)}\b[^>]*>", re.I)
+    for match in pattern.finditer(html, start_tag_end):
+        if match.group(0).endswith("/>"):
+            continue
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return match.end()
+    return len(html)
+
+def slice_sections(html: str) -> str:
+    """
+    Cut the regions the extractors read out of ``html``.
+
+    Scripts and styles are stripped first, then every element whose id or
+    ``data-hook`` is a known product section, and every offer container and
+    breadcrumb list, is copied in document order into a minimal page together with ``<title>``.
+    Selectors that search the whole page (e.g. the ``a-offscreen`` price or
+    the brand ``<th>``) only see what survives, so callers should fall back
+    to a full parse when a field comes back empty.
+    """
+    html = strip_noise(html)
+
+    starts: List[Tuple[int, str, int]] = []
+    for match in _SECTION_START_RE.finditer(html):
+        starts.append((match.start(), match.group(1), match.end()))
+    for match in _CLASS_START_RE.finditer(html):
+        tag, classes = match.group(1).lower(), match.group(2)
+        if tag == "div" and _OFFER_CLASSES.intersection(classes.split()):
+            starts.append((match.start(), tag, match.end()))
+        elif tag == "ul" and "breadcrumbs" in classes.lower():
+            starts.append((match.start(), tag, match.end()))
+    starts.sort()
+
+    parts: List[str] = []
+    covered = -1
+    for start, tag, match_end in starts:
+        if start < covered:
+            # Nested inside a region we already copied
+            continue
+        tag_end = html.find(">", match_end)
+        if tag_end == -1:
+            continue
+        end = _region_end(html, tag, tag_end + 1)
+        parts.append(html[start:end])
+        covered = end
+
+    title = _TITLE_RE.search(html)
+    head = title.group(0) if title else ""
+    sliced = f"<html><head>{head}</head><body>\n" + "\n".join(parts) + "\n</body></html>"
+    logger.debug("Sliced page from %d to %d characters", len(html), len(sliced))
+    return sliced
+
+def prefilter_html(html: str, mode: str) -> str:
+    if mode == "none":
+        return html
+    if mode == "strip":
+        return strip_noise(html)
+    if mode == "sections":
+        return slice_sections(html)
+    raise ValueError(f"Unsupported prefilter mode '{mode}'. Valid: {list(PREFILTER_MODES)}")
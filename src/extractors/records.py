@@ -0,0 +1,181 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+class Record(Mapping):
+    """
+    Base for parsed records: fixed ``__slots__`` instead of a dict per
+    record, so a product costs a few pointers per field rather than a hash
+    table with its own copy of every key.
+
+    Records read like the dicts they replace, under the export keys
+    (``record["price.value"]``, ``record.get("title")``), and ``to_dict``
+    gives the exact export shape. Fields listed in ``_OPTIONAL`` are left
+    out of both while they are None, as the dicts never had them.
+    """
+
+    __slots__ = ()
+
+    # (export key, attribute) per field, in export order
+    _FIELDS: Tuple[Tuple[str, str], ...] = ()
+    _OPTIONAL: Tuple[str, ...] = ()
+    _ATTRS: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._ATTRS = dict(cls._FIELDS)
+
+    def __getitem__(self, key: str) -> Any:
+        attr = self._ATTRS.get(key)
+        if attr is None:
+            raise KeyError(key)
+        value = getattr(self, attr)
+        if value is None and key in self._OPTIONAL:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key, attr in self._FIELDS:
+            if key not in self._OPTIONAL or getattr(self, attr) is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is type(self):
+            return all(getattr(self, attr) == getattr(other, attr) for _, attr in self._FIELDS)
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{attr}={getattr(self, attr)!r}" for _, attr in self._FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as a plain dict in the export shape, nested records included."""
+        return {key: to_plain(self[key]) for key in self}
+
+def to_plain(value: Any) -> Any:
+    """``value`` with any records in it (also in lists) turned into dicts."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_plain(item) for item in value]
+    return value
+
+def json_default(value: Any) -> Any:
+    """``default`` for ``json.dumps``: serializes records as their dicts."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class Offer(Record):
+    """One seller's offer from a product or offers-listing page."""
+
+    __slots__ = ("price_raw", "seller", "condition", "price_value", "price_currency")
+
+    _FIELDS = (
+        ("price_raw", "price_raw"),
+        ("seller", "seller"),
+        ("condition", "condition"),
+        ("price.value", "price_value"),
+        ("price_currency", "price_currency"),
+    )
+
+    def __init__(
+        self,
+        price_raw: Optional[str] = None,
+        seller: Optional[str] = None,
+        condition: Optional[str] = None,
+        price_value: Optional[float] = None,
+        price_currency: Optional[str] = None,
+    ) -> None:
+        self.price_raw = price_raw
+        self.seller = seller
+        self.condition = condition
+        self.price_value = price_value
+        self.price_currency = price_currency
+
+class Product(Record):
+    """
+    The fields parsed from a product page. ``offers`` is None until offers
+    are extracted (``extract_product`` alone), and only then appears as a key;
+    ``price_max`` only for range prices ("$10.99 - $24.99").
+
+    ``stars_raw`` and ``reviews_raw`` keep the page text the numeric fields
+    are normalized from (see ``extractors.normalize``). They are not exported.
+    """
+
+    __slots__ = (
+        "asin",
+        "url",
+        "title",
+        "brand",
+        "thumbnail_image",
+        "price_raw",
+        "price_value",
+        "price_max",
+        "price_currency",
+        "stars",
+        "reviews_count",
+        "description",
+        "bread_crumbs",
+        "offers",
+        "stars_raw",
+        "reviews_raw",
+    )
+
+    _FIELDS = (
+        ("asin", "asin"),
+        ("url", "url"),
+        ("title", "title"),
+        ("brand", "brand"),
+        ("thumbnailImage", "thumbnail_image"),
+        ("price_raw", "price_raw"),
+        ("price.value", "price_value"),
+        ("price.max", "price_max"),
+        ("price_currency", "price_currency"),
+        ("stars", "stars"),
+        ("reviewsCount", "reviews_count"),
+        ("description", "description"),
+        ("breadCrumbs", "bread_crumbs"),
+        ("offers", "offers"),
+    )
+    _OPTIONAL = ("price.max", "offers")
+
+    def __init__(
+        self,
+        asin: Optional[str] = None,
+        url: Optional[str] = None,
+        title: Optional[str] = None,
+        brand: Optional[str] = None,
+        thumbnail_image: Optional[str] = None,
+        price_raw: Optional[str] = None,
+        price_value: Optional[float] = None,
+        price_currency: Optional[str] = None,
+        stars: Optional[float] = None,
+        reviews_count: Optional[int] = None,
+        description: Optional[str] = None,
+        bread_crumbs: Optional[str] = None,
+        offers: Optional[List[Offer]] = None,
+        price_max: Optional[float] = None,
+        stars_raw: Optional[str] = None,
+        reviews_raw: Optional[str] = None,
+    ) -> None:
+        self.asin = asin
+        self.url = url
+        self.title = title
+        self.brand = brand
+        self.thumbnail_image = thumbnail_image
+        self.price_raw = price_raw
+        self.price_value = price_value
+        self.price_currency = price_currency
+        self.stars = stars
+        self.reviews_count = reviews_count
+        self.description = description
+        self.bread_crumbs = bread_crumbs
+        self.offers = offers
+        self.price_max = price_max
+        self.stars_raw = stars_raw
+        self.reviews_raw = reviews_raw
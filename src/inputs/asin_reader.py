@@ -0,0 +1,161 @@
+import logging
+import re
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+from metrics.counters import COUNTERS
+
+logger = logging.getLogger(__name__)
+
+_ASIN_RE = re.compile(r"[A-Z0-9]{10}")
+# Product links: /dp/<ASIN>, /gp/product/<ASIN> and the mobile /gp/aw/d/<ASIN>
+_URL_ASIN_RE = re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Za-z0-9]{10})(?:[/?#&;]|$)")
+
+# Invalid lines are logged individually up to this many per file
+_MAX_LOGGED_INVALID = 20
+
+def normalize_asin(value: str) -> Optional[str]:
+    """
+    The ASIN in an input line: a bare ASIN in any case or a product URL.
+
+    Returns None when there is no well-formed ASIN.
+    """
+    value = value.strip()
+    if "/" in value:
+        match = _URL_ASIN_RE.search(value)
+        if match is None:
+            return None
+        value = match.group(1)
+    value = value.upper()
+    return value if _ASIN_RE.fullmatch(value) else None
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse ``"i/N"`` (0 <= i < N) into ``(i, N)``."""
+    try:
+        index_text, count_text = spec.split("/")
+        index, count = int(index_text), int(count_text)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}'; expected i/N, e.g. 0/4") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}'; need 0 <= i < N")
+    return index, count
+
+def shard_of(asin: str, count: int) -> int:
+    """
+    The shard ``asin`` belongs to out of ``count``.
+
+    CRC-32 rather than ``hash()``, which is salted per process, so every
+    machine puts every ASIN in the same shard.
+    """
+    return zlib.crc32(asin.encode("ascii")) % count
+
+class AsinSet:
+    """
+    Set of ASINs stored as 64-bit integers in an open-addressing table.
+
+    An ASIN is a 10-digit base-36 number (below 2**52), kept plus one so
+    that 0 marks an empty slot. The table doubles at half full, so it costs
+    16 to 32 bytes per ASIN, against well over 100 for a ``set`` of
+    strings; ten million ASINs fit in about 256 MB at worst.
+    """
+
+    # Fibonacci hashing: multiply by 2**64 / golden ratio, keep the top bits
+    _MULTIPLIER = 0x9E3779B97F4A7C15
+    _MASK64 = (1 << 64) - 1
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        self._bits = max(4, (max(1, capacity) - 1).bit_length())
+        self._table = array("q", bytes(8 << self._bits))
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, key: int) -> int:
+        bits = self._bits
+        mask = (1 << bits) - 1
+        slot = ((key * self._MULTIPLIER) & self._MASK64) >> (64 - bits)
+        table = self._table
+        value = table[slot]
+        while value and value != key:
+            slot = (slot + 1) & mask
+            value = table[slot]
+        return slot
+
+    def add(self, asin: str) -> bool:
+        """Add ``asin``; returns False if it was already there."""
+        key = int(asin, 36) + 1
+        table = self._table
+        slot = self._slot(key)
+        if table[slot]:
+            return False
+        table[slot] = key
+        self._size += 1
+        if self._size * 2 > len(table):
+            self._grow()
+        return True
+
+    def __contains__(self, asin: str) -> bool:
+        return bool(self._table[self._slot(int(asin, 36) + 1)])
+
+    def _grow(self) -> None:
+        old = self._table
+        self._bits += 1
+        self._table = array("q", bytes(8 << self._bits))
+        slot_of = self._slot
+        table = self._table
+        for key in old:
+            if key:
+                table[slot_of(key)] = key
+
+def clean_asins(
+    lines: Iterable[str],
+    shard: Optional[Tuple[int, int]] = None,
+    source: str = "input",
+) -> Iterator[str]:
+    """
+    Yield the valid, distinct ASINs in ``lines``, in first-seen order.
+
+    Blank lines and ``#`` comments are skipped; invalid lines are counted
+    under ``asins.invalid`` and duplicates under ``asins.duplicate``. With
+    ``shard=(i, N)`` only the ASINs of shard ``i`` are yielded, so N
+    machines can each take one shard of the same file.
+    """
+    seen = AsinSet()
+    invalid = duplicates = 0
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        asin = normalize_asin(text)
+        if asin is None:
+            invalid += 1
+            if invalid <= _MAX_LOGGED_INVALID:
+                logger.warning("%s line %d: no valid ASIN in %r", source, number, text[:100])
+            continue
+        if shard is not None and shard_of(asin, shard[1]) != shard[0]:
+            continue
+        if not seen.add(asin):
+            duplicates += 1
+            continue
+        yield asin
+    if invalid:
+        COUNTERS.inc("asins.invalid", invalid)
+        logger.warning("%s: skipped %d lines without a valid ASIN", source, invalid)
+    if duplicates:
+        COUNTERS.inc("asins.duplicate", duplicates)
+        logger.info("%s: skipped %d duplicate ASINs", source, duplicates)
+
+def read_asin_file(input_path: Path, shard: Optional[Tuple[int, int]] = None) -> Iterator[str]:
+    """``clean_asins`` over a file, read one line at a time."""
+    if not input_path.is_file():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    def lines() -> Iterator[str]:
+        # utf-8-sig: feeds exported from spreadsheets often start with a BOM
+        with input_path.open("r", encoding="utf-8-sig") as f:
+            yield from clean_asins(f, shard, source=str(input_path))
+
+    return lines()
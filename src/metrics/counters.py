@@ -0,0 +1,29 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+class Counters:
+    """Thread-safe named counters for a run, e.g. ``pages.captcha``."""
+
+    def __init__(self) -> None:
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._counts[name]
+
+    def snapshot(self, prefix: str = "") -> Dict[str, int]:
+        with self._lock:
+            return {name: count for name, count in self._counts.items() if name.startswith(prefix)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+# Shared by the engines of the current process; ``run`` resets it per run
+COUNTERS = Counters()
@@ -0,0 +1,118 @@
+import io
+import logging
+import threading
+import tracemalloc
+import zlib
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc frames kept per allocation; more is slower
+_TRACE_FRAMES = 5
+
+class SamplingProfiler:
+    """
+    cProfile and tracemalloc for every ``every``-th ASIN.
+
+    Whether an ASIN is sampled depends on a hash of the ASIN alone, so
+    its fetch and its parse are both profiled even when they run on
+    different threads. cProfile sees only the sampled thread; tracemalloc
+    runs while any sample is open and sees every thread, so with many
+    workers its numbers include their allocations too. Parsing in pipeline
+    worker processes is not profiled. ``every=0`` turns it off.
+    """
+
+    def __init__(self, every: int = 0) -> None:
+        self.configure(every)
+
+    def configure(self, every: int) -> None:
+        self.every = max(0, int(every))
+        self.samples = 0
+        # pstats.Stats merging every sample's profile
+        self._stats: Any = None
+        self._open = 0
+        # (peak bytes, asin, stage) per sample
+        self._peaks: List[Tuple[int, str, str]] = []
+        self._largest: Optional[tracemalloc.Snapshot] = None
+        self._largest_peak = -1
+        self._lock = threading.Lock()
+
+    def sampled(self, asin: str) -> bool:
+        return bool(self.every) and zlib.crc32(asin.encode("utf-8")) % self.every == 0
+
+    def sample(self, asin: str, stage: str) -> ContextManager[None]:
+        """Profile the ``with`` block if ``asin`` is sampled; free otherwise."""
+        if not self.sampled(asin):
+            return nullcontext()
+        return self._profile(asin, stage)
+
+    @contextmanager
+    def _profile(self, asin: str, stage: str) -> Iterator[None]:
+        # Loaded on the first sample; most runs never profile
+        import cProfile
+        import pstats
+
+        with self._lock:
+            if not self._open and not tracemalloc.is_tracing():
+                tracemalloc.start(_TRACE_FRAMES)
+            self._open += 1
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            profiling = True
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process
+            profiling = False
+        try:
+            yield
+        finally:
+            if profiling:
+                profile.disable()
+            with self._lock:
+                _, peak = tracemalloc.get_traced_memory()
+                self._peaks.append((peak, asin, stage))
+                if peak > self._largest_peak:
+                    self._largest_peak = peak
+                    self._largest = tracemalloc.take_snapshot()
+                self._open -= 1
+                if not self._open:
+                    tracemalloc.stop()
+                if profiling:
+                    if self._stats is None:
+                        self._stats = pstats.Stats(profile)
+                    else:
+                        self._stats.add(profile)
+                self.samples += 1
+
+    def report(self, output_dir: Path, top: int = 30) -> Optional[Path]:
+        """
+        Write the merged profile to ``profile.pstats`` and a readable summary
+        to ``profile.txt`` in ``output_dir``; returns the summary's path.
+        """
+        with self._lock:
+            if not self.samples:
+                return None
+            output_dir.mkdir(parents=True, exist_ok=True)
+            summary = io.StringIO()
+            summary.write(f"{self.samples} samples, one ASIN in {self.every}\n\n")
+            if self._stats is not None:
+                self._stats.dump_stats(str(output_dir / "profile.pstats"))
+                self._stats.stream = summary
+                self._stats.sort_stats("cumulative").print_stats(top)
+            summary.write("Peak traced memory per sample (largest first):\n")
+            for peak, asin, stage in sorted(self._peaks, reverse=True)[:top]:
+                summary.write(f"  {peak / 1e6:8.1f} MB  {asin} {stage}\n")
+            if self._largest is not None:
+                summary.write("\nLargest allocations by line in the sample with the highest peak:\n")
+                for stat in self._largest.statistics("lineno")[:top]:
+                    summary.write(f"  {stat}\n")
+        path = output_dir / "profile.txt"
+        path.write_text(summary.getvalue(), encoding="utf-8")
+        logger.info("Profile of %d sampled ASINs written to %s", self.samples, path)
+        return path
+
+# Shared by the engines of the current process; ``run`` configures it per run
+PROFILER = SamplingProfiler()
@@ -0,0 +1,217 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics.counters import COUNTERS, Counters
+from metrics.histograms import HISTOGRAMS, Histogram, Histograms
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "amazon_scraper"
+
+# Counter families whose second part becomes a label, e.g. errors.timeout
+# -> amazon_scraper_errors_total{class="timeout"}
+_LABELS = {"errors": "class", "pages": "kind", "asins": "kind", "products": "marketplace", "monitor": "outcome"}
+
+def _metric_name(name: str) -> str:
+    return f"{PREFIX}_{name.replace('.', '_').replace('-', '_')}"
+
+def render_prometheus(
+    counters: Dict[str, int],
+    histograms: Dict[str, Histogram],
+    gauges: Dict[str, float],
+) -> str:
+    """Counters, histograms and gauges in the Prometheus text exposition format."""
+    lines: List[str] = []
+    families: Dict[str, List[str]] = {}
+    for name, value in sorted(counters.items()):
+        family, _, rest = name.partition(".")
+        if family in _LABELS and rest:
+            families.setdefault(_metric_name(family) + "_total", []).append(
+                f'{_metric_name(family)}_total{{{_LABELS[family]}="{rest}"}} {value}'
+            )
+        else:
+            families.setdefault(_metric_name(name) + "_total", []).append(f"{_metric_name(name)}_total {value}")
+    for metric, samples in families.items():
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(samples)
+    for name, histogram in sorted(histograms.items()):
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+        lines.append(f"{metric}_sum {histogram.sum:.6f}")
+        lines.append(f"{metric}_count {histogram.count}")
+    for name, value in sorted(gauges.items()):
+        lines.append(f"# TYPE {_metric_name(name)} gauge")
+        lines.append(f"{_metric_name(name)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+def _format_seconds(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "inf"
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:g}s"
+
+class StatsReporter:
+    """
+    Live view of a run: every ``interval`` seconds, logs a progress line
+    and publishes every metric in Prometheus text format.
+
+    The text is rewritten atomically to ``path`` (suitable for the node
+    exporter's textfile collector) and, with ``port``, served at
+    ``/metrics`` on localhost. The progress line shows throughput, fetches
+    in flight, latency and parse-time percentiles, error classes and the
+    process's CPU use: a slow run with low CPU and high fetch latency is
+    network-bound, one near 100% of a core per parse worker is CPU-bound.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        port: Optional[int] = None,
+        interval: float = 10.0,
+        counters: Counters = COUNTERS,
+        histograms: Histograms = HISTOGRAMS,
+    ) -> None:
+        self.path = path
+        self.port = port
+        self.interval = float(interval)
+        self.counters = counters
+        self.histograms = histograms
+        self.text = ""
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # http.server.ThreadingHTTPServer when serving /metrics
+        self._server: Any = None
+        self._started = time.monotonic()
+        # Time, CPU seconds and counters at the previous snapshot, for rates
+        self._last: Tuple[float, float, Dict[str, int]] = (self._started, self._cpu_seconds(), {})
+
+    @staticmethod
+    def _cpu_seconds() -> float:
+        times = os.times()
+        return times.user + times.system + times.children_user + times.children_system
+
+    def snapshot(self) -> str:
+        """Compute the current metrics, log a progress line and publish them."""
+        now, cpu = time.monotonic(), self._cpu_seconds()
+        counters = self.counters.snapshot()
+        histograms = self.histograms.snapshot()
+        last_time, last_cpu, last_counters = self._last
+        self._last = (now, cpu, counters)
+        elapsed = max(now - last_time, 1e-9)
+
+        def rate(name: str) -> float:
+            return (counters.get(name, 0) - last_counters.get(name, 0)) / elapsed
+
+        gauges = {
+            "fetch_in_flight": counters.get("fetch.started", 0) - counters.get("fetch.finished", 0),
+            "fetch_pages_per_second": round(rate("fetch.finished"), 3),
+            "export_records_per_second": round(rate("export.records"), 3),
+            "fetch_bytes_per_second": round(rate("fetch.bytes"), 1),
+            "process_cpu_ratio": round((cpu - last_cpu) / elapsed, 3),
+            "uptime_seconds": round(now - self._started, 1),
+        }
+        self.text = render_prometheus(counters, histograms, gauges)
+        self._log_progress(counters, histograms, gauges)
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(self.text, encoding="utf-8")
+            os.replace(tmp, self.path)
+        return self.text
+
+    def _log_progress(
+        self,
+        counters: Dict[str, int],
+        histograms: Dict[str, Histogram],
+        gauges: Dict[str, float],
+    ) -> None:
+        parts = [
+            f"{counters.get('fetch.finished', 0)} fetched ({gauges['fetch_pages_per_second']:.1f}/s)",
+            f"{gauges['fetch_in_flight']:.0f} in flight",
+            f"{counters.get('export.records', 0)} exported ({gauges['export_records_per_second']:.1f}/s)",
+            f"{gauges['fetch_bytes_per_second'] / 1e6:.1f} MB/s",
+            f"CPU {gauges['process_cpu_ratio']:.0%}",
+        ]
+        for name in ("fetch_seconds", "parse_seconds"):
+            histogram = histograms.get(name)
+            if histogram is not None and histogram.count:
+                parts.append(
+                    f"{name.split('_')[0]} p50 {_format_seconds(histogram.quantile(0.5))} "
+                    f"p95 {_format_seconds(histogram.quantile(0.95))}"
+                )
+        errors = {name[len("errors."):]: count for name, count in counters.items() if name.startswith("errors.")}
+        if errors:
+            parts.append("errors " + " ".join(f"{kind}={count}" for kind, count in sorted(errors.items())))
+        logger.info("Progress: %s", ", ".join(parts))
+
+    @property
+    def server_port(self) -> Optional[int]:
+        """The port actually bound, which differs from ``port`` when that is 0."""
+        return self._server.server_address[1] if self._server is not None else None
+
+    def _serve(self) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        reporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                # Before the first snapshot there are no rates yet
+                text = reporter.text or render_prometheus(
+                    reporter.counters.snapshot(), reporter.histograms.snapshot(), {}
+                )
+                body = text.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", int(self.port or 0)), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info("Serving metrics at http://127.0.0.1:%d/metrics", self._server.server_address[1])
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.snapshot()
+            except Exception as exc:  # pragma: no cover - never kill the run over metrics
+                logger.warning("Failed to publish metrics: %s", exc)
+
+    def start(self) -> "StatsReporter":
+        if self.port is not None:
+            self._serve()
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._loop, name="stats", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.snapshot()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "StatsReporter":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
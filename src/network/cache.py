@@ -0,0 +1,155 @@
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+# Fraction of max_bytes left after an eviction pass
+_EVICT_TO = 0.9
+
+class CachedPage(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    # Younger than the TTL: usable without asking the server
+    fresh: bool
+
+def cache_key(marketplace: str, base_url: str, asin: str) -> str:
+    return f"{marketplace}|{base_url.rstrip('/')}|{asin}"
+
+def conditional_headers(page: Optional[CachedPage]) -> Dict[str, str]:
+    """Revalidation headers for a stale ``page``, if the server gave validators."""
+    headers: Dict[str, str] = {}
+    if page is not None:
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+    return headers
+
+class ResponseCache:
+    """
+    Persistent cache of product page bodies in a single SQLite file.
+
+    Bodies are stored zlib-compressed along with their ``ETag`` and
+    ``Last-Modified`` validators. Entries younger than ``ttl_seconds`` are
+    served as is; older ones stay in the cache so they can be revalidated
+    with a conditional request. Once the compressed bodies pass
+    ``max_bytes``, the least recently used entries are evicted. Safe to
+    share between fetch threads.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float = 86400, max_bytes: int = 1 << 30) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> Optional[CachedPage]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (now, key))
+        body, etag, last_modified, fetched_at = row
+        fresh = now - fetched_at < self.ttl_seconds
+        return CachedPage(zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched_at, fresh)
+
+    def store(
+        self,
+        key: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        compressed = zlib.compress(body.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(key, body, size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), etag, last_modified, now, now),
+            )
+            self._total_bytes += len(compressed) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def refresh(self, key: str) -> None:
+        """Mark ``key`` as fetched now, after the server answered 304."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+
+    def _evict(self) -> None:
+        # Evict down to a low-water mark so the next stores do not each pay
+        # for another eviction pass
+        target = int(self.max_bytes * _EVICT_TO)
+        evicted = 0
+        self._conn.execute("BEGIN")
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT key, size FROM pages ORDER BY accessed_at LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                if self._total_bytes <= target:
+                    break
+                victims.append((key,))
+                self._total_bytes -= size
+            self._conn.executemany("DELETE FROM pages WHERE key = ?", victims)
+            evicted += len(victims)
+        self._conn.execute("COMMIT")
+        logger.debug("Evicted %d cached pages; cache holds %d bytes", evicted, self._total_bytes)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        logger.info("Response cache: %d hits, %d misses", self.hits, self.misses)
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,65 @@
+import logging
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACCEPT_LANGUAGE = "en-US,en;q=0.9"
+
+class Marketplace(NamedTuple):
+    base_url: str
+    accept_language: str
+    # Decimal mark of the storefront's prices: settles "1.234" and "1,234"
+    decimal: str
+
+MARKETPLACES: Dict[str, Marketplace] = {
+    "US": Marketplace("https://www.amazon.com", DEFAULT_ACCEPT_LANGUAGE, "."),
+    "UK": Marketplace("https://www.amazon.co.uk", "en-GB,en;q=0.9", "."),
+    "CA": Marketplace("https://www.amazon.ca", "en-CA,en;q=0.9", "."),
+    "AU": Marketplace("https://www.amazon.com.au", "en-AU,en;q=0.9", "."),
+    "IN": Marketplace("https://www.amazon.in", "en-IN,en;q=0.9", "."),
+    "MX": Marketplace("https://www.amazon.com.mx", "es-MX,es;q=0.9", "."),
+    "JP": Marketplace("https://www.amazon.co.jp", "ja-JP,ja;q=0.9", "."),
+    "DE": Marketplace("https://www.amazon.de", "de-DE,de;q=0.9", ","),
+    "FR": Marketplace("https://www.amazon.fr", "fr-FR,fr;q=0.9", ","),
+    "IT": Marketplace("https://www.amazon.it", "it-IT,it;q=0.9", ","),
+    "ES": Marketplace("https://www.amazon.es", "es-ES,es;q=0.9", ","),
+    "NL": Marketplace("https://www.amazon.nl", "nl-NL,nl;q=0.9", ","),
+    "BR": Marketplace("https://www.amazon.com.br", "pt-BR,pt;q=0.9", ","),
+}
+
+def get_marketplace(code: Optional[str]) -> Optional[Marketplace]:
+    return MARKETPLACES.get(str(code or "").upper())
+
+def accept_language(settings: Dict[str, Any]) -> str:
+    """The ``Accept-Language`` to send: ``accept_language``, else the marketplace's."""
+    marketplace = get_marketplace(settings.get("marketplace"))
+    return str(
+        settings.get("accept_language")
+        or (marketplace.accept_language if marketplace else DEFAULT_ACCEPT_LANGUAGE)
+    )
+
+def decimal_mark(settings: Dict[str, Any]) -> Optional[str]:
+    """The marketplace's decimal mark, or None to infer it from each price."""
+    marketplace = get_marketplace(settings.get("marketplace"))
+    return marketplace.decimal if marketplace else None
+
+def marketplace_settings(settings: Dict[str, Any], code: str) -> Dict[str, Any]:
+    """
+    ``settings`` for scraping one marketplace of a fan-out run: its base
+    URL from ``MARKETPLACES``, then anything under
+    ``marketplace_settings[code]`` (a ``base_url``, ``concurrency``,
+    ``requests_per_second``, ...) on top.
+    """
+    code = code.upper()
+    overrides = dict((settings.get("marketplace_settings") or {}).get(code) or {})
+    marketplace = MARKETPLACES.get(code)
+    if marketplace is None and "base_url" not in overrides:
+        raise ValueError(
+            f"Unknown marketplace '{code}'; give its base_url under marketplace_settings. "
+            f"Known: {sorted(MARKETPLACES)}"
+        )
+    scoped = dict(settings, marketplace=code, marketplaces=None)
+    if marketplace is not None:
+        scoped["base_url"] = marketplace.base_url
+    scoped.update(overrides)
+    return scoped
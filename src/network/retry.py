@@ -0,0 +1,387 @@
+import heapq
+import logging
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Error kinds worth retrying; anything else (a 404, a parse error) is final
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+SERVER_ERROR = "server_error"
+THROTTLED = "throttled"
+
+_FINISHED = object()
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # aiohttp.ClientResponseError carries the status itself
+        status = getattr(exc, "status", None)
+    return status if isinstance(status, int) else None
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or getattr(exc, "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def classify_error(exc: BaseException) -> Optional[str]:
+    """The retryable kind of a fetch error, or None when retrying won't help."""
+    status = _status_of(exc)
+    if status is not None:
+        if status in (429, 503):
+            return THROTTLED
+        return SERVER_ERROR if status >= 500 else None
+    if isinstance(exc, TimeoutError) or type(exc).__name__.endswith("Timeout"):
+        # requests.Timeout and its subclasses, asyncio/aiohttp timeouts
+        return TIMEOUT
+    connection_errors: Tuple[type, ...] = (ConnectionError,)
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        # Loaded with the first request; an error from it means it is there
+        connection_errors += (requests.ConnectionError, requests.exceptions.ChunkedEncodingError)
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None:
+        # Only loaded by the async engine; no need to import it here
+        connection_errors += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+    if isinstance(exc, connection_errors):
+        return CONNECTION
+    return None
+
+def error_class(exc: BaseException) -> str:
+    """Label to count a fetch error under: its retryable kind, HTTP status or type."""
+    kind = classify_error(exc)
+    if kind is not None:
+        return kind
+    status = _status_of(exc)
+    if status is not None:
+        return f"http_{status}"
+    return type(exc).__name__
+
+class RetryBudget:
+    """
+    Caps retries at ``ratio`` of first attempts, plus a burst of ``reserve``.
+
+    Every first attempt deposits ``ratio`` of a token, up to ``reserve``
+    tokens; every retry spends one. When a host is failing wholesale the
+    budget runs dry and further failures become final instead of
+    multiplying the load on it.
+    """
+
+    def __init__(self, ratio: float = 0.1, reserve: float = 20) -> None:
+        self.ratio = float(ratio)
+        self.reserve = max(1.0, float(reserve))
+        self._balance = self.reserve
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._balance = min(self.reserve, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._balance < 1.0:
+                return False
+            self._balance -= 1.0
+            return True
+
+class CircuitBreaker:
+    """
+    Stops requests to a host whose recent failure rate spikes.
+
+    Opens once at least ``min_requests`` of the last ``window`` outcomes
+    are in and ``failure_rate`` of them are retryable failures. After
+    ``cooldown`` seconds one probe request is let through: success closes
+    the breaker, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_requests: int = 20,
+        window: int = 50,
+        cooldown: float = 30.0,
+    ) -> None:
+        self.failure_rate = float(failure_rate)
+        self.min_requests = max(1, int(min_requests))
+        self.cooldown = float(cooldown)
+        self._outcomes: Deque[bool] = deque(maxlen=max(window, self.min_requests))
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def blocked_for(self) -> float:
+        """Seconds until a request may be sent, or 0 to send it now."""
+        with self._lock:
+            if not self._open_until:
+                return 0.0
+            remaining = self._open_until - time.monotonic()
+            if remaining > 0 or self._probing:
+                return max(remaining, 1.0 if self._probing else 0.0)
+            self._probing = True
+            return 0.0
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self._open_until:
+                if not self._probing:
+                    return
+                self._probing = False
+                if failed:
+                    self._open_until = time.monotonic() + self.cooldown
+                else:
+                    self._open_until = 0.0
+                    self._outcomes.clear()
+                    logger.info("Circuit closed")
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_requests:
+                rate = sum(self._outcomes) / len(self._outcomes)
+                if rate >= self.failure_rate:
+                    self._open_until = time.monotonic() + self.cooldown
+                    logger.warning(
+                        "Circuit opened for %.0fs: %.0f%% of the last %d requests failed",
+                        self.cooldown,
+                        rate * 100,
+                        len(self._outcomes),
+                    )
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed fetch is tried again.
+
+    Retryable failures get up to ``max_attempts`` attempts in total, spaced
+    by exponential backoff with full jitter (``base_delay`` doubling up to
+    ``max_delay``, or the server's ``Retry-After`` if longer), while the
+    shared ``RetryBudget`` allows. Each host has a ``CircuitBreaker``.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        budget: Optional[RetryBudget] = None,
+        breaker_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.budget = budget or RetryBudget()
+        self.breaker_options = breaker_options or {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.gave_up = 0
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(**self.breaker_options)
+            return breaker
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def succeeded(self, url: str) -> None:
+        self.breaker(url).record(False)
+
+    def blocked(self, asin: str, url: str, attempt: int) -> Tuple[bool, Optional[float]]:
+        """
+        Check the host's circuit before a request: ``(False, None)`` to go
+        ahead, ``(True, delay)`` to requeue after ``delay`` or ``(True,
+        None)`` to give up.
+
+        A requeue counts as an attempt even though nothing was sent, so
+        jobs for a host that never recovers run out of attempts instead of
+        cycling forever; it costs no retry budget.
+        """
+        wait = self.breaker(url).blocked_for()
+        if not wait:
+            return False, None
+        if attempt >= self.max_attempts:
+            with self._lock:
+                self.gave_up += 1
+            logger.warning("Giving up on ASIN %s: circuit open for its host", asin)
+            return True, None
+        return True, wait + random.uniform(0, 1)
+
+    def failed(self, asin: str, url: str, attempt: int, exc: BaseException) -> Optional[float]:
+        """Record a failed attempt; returns the delay before retrying, or None."""
+        kind = classify_error(exc)
+        self.breaker(url).record(kind is not None)
+        if kind is None:
+            return None
+        if attempt >= self.max_attempts or not self.budget.withdraw():
+            with self._lock:
+                self.gave_up += 1
+            logger.warning("Giving up on ASIN %s after %d attempts (%s)", asin, attempt, kind)
+            return None
+        delay = max(self.backoff(attempt), _retry_after(exc) or 0.0)
+        with self._lock:
+            self.retries += 1
+        logger.info("Retrying ASIN %s in %.1fs after %s (attempt %d)", asin, delay, kind, attempt)
+        return delay
+
+class Attempt:
+    """One try at one job, handed out by ``RetryQueue.job``."""
+
+    __slots__ = ("_queue", "asin", "url", "number")
+
+    def __init__(self, queue: "RetryQueue", asin: str, url: str, number: int) -> None:
+        self._queue = queue
+        self.asin = asin
+        self.url = url
+        self.number = number
+
+    def allowed(self) -> bool:
+        """False if the host's circuit is open; the job is requeued if it has attempts left."""
+        blocked, delay = self._queue.policy.blocked(self.asin, self.url, self.number)
+        if blocked and delay is not None:
+            self._queue.schedule(self.asin, self.url, self.number + 1, delay)
+        return not blocked
+
+    def succeeded(self) -> None:
+        self._queue.policy.succeeded(self.url)
+
+    def failed(self, exc: BaseException) -> bool:
+        """Report a failure; returns True when the job was requeued."""
+        delay = self._queue.policy.failed(self.asin, self.url, self.number, exc)
+        if delay is None:
+            return False
+        self._queue.schedule(self.asin, self.url, self.number + 1, delay)
+        return True
+
+class RetryQueue:
+    """
+    Job source for thread-based engines that feeds retries back in.
+
+    Iterating yields the ``(asin, url)`` jobs from ``jobs`` and, once their
+    backoff has passed, the ones rescheduled by ``Attempt.failed``. Waiting
+    retries sit in a heap ordered by due time rather than in a sleeping
+    worker, so fetch slots keep working on other ASINs meanwhile. Every job
+    handed out must be run inside ``with queue.job(asin, url)`` so the
+    iterator knows when nothing more can be rescheduled.
+    """
+
+    def __init__(self, jobs: Iterable[Tuple[str, str]], policy: RetryPolicy) -> None:
+        self.policy = policy
+        self._source = iter(jobs)
+        self._exhausted = False
+        self._heap: List[Tuple[float, int, str, str, int]] = []
+        self._seq = 0
+        self._attempts: Dict[str, int] = {}
+        self._outstanding = 0
+        self._cond = threading.Condition()
+
+    def schedule(self, asin: str, url: str, attempt: int, delay: float) -> None:
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, asin, url, attempt))
+            self._cond.notify_all()
+
+    def _due_retry(self, wait: bool) -> Any:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[2:]
+                if not self._heap and not self._outstanding:
+                    return _FINISHED
+                if not wait:
+                    return None
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+
+    def _next(self, wait: bool) -> Any:
+        while True:
+            # Retries only wait for the source to run dry, never block on it
+            retry = self._due_retry(wait=wait and self._exhausted)
+            if retry is _FINISHED and self._exhausted:
+                return _FINISHED
+            if retry is None or retry is _FINISHED:
+                if self._exhausted:
+                    return None
+                job = next(self._source, None)
+                if job is None:
+                    self._exhausted = True
+                    continue
+                asin, url = job
+                attempt = 1
+                self.policy.budget.deposit()
+            else:
+                asin, url, attempt = retry
+            with self._cond:
+                self._outstanding += 1
+                if attempt > 1:
+                    self._attempts[asin] = attempt
+            return asin, url
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        while True:
+            job = self._next(wait=True)
+            if job is _FINISHED:
+                return
+            yield job
+
+    def take(self) -> Optional[Tuple[str, str]]:
+        """
+        The next job if one can start now, without waiting for a retry's
+        backoff; None otherwise (``finished`` tells the two cases apart).
+        """
+        job = self._next(wait=False)
+        return None if job is _FINISHED else job
+
+    def finished(self) -> bool:
+        """True once the source is exhausted, every job has run and no retry is waiting."""
+        with self._cond:
+            return self._exhausted and not self._heap and not self._outstanding
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Seconds until the next waiting retry is due, or None if none is waiting."""
+        with self._cond:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+    @contextmanager
+    def job(self, asin: str, url: str) -> Iterator[Attempt]:
+        with self._cond:
+            number = self._attempts.pop(asin, 1)
+        try:
+            yield Attempt(self, asin, url, number)
+        finally:
+            with self._cond:
+                self._outstanding -= 1
+                self._cond.notify_all()
+
+def build_retry_policy(settings: Dict[str, Any]) -> Optional[RetryPolicy]:
+    """A ``RetryPolicy`` per the settings, or None when retries are off."""
+    max_attempts = int(settings.get("max_attempts", 1))
+    if max_attempts <= 1:
+        return None
+    return RetryPolicy(
+        max_attempts=max_attempts,
+        base_delay=float(settings.get("retry_base_delay", 1.0)),
+        max_delay=float(settings.get("retry_max_delay", 60.0)),
+        budget=RetryBudget(
+            ratio=float(settings.get("retry_budget_ratio", 0.1)),
+            reserve=float(settings.get("retry_budget_reserve", 20)),
+        ),
+        breaker_options={
+            "failure_rate": float(settings.get("breaker_failure_rate", 0.5)),
+            "min_requests": int(settings.get("breaker_min_requests", 20)),
+            "cooldown": float(settings.get("breaker_cooldown_seconds", 30.0)),
+        },
+    )
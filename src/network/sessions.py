@@ -0,0 +1,45 @@
+import logging
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+def build_session(
+    pool_size: int,
+    user_agent: Optional[str] = None,
+    accept_language: str = "en-US,en;q=0.9",
+) -> "requests.Session":
+    """
+    Build a keep-alive session shared by all fetch workers.
+
+    The mounted adapter keeps up to ``pool_size`` connections per host, so
+    with ``pool_size`` at least ``concurrency`` every worker reuses a warm
+    TCP+TLS connection instead of handshaking per ASIN. ``pool_block``
+    makes extra workers wait for a free connection rather than opening
+    throwaway ones. Responses are requested compressed; ``br`` is
+    advertised when the optional ``brotli`` package is installed.
+    """
+    # Imported here so that importing the runner does not pay for requests
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+    pool_size = max(1, int(pool_size))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+            "Accept-Language": accept_language,
+            "Connection": "keep-alive",
+        }
+    )
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    logger.debug("Built HTTP session with a pool of %d connections per host", pool_size)
+    return session
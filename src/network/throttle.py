@@ -0,0 +1,306 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# How a request ended, as far as the controller is concerned
+OK = "ok"
+ERROR = "error"
+THROTTLED = "throttled"
+
+# Responses that mean the host wants us to slow down
+THROTTLE_STATUSES = frozenset({429, 503})
+
+def classify_status(status: Optional[int]) -> str:
+    if status is None:
+        return ERROR
+    if status in THROTTLE_STATUSES:
+        return THROTTLED
+    if status >= 500:
+        return ERROR
+    return OK
+
+class TokenBucket:
+    """
+    Request rate limiter: ``rate`` tokens per second, up to ``burst`` saved.
+
+    ``reserve`` never blocks; it takes a token (possibly one that only
+    exists in the future) and returns how long the caller must wait before
+    using it, so the same bucket serves threads and coroutines.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst if burst is not None else 1.0))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+class AimdController:
+    """
+    Additive-increase/multiplicative-decrease limit on requests in flight.
+
+    Every round of ``limit`` completed requests, the limit grows by one if
+    the p95 latency over the last ``window`` requests is within
+    ``latency_target`` seconds and the error rate is within
+    ``max_error_rate``. A throttling response (429/503), or a round whose
+    error rate is too high, multiplies it by ``decrease_factor`` instead.
+    Throttling responses to requests started before the last cut are
+    ignored, so one burst of 503s cuts the limit once, not once per
+    response.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial: Optional[int] = None,
+        latency_target: float = 2.0,
+        max_error_rate: float = 0.05,
+        decrease_factor: float = 0.5,
+        window: int = 100,
+    ) -> None:
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        start = initial if initial is not None else math.ceil(self.max_limit / 2)
+        self._limit = float(min(self.max_limit, max(self.min_limit, start)))
+        self.latency_target = float(latency_target)
+        self.max_error_rate = float(max_error_rate)
+        self.decrease_factor = float(decrease_factor)
+        self.epoch = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._errors: Deque[bool] = deque(maxlen=window)
+        self._round = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def p95_latency(self) -> float:
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def record(self, started_epoch: int, latency: float, outcome: str) -> None:
+        with self._lock:
+            if outcome == THROTTLED:
+                if started_epoch == self.epoch:
+                    self._decrease("throttled")
+                return
+            self._latencies.append(latency)
+            self._errors.append(outcome == ERROR)
+            self._round += 1
+            if self._round < self._limit:
+                return
+            self._round = 0
+            error_rate = sum(self._errors) / len(self._errors)
+            if error_rate > self.max_error_rate:
+                self._decrease(f"error rate {error_rate:.0%}")
+            elif self.p95_latency() <= self.latency_target and self._limit < self.max_limit:
+                self._limit = min(self.max_limit, self._limit + 1)
+                logger.debug("Raised concurrency limit to %d", self.limit)
+
+    def _decrease(self, reason: str) -> None:
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self.epoch += 1
+        self._round = 0
+        self._errors.clear()
+        logger.info("Cut concurrency limit to %d (%s)", self.limit, reason)
+
+class Slot:
+    """Handed to the caller for one request; set ``outcome`` before it ends."""
+
+    __slots__ = ("outcome",)
+
+    def __init__(self) -> None:
+        self.outcome = OK
+
+    def status(self, status: Optional[int]) -> None:
+        self.outcome = classify_status(status)
+
+class _Host:
+    def __init__(
+        self,
+        controller: Optional[AimdController],
+        bucket: Optional[TokenBucket],
+        cond: Any,
+    ) -> None:
+        self.controller = controller
+        self.bucket = bucket
+        # threading.Condition or asyncio.Condition guarding in_flight
+        self.cond = cond
+        self.in_flight = 0
+
+class _BaseThrottle:
+    def __init__(
+        self,
+        max_concurrency: int,
+        adaptive: bool = True,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        **controller_options: Any,
+    ) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.adaptive = adaptive
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.controller_options = controller_options
+        self._hosts: Dict[str, _Host] = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host(self, url: str) -> _Host:
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            state = self._hosts.get(host)
+            if state is None:
+                controller = (
+                    AimdController(self.max_concurrency, **self.controller_options)
+                    if self.adaptive
+                    else None
+                )
+                bucket = (
+                    TokenBucket(self.requests_per_second, self.burst)
+                    if self.requests_per_second
+                    else None
+                )
+                state = self._hosts[host] = self._new_host(controller, bucket)
+            return state
+
+    def _new_host(self, controller: Optional[AimdController], bucket: Optional[TokenBucket]) -> _Host:
+        raise NotImplementedError
+
+    def _limit(self, state: _Host) -> int:
+        return state.controller.limit if state.controller else self.max_concurrency
+
+    def limits(self) -> Dict[str, int]:
+        """Current in-flight limit per host."""
+        with self._hosts_lock:
+            return {host: self._limit(state) for host, state in self._hosts.items()}
+
+class HostThrottle(_BaseThrottle):
+    """
+    Per-host AIMD concurrency limit and token-bucket rate for fetch threads.
+
+    Wrap each request in ``with throttle.slot(url) as slot:`` and report
+    the response with ``slot.status(code)`` (or ``slot.status(None)`` for a
+    transport error).
+    """
+
+    def _new_host(self, controller: Optional[AimdController], bucket: Optional[TokenBucket]) -> _Host:
+        return _Host(controller, bucket, threading.Condition())
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[Slot]:
+        state = self._host(url)
+        cond: threading.Condition = state.cond
+        with cond:
+            while state.in_flight >= self._limit(state):
+                cond.wait()
+            state.in_flight += 1
+        epoch = state.controller.epoch if state.controller else 0
+        slot = Slot()
+        try:
+            if state.bucket is not None:
+                delay = state.bucket.reserve()
+                if delay:
+                    time.sleep(delay)
+            started = time.perf_counter()
+            try:
+                yield slot
+            except BaseException:
+                if slot.outcome == OK:
+                    slot.outcome = ERROR
+                raise
+            finally:
+                if state.controller is not None:
+                    state.controller.record(epoch, time.perf_counter() - started, slot.outcome)
+        finally:
+            with cond:
+                state.in_flight -= 1
+                cond.notify_all()
+
+class AsyncHostThrottle(_BaseThrottle):
+    """``HostThrottle`` for coroutines on a single event loop."""
+
+    def _new_host(self, controller: Optional[AimdController], bucket: Optional[TokenBucket]) -> _Host:
+        # asyncio is imported here rather than at the top so the threaded
+        # engines never load it
+        import asyncio
+
+        return _Host(controller, bucket, asyncio.Condition())
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[Slot]:
+        import asyncio
+
+        state = self._host(url)
+        cond: asyncio.Condition = state.cond
+        async with cond:
+            await cond.wait_for(lambda: state.in_flight < self._limit(state))
+            state.in_flight += 1
+        epoch = state.controller.epoch if state.controller else 0
+        slot = Slot()
+        try:
+            if state.bucket is not None:
+                delay = state.bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+            started = time.perf_counter()
+            try:
+                yield slot
+            except BaseException:
+                if slot.outcome == OK:
+                    slot.outcome = ERROR
+                raise
+            finally:
+                if state.controller is not None:
+                    state.controller.record(epoch, time.perf_counter() - started, slot.outcome)
+        finally:
+            async with cond:
+                state.in_flight -= 1
+                cond.notify_all()
+
+def _throttle_options(settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    adaptive = bool(settings.get("adaptive_concurrency"))
+    rate = settings.get("requests_per_second")
+    if not adaptive and not rate:
+        return None
+    options: Dict[str, Any] = {
+        "adaptive": adaptive,
+        "requests_per_second": float(rate) if rate else None,
+        "burst": settings.get("request_burst"),
+    }
+    if adaptive:
+        options.update(
+            min_limit=int(settings.get("min_concurrency", 1)),
+            latency_target=float(settings.get("latency_target_seconds", 2.0)),
+            max_error_rate=float(settings.get("max_error_rate", 0.05)),
+        )
+    return options
+
+def build_throttle(settings: Dict[str, Any], max_concurrency: int) -> Optional[HostThrottle]:
+    """A ``HostThrottle`` per the settings, or None when neither limit is on."""
+    options = _throttle_options(settings)
+    return HostThrottle(max_concurrency, **options) if options is not None else None
+
+def build_async_throttle(settings: Dict[str, Any], max_concurrency: int) -> Optional[AsyncHostThrottle]:
+    options = _throttle_options(settings)
+    return AsyncHostThrottle(max_concurrency, **options) if options is not None else None
@@ -1,69 +1,195 @@
-thonimport csv
+import csv
+import html
 import json
 import logging
+import os
+import tempfile
+import textwrap
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from types import TracebackType
+from typing import IO, Any, Dict, Iterable, List, Mapping, Optional, Type
 
-from openpyxl import Workbook
+from extractors.records import json_default, to_plain
+from metrics.counters import COUNTERS
+from metrics.histograms import HISTOGRAMS
 
 logger = logging.getLogger(__name__)
 
 def _ensure_output_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
-def _collect_fieldnames(products: Sequence[Dict]) -> List[str]:
-    fieldnames: List[str] = []
-    seen = set()
-    for product in products:
+class ProductWriter:
+    """
+    Incremental writer for one export format: ``open``, ``write(product)``
+    for each product as it arrives, then ``close``.
+
+    Also usable as a context manager. Writers never hold the products they
+    were given, so memory stays flat however long the run is. Products are
+    ``Product`` records or plain dicts, such as results read back from the
+    job store.
+    """
+
+    format_name = ""
+    extension = ""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+
+    def open(self) -> "ProductWriter":
+        raise NotImplementedError
+
+    def write(self, product: Mapping[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> "ProductWriter":
+        return self.open()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+class _TabularWriter(ProductWriter):
+    """
+    Shared column handling for the table formats.
+
+    Columns follow first-seen key order. A key that first shows up late is
+    appended as a new column; rows already written simply lack it, and
+    ``_row_widths`` records how wide each stretch of rows is so the file
+    can be padded once on close.
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        self.fieldnames: List[str] = []
+        self._seen: set = set()
+        # (rows written so far, column count) at every header change
+        self._row_widths: List[List[int]] = []
+
+    def _columns_for(self, product: Mapping[str, Any]) -> List[str]:
+        added = False
         for key in product.keys():
-            if key not in seen:
-                seen.add(key)
-                fieldnames.append(key)
-    return fieldnames
+            if key not in self._seen:
+                self._seen.add(key)
+                self.fieldnames.append(key)
+                added = True
+        if added or not self._row_widths:
+            self._row_widths.append([self.count, len(self.fieldnames)])
+        return self.fieldnames
 
-def export_json(products: Sequence[Dict], path: Path) -> None:
-    try:
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(products, f, indent=2, ensure_ascii=False)
-        logger.info("Exported JSON to %s", path)
-    except Exception as exc:
-        logger.error("Failed to export JSON to %s: %s", path, exc)
-        raise
+    @property
+    def _header_grew(self) -> bool:
+        return len(self._row_widths) > 1
 
-def export_csv(products: Sequence[Dict], path: Path) -> None:
-    fieldnames = _collect_fieldnames(products)
+    def _width_of_row(self, index: int) -> int:
+        width = 0
+        for first_row, columns in self._row_widths:
+            if first_row > index:
+                break
+            width = columns
+        return width
+
+def _replace_atomically(path: Path, write: Any) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=str(path.parent))
     try:
-        with path.open("w", encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in products:
-                writer.writerow(row)
-        logger.info("Exported CSV to %s", path)
-    except Exception as exc:
-        logger.error("Failed to export CSV to %s: %s", path, exc)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as tmp:
+            write(tmp)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
         raise
 
-def export_excel(products: Sequence[Dict], path: Path) -> None:
-    fieldnames = _collect_fieldnames(products)
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Products"
+class JsonWriter(ProductWriter):
+    format_name = "json"
+    extension = "json"
 
-    ws.append(fieldnames)
-    for product in products:
-        ws.append([product.get(name) for name in fieldnames])
+    def open(self) -> "JsonWriter":
+        self._file = self.path.open("w", encoding="utf-8")
+        self._file.write("[")
+        return self
 
-    try:
-        wb.save(str(path))
-        logger.info("Exported Excel to %s", path)
-    except Exception as exc:
-        logger.error("Failed to export Excel to %s: %s", path, exc)
-        raise
+    def write(self, product: Mapping[str, Any]) -> None:
+        # Same layout as json.dump(products, indent=2), one product at a time
+        self._file.write(",\n" if self.count else "\n")
+        self._file.write(textwrap.indent(json.dumps(product, indent=2, ensure_ascii=False, default=json_default), "  "))
+        self.count += 1
 
-def export_html(products: Sequence[Dict], path: Path) -> None:
-    fieldnames = _collect_fieldnames(products)
+    def close(self) -> None:
+        self._file.write("\n]" if self.count else "]")
+        self._file.close()
+        logger.info("Exported JSON to %s", self.path)
 
-    lines: List[str] = [
+class JsonlWriter(ProductWriter):
+    format_name = "jsonl"
+    extension = "jsonl"
+
+    def open(self) -> "JsonlWriter":
+        # Line buffered: each product is on disk as soon as it is written
+        self._file = self.path.open("w", encoding="utf-8", buffering=1)
+        return self
+
+    def write(self, product: Mapping[str, Any]) -> None:
+        self._file.write(json.dumps(product, ensure_ascii=False, default=json_default) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+        logger.info("Exported JSONL to %s", self.path)
+
+class CsvWriter(_TabularWriter):
+    format_name = "csv"
+    extension = "csv"
+
+    def open(self) -> "CsvWriter":
+        # The header is written on close, once every column is known; rows
+        # go to a body file in the meantime
+        self._body: IO[str] = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._body)
+        return self
+
+    def write(self, product: Mapping[str, Any]) -> None:
+        columns = self._columns_for(product)
+        self._writer.writerow([_csv_value(product.get(name, "")) for name in columns])
+        self.count += 1
+
+    def close(self) -> None:
+        self._body.seek(0)
+        width = len(self.fieldnames)
+
+        def write_file(out: IO[str]) -> None:
+            writer = csv.writer(out)
+            writer.writerow(self.fieldnames)
+            if not self._header_grew:
+                # Rows already have every column: copy them verbatim
+                for chunk in iter(lambda: self._body.read(1 << 16), ""):
+                    out.write(chunk)
+                return
+            for row in csv.reader(self._body):
+                writer.writerow(row + [""] * (width - len(row)))
+
+        try:
+            _replace_atomically(self.path, write_file)
+        finally:
+            self._body.close()
+        logger.info("Exported CSV to %s", self.path)
+
+def _csv_value(value: Any) -> Any:
+    # Matches csv.DictWriter, which writes None as an empty field; nested
+    # records are written as the dicts they stand for
+    return "" if value is None else to_plain(value)
+
+class HtmlWriter(_TabularWriter):
+    format_name = "html"
+    extension = "html"
+
+    _HEAD = [
         "<!DOCTYPE html>",
         "<html>",
         "<head>",
@@ -82,56 +208,317 @@ def export_html(products: Sequence[Dict], path: Path) -> None:
         "    <thead>",
         "      <tr>",
     ]
-    for name in fieldnames:
-        lines.append(f"        <th>{name}</th>")
-    lines.extend(
-        [
-            "      </tr>",
-            "    </thead>",
-            "    <tbody>",
-        ]
-    )
-    for product in products:
-        lines.append("      <tr>")
-        for name in fieldnames:
+    _TAIL = [
+        "    </tbody>",
+        "  </table>",
+        "</body>",
+        "</html>",
+    ]
+    _ROW_END = "      </tr>\n"
+
+    def open(self) -> "HtmlWriter":
+        self._body: IO[str] = tempfile.TemporaryFile("w+", encoding="utf-8")
+        return self
+
+    def write(self, product: Mapping[str, Any]) -> None:
+        columns = self._columns_for(product)
+        lines = ["      <tr>"]
+        for name in columns:
             value = product.get(name, "")
-            value_str = "" if value is None else str(value)
+            value_str = "" if value is None else html.escape(str(to_plain(value)))
             lines.append(f"        <td>{value_str}</td>")
-        lines.append("      </tr>")
-    lines.extend(
-        [
-            "    </tbody>",
-            "  </table>",
-            "</body>",
-            "</html>",
-        ]
-    )
+        self._body.write("\n".join(lines) + "\n" + self._ROW_END)
+        self.count += 1
+
+    def close(self) -> None:
+        self._body.seek(0)
+        width = len(self.fieldnames)
+
+        def write_file(out: IO[str]) -> None:
+            out.write("\n".join(self._HEAD) + "\n")
+            for name in self.fieldnames:
+                out.write(f"        <th>{html.escape(name)}</th>\n")
+            out.write("      </tr>\n    </thead>\n    <tbody>\n")
+            row = 0
+            for line in self._body:
+                if line == self._ROW_END:
+                    # Rows written before a late column appeared get empty cells
+                    missing = width - self._width_of_row(row)
+                    out.write("        <td></td>\n" * missing)
+                    row += 1
+                out.write(line)
+            out.write("\n".join(self._TAIL))
+
+        try:
+            _replace_atomically(self.path, write_file)
+        finally:
+            self._body.close()
+        logger.info("Exported HTML to %s", self.path)
+
+class ExcelWriter(_TabularWriter):
+    """
+    Streams rows into an openpyxl ``write_only`` workbook.
+
+    Write-only sheets cannot go back to the header row, so rows are spooled
+    as JSON lines until ``close`` knows every column; the workbook itself
+    then never holds more than one row of cell objects.
+    """
 
+    format_name = "excel"
+    extension = "xlsx"
+
+    def open(self) -> "ExcelWriter":
+        self._rows: IO[str] = tempfile.TemporaryFile("w+", encoding="utf-8")
+        return self
+
+    def write(self, product: Mapping[str, Any]) -> None:
+        columns = self._columns_for(product)
+        row = [_excel_value(product.get(name)) for name in columns]
+        self._rows.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        try:
+            self._rows.seek(0)
+            # openpyxl takes longer to import than the rest of the exporters
+            # together, so only Excel exports load it
+            from openpyxl import Workbook
+
+            width = len(self.fieldnames)
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Products")
+            ws.append(self.fieldnames)
+            for line in self._rows:
+                row = json.loads(line)
+                ws.append(row + [None] * (width - len(row)))
+        finally:
+            self._rows.close()
+
+        try:
+            wb.save(str(self.path))
+            logger.info("Exported Excel to %s", self.path)
+        except Exception as exc:
+            logger.error("Failed to export Excel to %s: %s", self.path, exc)
+            raise
+
+def _excel_value(value: Any) -> Any:
+    # Cells only take scalars; nested values such as offers go in as JSON
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, default=json_default)
+    return value
+
+# Typed columns of the Parquet export, in product key order. "float",
+# "int" and "string" map to float64, int64 and utf8.
+PRODUCT_SCHEMA = (
+    ("asin", "string"),
+    ("url", "string"),
+    ("title", "string"),
+    ("brand", "string"),
+    ("thumbnailImage", "string"),
+    ("price_raw", "string"),
+    ("price.value", "float"),
+    ("price.max", "float"),
+    ("price_currency", "string"),
+    ("stars", "float"),
+    ("reviewsCount", "int"),
+    ("description", "string"),
+    ("breadCrumbs", "string"),
+)
+OFFER_SCHEMA = (
+    ("price_raw", "string"),
+    ("seller", "string"),
+    ("condition", "string"),
+    ("price.value", "float"),
+    ("price_currency", "string"),
+)
+
+def _coerce(value: Any, kind: str) -> Any:
+    if value is None or value == "":
+        return None
     try:
-        with path.open("w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
-        logger.info("Exported HTML to %s", path)
+        if kind == "float":
+            return float(value)
+        if kind == "int":
+            return int(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+class ParquetWriter(ProductWriter):
+    """
+    Writes products to Parquet with ``PRODUCT_SCHEMA`` plus ``offers`` as a
+    list of structs, one row group per ``row_group_size`` products.
+
+    Only the current batch is held in memory, as one list per column.
+    Values are coerced to the column type, and anything that does not
+    convert becomes null. Keys outside the schema are not exported; a
+    warning names them once. Requires the optional ``pyarrow`` package.
+    """
+
+    format_name = "parquet"
+    extension = "parquet"
+    row_group_size = 10_000
+
+    def open(self) -> "ParquetWriter":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - depends on environment
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from exc
+
+        types = {"string": pa.string(), "float": pa.float64(), "int": pa.int64()}
+        offer_type = pa.struct([(name, types[kind]) for name, kind in OFFER_SCHEMA])
+        self._pa = pa
+        self._schema = pa.schema(
+            [(name, types[kind]) for name, kind in PRODUCT_SCHEMA]
+            + [("offers", pa.list_(offer_type))]
+        )
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+        self._known = {name for name, _ in PRODUCT_SCHEMA} | {"offers"}
+        self._seen: set = set()
+        self._reset_batch()
+        return self
+
+    def _reset_batch(self) -> None:
+        self._batch: Dict[str, List[Any]] = {name: [] for name in self._schema.names}
+        self._batch_rows = 0
+
+    def write(self, product: Mapping[str, Any]) -> None:
+        for key in product.keys():
+            if key not in self._seen:
+                self._seen.add(key)
+                if key not in self._known:
+                    logger.warning("Parquet export has no column for field '%s'; skipping it", key)
+        for name, kind in PRODUCT_SCHEMA:
+            self._batch[name].append(_coerce(product.get(name), kind))
+        self._batch["offers"].append(
+            [
+                {name: _coerce(offer.get(name), kind) for name, kind in OFFER_SCHEMA}
+                for offer in product.get("offers") or []
+                if isinstance(offer, Mapping)
+            ]
+        )
+        self._batch_rows += 1
+        self.count += 1
+        if self._batch_rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._batch_rows:
+            self._writer.write_table(self._pa.Table.from_pydict(self._batch, schema=self._schema))
+            self._reset_batch()
+
+    def close(self) -> None:
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+        logger.info("Exported Parquet to %s", self.path)
+
+WRITERS: Dict[str, Type[ProductWriter]] = {
+    writer.format_name: writer
+    for writer in (JsonWriter, JsonlWriter, CsvWriter, ExcelWriter, HtmlWriter, ParquetWriter)
+}
+EXPORT_FORMATS = tuple(WRITERS)
+
+def open_writer(fmt: str, output_dir: Path, base_filename: str = "amazon_products") -> ProductWriter:
+    writer_cls = WRITERS.get(fmt.lower())
+    if writer_cls is None:
+        raise ValueError(f"Unsupported export format '{fmt}'. Valid: {sorted(WRITERS)}")
+    return writer_cls(output_dir / f"{base_filename}.{writer_cls.extension}").open()
+
+def _export_with(writer_cls: Type[ProductWriter], products: Iterable[Mapping[str, Any]], path: Path) -> None:
+    try:
+        with writer_cls(path) as writer:
+            for product in products:
+                writer.write(product)
     except Exception as exc:
-        logger.error("Failed to export HTML to %s: %s", path, exc)
+        logger.error("Failed to export %s to %s: %s", writer_cls.format_name.upper(), path, exc)
         raise
 
+def export_json(products: Iterable[Mapping[str, Any]], path: Path) -> None:
+    _export_with(JsonWriter, products, path)
+
+def export_jsonl(products: Iterable[Mapping[str, Any]], path: Path) -> None:
+    _export_with(JsonlWriter, products, path)
+
+def export_csv(products: Iterable[Mapping[str, Any]], path: Path) -> None:
+    _export_with(CsvWriter, products, path)
+
+def export_excel(products: Iterable[Mapping[str, Any]], path: Path) -> None:
+    _export_with(ExcelWriter, products, path)
+
+def export_html(products: Iterable[Mapping[str, Any]], path: Path) -> None:
+    _export_with(HtmlWriter, products, path)
+
+def export_parquet(products: Iterable[Mapping[str, Any]], path: Path) -> None:
+    _export_with(ParquetWriter, products, path)
+
+class ExportSession:
+    """
+    Fans products out to one writer per requested format as they arrive.
+
+    Nothing is buffered in memory. If the run dies, leaving the ``with``
+    block still closes every writer, so the files hold everything scraped
+    up to that point.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        formats: Iterable[str],
+        base_filename: str = "amazon_products",
+    ) -> None:
+        _ensure_output_dir(output_dir)
+        self.output_dir = output_dir
+        self.count = 0
+        self.writers: List[ProductWriter] = []
+        try:
+            for fmt in dict.fromkeys(f.lower() for f in formats):
+                self.writers.append(open_writer(fmt, output_dir, base_filename))
+        except Exception:
+            self.close()
+            raise
+
+    def write(self, product: Mapping[str, Any]) -> None:
+        for writer in self.writers:
+            with HISTOGRAMS.time(f"export_{writer.format_name}_seconds"):
+                writer.write(product)
+        self.count += 1
+        COUNTERS.inc("export.records")
+
+    def close(self) -> None:
+        writers, self.writers = self.writers, []
+        error: Optional[BaseException] = None
+        for writer in writers:
+            # One failing writer must not leave the other files unflushed
+            try:
+                writer.close()
+            except BaseException as exc:
+                logger.error("Failed to close the %s export %s: %s", writer.format_name, writer.path, exc)
+                error = error or exc
+        if error is not None:
+            raise error
+
+    def __enter__(self) -> "ExportSession":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is not None:
+            logger.error("Run aborted; closing exports with %d products", self.count)
+        self.close()
+
 def export_products(
-    products: Sequence[Dict],
+    products: Iterable[Mapping[str, Any]],
     output_dir: Path,
     formats: Iterable[str],
     base_filename: str = "amazon_products",
 ) -> None:
-    _ensure_output_dir(output_dir)
-    format_set = {fmt.lower() for fmt in formats}
-
-    if "json" in format_set:
-        export_json(products, output_dir / f"{base_filename}.json")
-
-    if "csv" in format_set:
-        export_csv(products, output_dir / f"{base_filename}.csv")
-
-    if "excel" in format_set:
-        export_excel(products, output_dir / f"{base_filename}.xlsx")
-
-    if "html" in format_set:
-        export_html(products, output_dir / f"{base_filename}.html")
\ No newline at end of file
+    with ExportSession(output_dir, formats, base_filename) as session:
+        for product in products:
+            session.write(product)
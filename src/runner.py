@@ -1,32 +1,193 @@
-thonimport argparse
+import argparse
 import json
 import logging
+import os
+import queue
+import signal
+import socket
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+import uuid
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-import requests
+if TYPE_CHECKING:
+    import requests
 
-# Make the src directory the import root so we can import local packages
 CURRENT_DIR = Path(__file__).resolve().parent
-if str(CURRENT_DIR) not to sys.path:
+if __name__ == "__main__" and str(CURRENT_DIR) not in sys.path:
+    # Run as a script (python src/runner.py): make src the import root.
+    # Importing runner, or running it with -m, means src is on sys.path
+    # already, and sys.path is left alone.
     sys.path.insert(0, str(CURRENT_DIR))
 
-from extractors.amazon_parser import parse_product_page  # noqa: E402
-from extractors.offer_extractor import parse_offers      # noqa: E402
-from outputs.exporters import export_products            # noqa: E402
+from extractors.document import BACKENDS                 # noqa: E402
+from extractors.normalize import normalize_in_batches, normalize_products  # noqa: E402
+from extractors.page import DEFAULT_FALLBACK_FIELDS, parse_page  # noqa: E402
+from extractors.page_classifier import NonProductPage, check_page  # noqa: E402
+from inputs.asin_reader import parse_shard, read_asin_file  # noqa: E402
+from metrics.counters import COUNTERS                    # noqa: E402
+from metrics.histograms import HISTOGRAMS                # noqa: E402
+from metrics.profiling import PROFILER                   # noqa: E402
+from metrics.report import StatsReporter                 # noqa: E402
+from extractors.prefilter import PREFILTER_MODES         # noqa: E402
+from extractors.records import Product, json_default     # noqa: E402
+from network.cache import ResponseCache, cache_key, conditional_headers  # noqa: E402
+from network.marketplaces import (                       # noqa: E402
+    DEFAULT_ACCEPT_LANGUAGE,
+    MARKETPLACES,
+    accept_language,
+    decimal_mark,
+    marketplace_settings,
+)
+from network.retry import Attempt, RetryQueue, build_retry_policy, error_class  # noqa: E402
+from network.sessions import build_session               # noqa: E402
+from network.throttle import HostThrottle, Slot, TokenBucket, build_throttle  # noqa: E402
+from outputs.exporters import EXPORT_FORMATS, ExportSession  # noqa: E402
+from storage.delta_state import DeltaTracker             # noqa: E402
+from storage.job_store import DONE, FAILED, PENDING, JobStore  # noqa: E402
+from storage.refresh_schedule import CHANGED, NEW, RefreshSchedule  # noqa: E402
+from storage.work_queue import FAILED as QUEUE_FAILED, WorkQueue, open_work_queue  # noqa: E402
+
+ENGINES = ("threads", "async", "pipeline")
+COMMANDS = ("run", "coordinator", "worker", "monitor")
+
+_DONE = object()
 
 DEFAULT_CONFIG: Dict[str, Any] = {
     "base_url": "https://www.amazon.com",
+    # The storefront base_url belongs to (see network.marketplaces): sets
+    # Accept-Language, unless accept_language is given, and the decimal
+    # mark of its prices. marketplaces ["US", "UK", "DE", "JP"] fans one
+    # ASIN list out to each of them: every marketplace gets its own engine,
+    # connection pool and throttle, with the settings under
+    # marketplace_settings[<code>] (base_url, concurrency,
+    # requests_per_second, ...) on top, and exports to <output_dir>/<code>.
     "marketplace": "US",
+    "marketplaces": None,
+    "marketplace_settings": {},
+    "accept_language": None,
+    # "threads" (ThreadPoolExecutor), "async" (one event loop, needs aiohttp)
+    # or "pipeline" (fetch threads feeding a process pool of parsers)
+    "engine": "threads",
     "concurrency": 5,
+    # Connections kept alive per host; defaults to concurrency when unset
+    "pool_size": None,
+    # ASINs being fetched, parsed or waiting for export at any one time;
+    # defaults to twice concurrency
+    "max_in_flight": None,
+    # Async engine limits: total in-flight requests and in-flight per host
+    "async_concurrency": 1000,
+    "per_host_concurrency": 100,
+    # Parse workers for the async (threads) and pipeline (processes)
+    # engines; defaults to the CPU count
+    "parse_workers": None,
+    # Pipeline engine: fetch threads (defaults to concurrency) and the
+    # bounded queue of fetched pages between the two stages
+    "fetch_workers": None,
+    "pipeline_queue_size": 64,
+    "parser_backend": "bs4",
+    "prefilter": "none",
+    "prefilter_fallback_fields": list(DEFAULT_FALLBACK_FIELDS),
+    # Prices, ratings and review counts are converted from page text
+    # normalize_batch_size products at a time, in one vectorized pass
+    # (NumPy when installed); 0 converts each product as it is parsed.
+    "normalize_batch_size": 128,
+    # Per-host throttling of the fetch stage. adaptive_concurrency lets an
+    # AIMD controller move each host's in-flight limit between
+    # min_concurrency and the engine's concurrency: +1 per healthy round
+    # (p95 latency within latency_target_seconds, errors within
+    # max_error_rate), halved on 429/503. requests_per_second adds a token
+    # bucket per host allowing request_burst requests at once.
+    "adaptive_concurrency": False,
+    "min_concurrency": 1,
+    "latency_target_seconds": 2.0,
+    "max_error_rate": 0.05,
+    "requests_per_second": None,
+    "request_burst": None,
+    # Retries of timeouts, connection errors, 5xx and 429: up to
+    # max_attempts tries per ASIN with jittered exponential backoff from
+    # retry_base_delay, capped at retry_max_delay. Retries may use at most
+    # retry_budget_ratio of requests (plus a reserve of
+    # retry_budget_reserve). A host's circuit breaker opens for
+    # breaker_cooldown_seconds once breaker_failure_rate of its recent
+    # requests (at least breaker_min_requests) fail.
+    "max_attempts": 3,
+    "retry_base_delay": 1.0,
+    "retry_max_delay": 60.0,
+    "retry_budget_ratio": 0.1,
+    "retry_budget_reserve": 20,
+    "breaker_failure_rate": 0.5,
+    "breaker_min_requests": 20,
+    "breaker_cooldown_seconds": 30.0,
     "timeout_seconds": 20,
+    # On-disk page cache; disabled unless cache_dir is set. Pages younger
+    # than the TTL are reused as is, older ones are revalidated with
+    # If-None-Match/If-Modified-Since. cache_only never touches the network.
+    "cache_dir": None,
+    "cache_ttl_seconds": 86400,
+    "cache_max_bytes": 1 << 30,
+    "cache_only": False,
     "user_agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) "
         "Chrome/119.0 Safari/537.36"
     ),
+    # SQLite job store recording every ASIN's status, attempts and result so
+    # a killed run can be resumed; defaults to <output_dir>/jobs.sqlite3.
+    # Status changes are committed in batches of job_batch_size.
+    "job_db": None,
+    "job_batch_size": 500,
+    # Delta mode: remember a hash of each ASIN's product regions and of its
+    # product record in delta_state (defaults to
+    # <output_dir>/delta_state.sqlite3). Pages whose regions are unchanged
+    # are not parsed, and only new or changed products are exported, with
+    # one line per change appended to amazon_products.changes.jsonl.
+    "delta": False,
+    "delta_state": None,
+    # "i/N" to scrape only the i-th (0-based) of N hash partitions of the
+    # input, so N machines can split one file without coordinating
+    "shard": None,
+    # Coordinator/worker mode: the shared queue (defaults to
+    # <output_dir>/queue.sqlite3), ASINs leased per batch, how long a lease
+    # lasts before a silent worker's ASINs go to another one, and how often
+    # idle workers and the coordinator check the queue. Failed ASINs are
+    # requeued after queue_retry_delay until they have had max_attempts.
+    "queue": None,
+    "queue_batch_size": 20,
+    "queue_lease_seconds": 300.0,
+    "queue_retry_delay": 30.0,
+    "queue_poll_seconds": 5.0,
+    # Monitor mode: check every ASIN of the input over and over, each when
+    # it is next due (schedule kept in monitor_state, defaults to
+    # <output_dir>/monitor.sqlite3). An ASIN starts at
+    # monitor_initial_interval_seconds between checks; the interval halves
+    # when its price or offers changed, grows by half when they did not and
+    # doubles when the page could not be scraped, within the min and max.
+    # All checks share a budget of monitor_requests_per_second, taken
+    # monitor_batch_size ASINs at a time. The input file is re-read when it
+    # changes, at least every monitor_poll_seconds. With a cache_dir, every
+    # check revalidates its cached page whatever cache_ttl_seconds says.
+    "monitor_state": None,
+    "monitor_requests_per_second": 1.0,
+    "monitor_min_interval_seconds": 900.0,
+    "monitor_initial_interval_seconds": 21600.0,
+    "monitor_max_interval_seconds": 604800.0,
+    "monitor_batch_size": 50,
+    "monitor_poll_seconds": 60.0,
+    # Progress is logged and metrics published every metrics_interval_seconds
+    # (0: only once, at the end), in Prometheus text format to metrics_file
+    # and at http://127.0.0.1:<metrics_port>/metrics when a port is set.
+    # profile_every N profiles one ASIN in N with cProfile and tracemalloc
+    # and writes profile.txt and profile.pstats to the output directory.
+    "metrics_file": None,
+    "metrics_port": None,
+    "metrics_interval_seconds": 10.0,
+    "profile_every": 0,
     "output_formats": ["json", "csv"],
     "output_dir": "data",
     "input_file": "data/inputs.sample.txt",
@@ -63,15 +224,16 @@ def load_settings(config_path: Optional[str]) -> Dict[str, Any]:
 
     return settings
 
-def read_asins(input_path: Path) -> List[str]:
-    if not input_path.is_file():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
-    asins: List[str] = []
-    with input_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            asin = line.strip()
-            if asin and not asin.startswith("#"):
-                asins.append(asin)
+def iter_asins(input_path: Path, shard: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield the distinct, valid ASINs in ``input_path`` one line at a time,
+    normalized to upper case and taken out of product URLs where needed.
+    ``shard`` ("i/N") keeps only the ASINs of one hash partition.
+    """
+    return read_asin_file(input_path, parse_shard(shard) if shard else None)
+
+def read_asins(input_path: Path, shard: Optional[str] = None) -> List[str]:
+    asins = list(iter_asins(input_path, shard))
     if not asins:
         raise ValueError(f"No ASINs found in input file {input_path}")
     return asins
@@ -80,102 +242,934 @@ def build_product_url(base_url: str, asin: str) -> str:
     base_url = base_url.rstrip("/")
     return f"{base_url}/dp/{asin}"
 
-def fetch_product_html(
+def request_product_page(
     url: str,
     timeout: int,
     user_agent: str,
-) -> str:
+    session: Optional["requests.Session"] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    accept_language: str = DEFAULT_ACCEPT_LANGUAGE,
+) -> "requests.Response":
     headers = {
         "User-Agent": user_agent,
-        "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Language": accept_language,
     }
+    if extra_headers:
+        headers.update(extra_headers)
     logging.debug("Requesting URL: %s", url)
-    response = requests.get(url, headers=headers, timeout=timeout)
+    # Imported on first use: it is most of runner's import time, and
+    # cache-only runs never need it
+    import requests
+
+    # A shared session reuses pooled keep-alive connections across ASINs
+    http = session if session is not None else requests
+    COUNTERS.inc("fetch.started")
+    start = time.perf_counter()
+    try:
+        response = http.get(url, headers=headers, timeout=timeout)
+    finally:
+        HISTOGRAMS.observe("fetch_seconds", time.perf_counter() - start)
+        COUNTERS.inc("fetch.finished")
+    COUNTERS.inc("fetch.bytes", len(response.content))
     response.raise_for_status()
-    return response.text
+    return response
+
+def fetch_product_html(
+    url: str,
+    timeout: int,
+    user_agent: str,
+    session: Optional["requests.Session"] = None,
+) -> str:
+    return request_product_page(url, timeout, user_agent, session).text
+
+def open_response_cache(settings: Dict[str, Any]) -> Optional[ResponseCache]:
+    cache_dir = settings.get("cache_dir")
+    if not cache_dir:
+        if settings.get("cache_only"):
+            raise ValueError("cache_only needs a cache_dir to read pages from")
+        return None
+    return ResponseCache(
+        Path(cache_dir) / "pages.sqlite3",
+        ttl_seconds=float(settings.get("cache_ttl_seconds", DEFAULT_CONFIG["cache_ttl_seconds"])),
+        max_bytes=int(settings.get("cache_max_bytes", DEFAULT_CONFIG["cache_max_bytes"])),
+    )
+
+def parse_options(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for ``parse_page`` taken from the settings."""
+    return {
+        "backend": str(settings.get("parser_backend", DEFAULT_CONFIG["parser_backend"])),
+        "prefilter": str(settings.get("prefilter", DEFAULT_CONFIG["prefilter"])),
+        "fallback_fields": settings.get(
+            "prefilter_fallback_fields",
+            DEFAULT_CONFIG["prefilter_fallback_fields"],
+        ),
+        # Batched runs normalize after parsing instead
+        "normalize": normalize_batch_size(settings) <= 0,
+        "decimal": decimal_mark(settings),
+    }
+
+def normalize_batch_size(settings: Dict[str, Any]) -> int:
+    return int(settings.get("normalize_batch_size", DEFAULT_CONFIG["normalize_batch_size"]) or 0)
 
 def process_single_asin(
     asin: str,
     settings: Dict[str, Any],
-) -> Optional[Dict[str, Any]]:
+    session: Optional["requests.Session"] = None,
+    cache: Optional[ResponseCache] = None,
+    throttle: Optional[HostThrottle] = None,
+) -> Optional[Product]:
     url = build_product_url(settings["base_url"], asin)
-    try:
-        html = fetch_product_html(
-            url=url,
-            timeout=int(settings.get("timeout_seconds", 20)),
-            user_agent=str(settings.get("user_agent", DEFAULT_CONFIG["user_agent"])),
-        )
-    except Exception as exc:
-        logging.error("Failed to fetch ASIN %s at URL %s: %s", asin, url, exc)
+    html = fetch_asin_html(asin, url, settings, session, cache, throttle)
+    if html is None:
         return None
 
+    return parse_product_html(asin, url, html, settings)
+
+def fetch_asin_html(
+    asin: str,
+    url: str,
+    settings: Dict[str, Any],
+    session: Optional["requests.Session"] = None,
+    cache: Optional[ResponseCache] = None,
+    throttle: Optional[HostThrottle] = None,
+    attempt: Optional[Attempt] = None,
+) -> Optional[str]:
+    with PROFILER.sample(asin, "fetch"):
+        return _fetch_asin_html(asin, url, settings, session, cache, throttle, attempt)
+
+def _fetch_asin_html(
+    asin: str,
+    url: str,
+    settings: Dict[str, Any],
+    session: Optional["requests.Session"],
+    cache: Optional[ResponseCache],
+    throttle: Optional[HostThrottle],
+    attempt: Optional[Attempt],
+) -> Optional[str]:
+    cached = None
+    if cache is not None:
+        key = cache_key(str(settings.get("marketplace", "")), settings["base_url"], asin)
+        cached = cache.lookup(key)
+        if cached is not None and (cached.fresh or settings.get("cache_only")):
+            return cached.body
+    if settings.get("cache_only"):
+        logging.warning("ASIN %s is not in the cache; skipping it", asin)
+        return None
+    import requests
+
+    if attempt is not None and not attempt.allowed():
+        # Circuit open for this host: requeued for later
+        return None
     try:
-        product = parse_product_page(html, asin=asin, url=url)
+        with throttle.slot(url) if throttle is not None else nullcontext(Slot()) as slot:
+            try:
+                response = request_product_page(
+                    url=url,
+                    timeout=int(settings.get("timeout_seconds", 20)),
+                    user_agent=str(settings.get("user_agent", DEFAULT_CONFIG["user_agent"])),
+                    session=session,
+                    extra_headers=conditional_headers(cached),
+                    accept_language=accept_language(settings),
+                )
+                if response.status_code == 304 and cached is not None:
+                    html = None
+                else:
+                    # Captchas and error pages never reach the parser or the cache
+                    html = check_page(response.text, url)
+            except requests.HTTPError as exc:
+                # Lets the throttle tell 429/503 apart from other failures
+                slot.status(exc.response.status_code if exc.response is not None else None)
+                raise
+            except NonProductPage as exc:
+                slot.status(exc.status)
+                raise
     except Exception as exc:
-        logging.error("Failed to parse product for ASIN %s: %s", asin, exc)
+        COUNTERS.inc("errors." + (exc.kind if isinstance(exc, NonProductPage) else error_class(exc)))
+        if attempt is not None and attempt.failed(exc):
+            return None
+        log = logging.warning if isinstance(exc, NonProductPage) else logging.error
+        log("Failed to fetch ASIN %s at URL %s: %s", asin, url, exc)
         return None
+    if attempt is not None:
+        attempt.succeeded()
 
+    if html is None:
+        cache.refresh(key)
+        return cached.body
+    if cache is not None:
+        cache.store(key, html, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return html
+
+def parse_product_html(
+    asin: str,
+    url: str,
+    html: str,
+    settings: Dict[str, Any],
+) -> Optional[Product]:
     try:
-        offers = parse_offers(html)
+        with PROFILER.sample(asin, "parse"), HISTOGRAMS.time("parse_seconds"):
+            product = parse_page(html, asin=asin, url=url, **parse_options(settings))
     except Exception as exc:
-        logging.warning("Failed to parse offers for ASIN %s: %s", asin, exc)
-        offers = []
+        COUNTERS.inc("errors.parse")
+        logging.error("Failed to parse product for ASIN %s: %s", asin, exc)
+        return None
 
-    product["offers"] = offers
     return product
 
-def run(
-    input_file: str,
-    output_dir: str,
-    formats: List[str],
+def parse_changed_html(
+    asin: str,
+    url: str,
+    html: str,
     settings: Dict[str, Any],
-) -> List[Dict[str, Any]]:
-    input_path = Path(input_file)
-    asins = read_asins(input_path)
-    logging.info("Loaded %d ASINs from %s", len(asins), input_path)
+    delta: DeltaTracker,
+) -> Optional[Product]:
+    """``parse_product_html``, unless ``delta`` has seen the same page regions before."""
+    if delta.page_unchanged(asin, html):
+        return None
+    return parse_product_html(asin, url, html, settings)
 
-    products: List[Dict[str, Any]] = []
-    concurrency = int(settings.get("concurrency", 5))
-    if concurrency < 1:
-        concurrency = 1
+def fetch_job(
+    asin: str,
+    url: str,
+    settings: Dict[str, Any],
+    session: Optional["requests.Session"] = None,
+    cache: Optional[ResponseCache] = None,
+    throttle: Optional[HostThrottle] = None,
+    retry_queue: Optional[RetryQueue] = None,
+    delta: Optional[DeltaTracker] = None,
+) -> Optional[str]:
+    """
+    ``fetch_asin_html`` for a job handed out by ``retry_queue``, if any.
 
-    if concurrency == 1 or len(asins) == 1:
-        for asin in asins:
-            product = process_single_asin(asin, settings)
-            if product:
-                products.append(product)
+    With ``delta``, pages whose product regions are unchanged since the
+    last run come back as None so they are never parsed.
+    """
+    if retry_queue is None:
+        html = fetch_asin_html(asin, url, settings, session, cache, throttle)
     else:
-        with ThreadPoolExecutor(max_workers=concurrency) as executor:
-            future_map = {
-                executor.submit(process_single_asin, asin, settings): asin
-                for asin in asins
-            }
-            for future in as_completed(future_map):
-                asin = future_map[future]
+        with retry_queue.job(asin, url) as attempt:
+            html = fetch_asin_html(asin, url, settings, session, cache, throttle, attempt)
+    if html is not None and delta is not None and delta.page_unchanged(asin, html):
+        return None
+    return html
+
+def _scrape_job(
+    asin: str,
+    url: str,
+    settings: Dict[str, Any],
+    fetch: Callable[[str, str], Optional[str]],
+) -> Optional[Product]:
+    html = fetch(asin, url)
+    if html is None:
+        return None
+    return parse_product_html(asin, url, html, settings)
+
+def _iter_threads(
+    jobs: Iterable[Tuple[str, str]],
+    settings: Dict[str, Any],
+    concurrency: int,
+    window: int,
+    fetch: Callable[[str, str], Optional[str]],
+) -> Iterator[Product]:
+    if concurrency == 1:
+        for asin, url in jobs:
+            product = _scrape_job(asin, url, settings, fetch)
+            if product:
+                yield product
+        return
+
+    retry_queue = jobs if isinstance(jobs, RetryQueue) else None
+    job_iter = iter(jobs)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Only ``window`` ASINs are submitted at any time; each completion
+        # pulls the next one from the (lazy) input
+        pending: Dict[Future, str] = {}
+
+        def submit_next() -> bool:
+            # Never blocks on a retry's backoff: completions keep being
+            # drained and fresh ASINs submitted meanwhile
+            job = retry_queue.take() if retry_queue is not None else next(job_iter, None)
+            if job is None:
+                return False
+            asin, url = job
+            pending[executor.submit(_scrape_job, asin, url, settings, fetch)] = asin
+            return True
+
+        def fill() -> None:
+            while len(pending) < window and submit_next():
+                pass
+
+        fill()
+        while pending or (retry_queue is not None and not retry_queue.finished()):
+            # Wake up for the next retry when there is room to submit it
+            due = retry_queue.seconds_until_due() if retry_queue is not None and len(pending) < window else None
+            if not pending:
+                time.sleep(due or 0)
+                fill()
+                continue
+            done, _ = wait(pending, timeout=due, return_when=FIRST_COMPLETED)
+            for future in done:
+                asin = pending.pop(future)
                 try:
                     product = future.result()
-                    if product:
-                        products.append(product)
                 except Exception as exc:  # pragma: no cover - defensive
                     logging.error("Unhandled exception while processing %s: %s", asin, exc)
+                    product = None
+                fill()
+                if product:
+                    yield product
+            fill()
 
-    if not products:
-        logging.warning("No products successfully scraped; nothing to export.")
-        return []
+def _stream(
+    produce: Callable[[Iterator[Tuple[str, str]], Callable[[Product], None]], None],
+    jobs: Iterable[Tuple[str, str]],
+    maxsize: int,
+) -> Iterator[Product]:
+    """
+    Run a callback-style engine in a background thread and yield its output.
+
+    The engine blocks on the bounded queue whenever the consumer falls
+    behind, which keeps the number of finished-but-unexported products
+    below ``maxsize``. If the consumer stops early, the engine is cut off
+    from further jobs, finishes what is in flight and is joined.
+    """
+    products: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+    errors: List[BaseException] = []
+    stop = threading.Event()
+
+    def guarded_jobs() -> Iterator[Tuple[str, str]]:
+        for job in jobs:
+            if stop.is_set():
+                return
+            yield job
+
+    def emit(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                products.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def target() -> None:
+        try:
+            produce(guarded_jobs(), emit)
+        except BaseException as exc:  # re-raised in the consumer
+            errors.append(exc)
+        finally:
+            emit(_DONE)
+
+    thread = threading.Thread(target=target, name="engine", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = products.get()
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+    if errors:
+        raise errors[0]
+
+def iter_products(
+    asins: Iterable[str],
+    settings: Dict[str, Any],
+    delta: Optional[DeltaTracker] = None,
+    cache: Optional[ResponseCache] = None,
+    session: Optional["requests.Session"] = None,
+    throttle: Optional[HostThrottle] = None,
+) -> Iterator[Product]:
+    """
+    Scrape ``asins`` with the configured engine, yielding products as they
+    complete.
+
+    ASINs are pulled from ``asins`` lazily and at most ``max_in_flight`` of
+    them are being worked on at once, so memory does not grow with the size
+    of the input. With ``delta``, ASINs whose page regions have not changed
+    are not parsed and yield nothing. Products are normalized
+    ``normalize_batch_size`` at a time on their way out. The response cache
+    is opened per the settings unless an open ``cache`` is passed in; the
+    threads and pipeline engines likewise build their own session (see
+    ``open_session``) and throttle unless given ones to reuse.
+    """
+    opened = nullcontext(cache) if cache is not None else open_response_cache(settings) or nullcontext()
+    with opened as cache:
+        products = _scrape_products(asins, settings, delta, cache, session, throttle)
+        batch_size = normalize_batch_size(settings)
+        if batch_size > 0:
+            products = normalize_in_batches(products, batch_size, decimal_mark(settings))
+        yield from products
+
+def _scrape_products(
+    asins: Iterable[str],
+    settings: Dict[str, Any],
+    delta: Optional[DeltaTracker],
+    cache: Optional[ResponseCache],
+    session: Optional["requests.Session"] = None,
+    throttle: Optional[HostThrottle] = None,
+) -> Iterator[Product]:
+    concurrency = int(settings.get("concurrency", 5))
+    if concurrency < 1:
+        concurrency = 1
+
+    window = max(concurrency, int(settings.get("max_in_flight") or concurrency * 2))
+    jobs = ((asin, build_product_url(settings["base_url"], asin)) for asin in asins)
+
+    engine = settings.get("engine", "threads")
+    retry_policy = build_retry_policy(settings)
+    # Each engine is imported when selected: the async engine brings in
+    # asyncio and aiohttp, the pipeline multiprocessing
+    if engine == "async":
+        from engines.async_engine import run_async_engine
+
+        if delta is None:
+            parse = partial(parse_product_html, settings=settings)
+        else:
+            parse = partial(parse_changed_html, settings=settings, delta=delta)
+        yield from _stream(
+            lambda guarded, emit: run_async_engine(guarded, settings, parse, emit, cache, retry_policy),
+            jobs,
+            window,
+        )
+        return
+
+    if throttle is None:
+        throttle = build_throttle(settings, fetch_workers(settings))
+    if session is not None or settings.get("cache_only"):
+        # Cache-only runs never touch the network, so need no session
+        opened = nullcontext(session)
+    else:
+        opened = open_session(settings)
+    with opened as session:
+
+        def fetcher(retry_queue: Optional[RetryQueue]) -> Callable[[str, str], Optional[str]]:
+            return partial(
+                fetch_job,
+                settings=settings,
+                session=session,
+                cache=cache,
+                throttle=throttle,
+                retry_queue=retry_queue,
+                delta=delta,
+            )
+
+        def with_retries(source: Iterable[Tuple[str, str]]) -> Tuple[Any, Any]:
+            # Failed jobs are fed back through the job iterator itself
+            retry_queue = RetryQueue(source, retry_policy) if retry_policy else None
+            return retry_queue if retry_queue is not None else source, fetcher(retry_queue)
+
+        if engine == "pipeline":
+            from engines.pipeline import run_pipeline
+
+            options = parse_options(settings)
+
+            def produce(guarded: Iterator[Tuple[str, str]], emit: Callable[[Product], None]) -> None:
+                pipeline_jobs, fetch = with_retries(guarded)
+                run_pipeline(pipeline_jobs, settings, fetch, options, emit)
+
+            yield from _stream(produce, jobs, window)
+        else:
+            thread_jobs, fetch = with_retries(jobs)
+            yield from _iter_threads(thread_jobs, settings, concurrency, window, fetch)
+
+def fetch_workers(settings: Dict[str, Any]) -> int:
+    """Threads fetching at once: the pipeline's fetch stage, or ``concurrency``."""
+    concurrency = max(1, int(settings.get("concurrency", 5)))
+    if settings.get("engine", "threads") == "pipeline":
+        return int(settings.get("fetch_workers") or concurrency)
+    return concurrency
+
+def open_session(settings: Dict[str, Any]) -> "requests.Session":
+    """A keep-alive session with ``pool_size`` connections, by default one per fetch thread."""
+    concurrency = max(1, int(settings.get("concurrency", 5)))
+    pool_size = int(settings.get("pool_size") or concurrency)
+    if settings.get("engine", "threads") == "pipeline":
+        pool_size = max(pool_size, fetch_workers(settings))
+    return build_session(
+        pool_size,
+        user_agent=str(settings.get("user_agent", DEFAULT_CONFIG["user_agent"])),
+        accept_language=accept_language(settings),
+    )
+
+def open_delta_tracker(
+    settings: Dict[str, Any],
+    export_dir: Path,
+    store: JobStore,
+    job_id: str,
+) -> Optional[DeltaTracker]:
+    """A ``DeltaTracker`` for a delta run, or None when delta mode is off."""
+    if not settings.get("delta"):
+        return None
+    state = Path(settings.get("delta_state") or export_dir / "delta_state.sqlite3")
+    return DeltaTracker(
+        state,
+        batch_size=int(settings.get("job_batch_size", DEFAULT_CONFIG["job_batch_size"])),
+        on_unchanged=partial(store.record_unchanged, job_id),
+        change_log=export_dir / "amazon_products.changes.jsonl",
+        run_id=job_id,
+    )
+
+def open_stats_reporter(settings: Dict[str, Any], output_dir: Path) -> StatsReporter:
+    """
+    Reset the process-wide metrics and profiler for a new run and return
+    the reporter that publishes them while it runs (use it as a context).
+    """
+    COUNTERS.reset()
+    HISTOGRAMS.reset()
+    PROFILER.configure(int(settings.get("profile_every") or 0))
+    metrics_file = settings.get("metrics_file")
+    metrics_port = settings.get("metrics_port")
+    return StatsReporter(
+        path=Path(metrics_file) if metrics_file else None,
+        port=int(metrics_port) if metrics_port is not None else None,
+        interval=float(settings.get("metrics_interval_seconds", DEFAULT_CONFIG["metrics_interval_seconds"])),
+    )
+
+def new_job_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
 
+class Partition(NamedTuple):
+    """The share of a run scraped on one marketplace (``marketplace`` None: the only one)."""
+
+    marketplace: Optional[str]
+    job_id: str
+    settings: Dict[str, Any]
+    export_dir: Path
+
+def plan_partitions(settings: Dict[str, Any], export_dir: Path, job_id: str) -> List[Partition]:
+    """
+    One partition per entry of ``marketplaces``, each with its own job
+    (``<job_id>.<code>``), settings and export directory, or a single
+    partition for the whole run when no fan-out is configured.
+    """
+    codes = settings.get("marketplaces")
+    if not codes:
+        return [Partition(None, job_id, settings, export_dir)]
+    partitions = []
+    for code in dict.fromkeys(str(code).upper() for code in codes):
+        scoped = marketplace_settings(settings, code)
+        if scoped.get("delta_state"):
+            # Delta state is keyed on the ASIN alone
+            state = Path(scoped["delta_state"])
+            scoped["delta_state"] = str(state.with_name(f"{state.stem}.{code}{state.suffix}"))
+        partitions.append(Partition(code, f"{job_id}.{code}", scoped, export_dir / code))
+    return partitions
+
+def _merge(streams: Dict[str, Iterator[Product]], maxsize: int) -> Iterator[Tuple[str, Product]]:
+    """
+    Drain every stream in a thread of its own and yield (key, product) in
+    the order products arrive, so a slow stream never holds up the others.
+
+    At most ``maxsize`` products wait in between. If the consumer stops
+    early, the streams are closed and their threads joined.
+    """
+    items: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+    errors: List[BaseException] = []
+    stop = threading.Event()
+
+    def put(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def drain(key: str, stream: Iterator[Product]) -> None:
+        try:
+            for product in stream:
+                if stop.is_set():
+                    break
+                put((key, product))
+        except BaseException as exc:  # re-raised in the consumer
+            errors.append(exc)
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            put(_DONE)
+
+    threads = [
+        threading.Thread(target=drain, args=(key, stream), name=f"stream-{key}", daemon=True)
+        for key, stream in streams.items()
+    ]
+    for thread in threads:
+        thread.start()
+    running = len(threads)
+    try:
+        while running:
+            item = items.get()
+            if item is _DONE:
+                running -= 1
+                continue
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+def run(
+    input_file: str,
+    output_dir: str,
+    formats: List[str],
+    settings: Dict[str, Any],
+    job_id: Optional[str] = None,
+    resume: Optional[str] = None,
+) -> int:
+    """
+    Scrape every ASIN in ``input_file`` and export the products.
+
+    The ASINs are registered as a job in the job store first, and each
+    product is recorded there as it completes. Pass the job id as
+    ``resume`` to continue a killed or partly failed run: the input file is
+    not read again, finished ASINs are exported from the store and only
+    pending or failed ones are scraped. Products are streamed into the
+    exporters as they complete rather than collected in memory first.
+
+    With ``marketplaces`` set, the ASINs are scraped on every one of those
+    marketplaces at once (see ``plan_partitions``), each exported to its
+    own subdirectory of ``output_dir``. Returns the number of products
+    exported.
+    """
     export_dir = Path(output_dir)
-    export_products(
-        products=products,
-        output_dir=export_dir,
-        formats=formats,
-        base_filename="amazon_products",
+    job_db = Path(settings.get("job_db") or export_dir / "jobs.sqlite3")
+    batch_size = int(settings.get("job_batch_size", DEFAULT_CONFIG["job_batch_size"]))
+
+    with open_stats_reporter(settings, export_dir):
+        with JobStore(job_db, batch_size=batch_size) as store:
+            if resume:
+                job_id = resume
+                partitions = plan_partitions(settings, export_dir, job_id)
+                for partition in partitions:
+                    if not store.job_exists(partition.job_id):
+                        raise ValueError(f"No job '{partition.job_id}' in {job_db}")
+                    logging.info("Resuming job %s: %s", partition.job_id, store.counts(partition.job_id))
+            else:
+                input_path = Path(input_file)
+                job_id = job_id or new_job_id()
+                partitions = plan_partitions(settings, export_dir, job_id)
+                for partition in partitions:
+                    asins = iter_asins(input_path, settings.get("shard"))
+                    total = store.create_job(partition.job_id, asins, input_file=str(input_path))
+                    if not total:
+                        raise ValueError(f"No ASINs found in input file {input_path}")
+                    logging.info("Job %s: %d ASINs from %s", partition.job_id, total, input_path)
+
+            exported = export_partitions(store, partitions, formats, settings)
+            counts = {state: 0 for state in (DONE, FAILED, PENDING)}
+            for partition in partitions:
+                for state, count in store.counts(partition.job_id).items():
+                    counts[state] = counts.get(state, 0) + count
+    PROFILER.report(export_dir)
+
+    pages = COUNTERS.snapshot("pages.")
+    if pages:
+        logging.info(
+            "Pages fetched: %s",
+            ", ".join(f"{name[len('pages.'):]}={count}" for name, count in sorted(pages.items())),
+        )
+
+    unfinished = counts[FAILED] + counts[PENDING]
+    if unfinished:
+        logging.warning(
+            "Job %s: %d ASINs failed; retry them with --resume %s",
+            job_id,
+            unfinished,
+            job_id,
+        )
+
+    if not exported:
+        if settings.get("delta") and not unfinished:
+            logging.info("No products changed since the last run; nothing to export.")
+            return 0
+        logging.warning("No products successfully scraped; nothing to export.")
+        return 0
+
+    logging.info(
+        "Scraping completed: %d products exported to %s (job %s, %d done)",
+        exported,
+        export_dir,
+        job_id,
+        counts[DONE],
     )
+    return exported
+
+def export_partitions(
+    store: JobStore,
+    partitions: List[Partition],
+    formats: List[str],
+    settings: Dict[str, Any],
+) -> int:
+    """
+    Export the stored results of each partition's job, then scrape its
+    unfinished ASINs and export the products as they complete. Partitions
+    are scraped side by side, each with its own engine, connection pool
+    and throttle, sharing one response cache. Returns the number of
+    products exported.
+    """
+    with ExitStack() as stack:
+        cache = stack.enter_context(open_response_cache(settings) or nullcontext())
+        exports: Dict[str, ExportSession] = {}
+        deltas: Dict[str, Optional[DeltaTracker]] = {}
+        streams: Dict[str, Iterator[Product]] = {}
+        for partition in partitions:
+            key = partition.marketplace or ""
+            export = exports[key] = stack.enter_context(
+                ExportSession(partition.export_dir, formats, base_filename="amazon_products")
+            )
+            for product in store.iter_results(partition.job_id):
+                export.write(product)
+            delta = deltas[key] = stack.enter_context(
+                open_delta_tracker(partition.settings, partition.export_dir, store, partition.job_id)
+                or nullcontext()
+            )
+            streams[key] = iter_products(store.claim_unfinished(partition.job_id), partition.settings, delta, cache)
+
+        if len(streams) == 1:
+            ((key, stream),) = streams.items()
+            products: Iterator[Tuple[str, Product]] = ((key, product) for product in stream)
+        else:
+            concurrency = max(1, int(settings.get("concurrency", 5)))
+            products = _merge(streams, max(concurrency, int(settings.get("max_in_flight") or concurrency * 2)))
+        job_ids = {partition.marketplace or "": partition.job_id for partition in partitions}
+        for key, product in products:
+            delta = deltas[key]
+            if delta is not None and delta.record_product(product) is None:
+                store.record_unchanged(job_ids[key], str(product.get("asin")))
+                continue
+            store.record_done(job_ids[key], product)
+            exports[key].write(product)
+            if key:
+                COUNTERS.inc(f"products.{key}")
+    return sum(export.count for export in exports.values())
+
+def open_queue(settings: Dict[str, Any], output_dir: str) -> WorkQueue:
+    location = settings.get("queue") or str(Path(output_dir) / "queue.sqlite3")
+    return open_work_queue(
+        str(location),
+        max_attempts=int(settings.get("max_attempts", DEFAULT_CONFIG["max_attempts"])),
+        retry_delay=float(settings.get("queue_retry_delay", DEFAULT_CONFIG["queue_retry_delay"])),
+    )
+
+def coordinate(
+    input_file: str,
+    output_dir: str,
+    formats: List[str],
+    settings: Dict[str, Any],
+    wait: bool = True,
+) -> int:
+    """
+    Enqueue the ASINs in ``input_file`` for workers and, with ``wait``,
+    export the products once the queue has drained.
+
+    ASINs already in the queue are not added twice, so a restarted
+    coordinator picks up where the workers are. Returns the number of
+    products exported.
+    """
+    poll = float(settings.get("queue_poll_seconds", DEFAULT_CONFIG["queue_poll_seconds"]))
+    with open_queue(settings, output_dir) as work_queue:
+        added = work_queue.enqueue(iter_asins(Path(input_file), settings.get("shard")))
+        logging.info("Enqueued %d new ASINs from %s: %s", added, input_file, work_queue.counts())
+        if not wait:
+            return 0
+
+        while work_queue.unfinished():
+            time.sleep(poll)
+            logging.info("Queue: %s", work_queue.counts())
+
+        counts = work_queue.counts()
+        with ExportSession(Path(output_dir), formats, base_filename="amazon_products") as export:
+            for product in work_queue.iter_results():
+                export.write(product)
+
+    if counts[QUEUE_FAILED]:
+        logging.warning("%d ASINs failed on every attempt", counts[QUEUE_FAILED])
+    logging.info("Exported %d products to %s", export.count, output_dir)
+    return export.count
+
+def work(
+    settings: Dict[str, Any],
+    output_dir: str,
+    worker_id: Optional[str] = None,
+) -> int:
+    """
+    Lease batches of ASINs from the queue and scrape them with
+    ``process_single_asin`` until no work is left; returns the number of
+    products scraped.
+
+    Each batch is scraped ``concurrency`` ASINs at a time and reported as
+    a whole, so a batch must finish within ``queue_lease_seconds`` or its
+    ASINs are handed to another worker as well.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    concurrency = max(1, int(settings.get("concurrency", 5)))
+    batch_size = int(settings.get("queue_batch_size", DEFAULT_CONFIG["queue_batch_size"]))
+    lease_seconds = float(settings.get("queue_lease_seconds", DEFAULT_CONFIG["queue_lease_seconds"]))
+    poll = float(settings.get("queue_poll_seconds", DEFAULT_CONFIG["queue_poll_seconds"]))
+    user_agent = str(settings.get("user_agent", DEFAULT_CONFIG["user_agent"]))
+    language = accept_language(settings)
+    pool_size = int(settings.get("pool_size") or concurrency)
+
+    scraped = 0
+    reporter = open_stats_reporter(settings, Path(output_dir))
+    with reporter, open_queue(settings, output_dir) as work_queue, open_response_cache(settings) or nullcontext() as cache:
+        throttle = build_throttle(settings, concurrency)
+        with build_session(pool_size, user_agent=user_agent, accept_language=language) as session, ThreadPoolExecutor(
+            max_workers=concurrency
+        ) as executor:
+            scrape = partial(process_single_asin, settings=settings, session=session, cache=cache, throttle=throttle)
+            while True:
+                batch = work_queue.lease(worker_id, batch_size, lease_seconds)
+                if not batch:
+                    if not work_queue.unfinished():
+                        break
+                    # Everything left is leased by other workers or waiting
+                    # to be retried; one of those leases may yet expire
+                    time.sleep(poll)
+                    continue
+                results = dict(zip(batch, executor.map(scrape, batch)))
+                if normalize_batch_size(settings) > 0:
+                    normalize_products(
+                        [product for product in results.values() if product is not None],
+                        decimal_mark(settings),
+                    )
+                work_queue.complete(worker_id, results)
+                succeeded = sum(1 for product in results.values() if product is not None)
+                scraped += succeeded
+                logging.info("Worker %s: scraped %d of %d leased ASINs", worker_id, succeeded, len(batch))
+
+    PROFILER.report(Path(output_dir))
+    logging.info("Worker %s finished: %d products scraped", worker_id, scraped)
+    return scraped
+
+def open_refresh_schedule(settings: Dict[str, Any], output_dir: Path) -> RefreshSchedule:
+    state = Path(settings.get("monitor_state") or output_dir / "monitor.sqlite3")
+    return RefreshSchedule(
+        state,
+        min_interval=float(settings.get("monitor_min_interval_seconds", DEFAULT_CONFIG["monitor_min_interval_seconds"])),
+        max_interval=float(settings.get("monitor_max_interval_seconds", DEFAULT_CONFIG["monitor_max_interval_seconds"])),
+        initial_interval=float(
+            settings.get("monitor_initial_interval_seconds", DEFAULT_CONFIG["monitor_initial_interval_seconds"])
+        ),
+        batch_size=int(settings.get("job_batch_size", DEFAULT_CONFIG["job_batch_size"])),
+    )
+
+def _until_stopped(asins: Iterable[str], stop: threading.Event, taken: List[str]) -> Iterator[str]:
+    for asin in asins:
+        if stop.is_set():
+            return
+        taken.append(asin)
+        yield asin
+
+def monitor(
+    input_file: str,
+    output_dir: str,
+    settings: Dict[str, Any],
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """
+    Check the ASINs in ``input_file`` over and over until ``stop`` is set,
+    each one when the refresh schedule says it is due, the most overdue
+    first; returns the number of checks.
+
+    Due ASINs are scraped ``monitor_batch_size`` at a time at no more than
+    ``monitor_requests_per_second`` overall, retries included. New and
+    changed products are appended to ``amazon_products.monitor.jsonl`` in
+    ``output_dir`` as they are found. The schedule outlives the process,
+    so a restarted monitor carries on where it stopped.
+    """
+    stop = stop or threading.Event()
+    export_dir = Path(output_dir)
+    input_path = Path(input_file)
+    rate = float(settings.get("monitor_requests_per_second", DEFAULT_CONFIG["monitor_requests_per_second"]))
+    if rate <= 0:
+        raise ValueError("monitor_requests_per_second must be positive")
+    if settings.get("cache_only"):
+        raise ValueError("The monitor checks live pages; it cannot run cache-only")
+    batch_size = max(1, int(settings.get("monitor_batch_size", DEFAULT_CONFIG["monitor_batch_size"])))
+    poll = float(settings.get("monitor_poll_seconds", DEFAULT_CONFIG["monitor_poll_seconds"]))
+    # Requests are spaced by the host throttle; the shared bucket keeps
+    # each batch from starting before the last one is paid for (the async
+    # engine throttles each batch on its own)
+    limit = settings.get("requests_per_second")
+    batch_settings = dict(settings, requests_per_second=min(rate, float(limit)) if limit else rate, request_burst=1)
+    budget = TokenBucket(rate)
+
+    checks = 0
+    loaded: Optional[int] = None
+    with ExitStack() as stack:
+        stack.enter_context(open_stats_reporter(settings, export_dir))
+        schedule = stack.enter_context(open_refresh_schedule(settings, export_dir))
+        # Every check must reach the server: cached pages are only used to
+        # revalidate (a 304 still saves the download), never served as fresh
+        cache = stack.enter_context(open_response_cache(dict(settings, cache_ttl_seconds=0)) or nullcontext())
+        # Kept for the life of the monitor, so batches reuse warm connections
+        session = stack.enter_context(open_session(batch_settings))
+        throttle = build_throttle(batch_settings, fetch_workers(batch_settings))
+        export_dir.mkdir(parents=True, exist_ok=True)
+        log = stack.enter_context(
+            (export_dir / "amazon_products.monitor.jsonl").open("a", encoding="utf-8", buffering=1)
+        )
+        while not stop.is_set():
+            modified = input_path.stat().st_mtime_ns
+            if modified != loaded:
+                loaded = modified
+                added, removed = schedule.sync(iter_asins(input_path, settings.get("shard")))
+                if not len(schedule):
+                    raise ValueError(f"No ASINs found in input file {input_path}")
+                logging.info("Monitoring %d ASINs from %s (%d added, %d removed)", len(schedule), input_path, added, removed)
 
-    logging.info("Scraping completed: %d products exported to %s", len(products), export_dir)
-    return products
+            due = schedule.pop_due(batch_size)
+            if not due:
+                wait = schedule.seconds_until_due()
+                stop.wait(poll if wait is None else min(wait, poll))
+                continue
+            delays = [budget.reserve() for _ in due]
+            taken: List[str] = []
+            if not stop.wait(delays[0]):
+                checked = set()
+                batch = _until_stopped(due, stop, taken)
+                for product in iter_products(batch, batch_settings, cache=cache, session=session, throttle=throttle):
+                    asin = str(product.get("asin"))
+                    checked.add(asin)
+                    outcome = schedule.record(asin, product)
+                    COUNTERS.inc(f"monitor.{outcome}")
+                    if outcome in (NEW, CHANGED):
+                        entry = {
+                            "asin": asin,
+                            "change": outcome,
+                            "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                            "product": product,
+                        }
+                        log.write(json.dumps(entry, ensure_ascii=False, default=json_default) + "\n")
+                for asin in taken:
+                    if asin not in checked:
+                        COUNTERS.inc(f"monitor.{schedule.record(asin, None)}")
+                checks += len(taken)
+            # Stopped before these were handed to the engine
+            for asin in due[len(taken):]:
+                schedule.requeue(asin)
+    PROFILER.report(export_dir)
+    logging.info("Monitor stopped after %d checks", checks)
+    return checks
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Amazon ASINs Scraper runner")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=COMMANDS,
+        default="run",
+        help=(
+            "run: scrape the input in this process (default); coordinator: enqueue the input "
+            "for workers and export their results; worker: scrape ASINs from the queue; "
+            "monitor: keep re-checking the input, each ASIN as often as its price changes"
+        ),
+    )
     parser.add_argument(
         "--config",
         "-c",
@@ -194,7 +1188,106 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "--formats",
         "-f",
-        help="Comma-separated list of output formats (json,csv,excel,html)",
+        help="Comma-separated list of output formats (json,jsonl,csv,excel,html,parquet)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        help="Fetch engine: thread pool or a single asyncio event loop (overrides engine in config)",
+    )
+    parser.add_argument(
+        "--parser-backend",
+        choices=BACKENDS,
+        help="HTML parser backend for the extractors (overrides parser_backend in config)",
+    )
+    parser.add_argument(
+        "--prefilter",
+        choices=PREFILTER_MODES,
+        help="Shrink pages before parsing: strip scripts/styles or keep only product sections",
+    )
+    parser.add_argument(
+        "--no-prefilter-fallback",
+        action="store_true",
+        help="Do not re-parse the full page when a prefiltered parse leaves a field empty",
+    )
+    parser.add_argument(
+        "--normalize-batch-size",
+        type=int,
+        help="Products per vectorized price/rating normalization pass; 0 normalizes each product "
+        "as it is parsed (overrides normalize_batch_size in config)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Keep fetched pages in an on-disk cache in this directory (overrides cache_dir in config)",
+    )
+    parser.add_argument(
+        "--cache-only",
+        action="store_true",
+        help="Re-parse cached pages without any network access; uncached ASINs are skipped",
+    )
+    parser.add_argument(
+        "--job-id",
+        help="Name for this run in the job store (defaults to a timestamp)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="JOB",
+        help="Continue a job from the job store, scraping only its pending and failed ASINs",
+    )
+    parser.add_argument(
+        "--marketplace",
+        metavar="CODE",
+        help=f"Scrape this marketplace ({', '.join(MARKETPLACES)}): its base URL, language and decimal mark",
+    )
+    parser.add_argument(
+        "--marketplaces",
+        metavar="CODES",
+        help="Scrape the input on each of these comma-separated marketplaces at once, exporting to "
+        "<output-dir>/<CODE> (overrides marketplaces in config; run command only)",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Scrape only shard I (0-based) of N hash partitions of the input (overrides shard in config)",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Only parse pages and export products that changed since the last delta run",
+    )
+    parser.add_argument(
+        "--monitor-rps",
+        type=float,
+        metavar="RATE",
+        help="Requests per second the monitor may make in total (overrides monitor_requests_per_second in config)",
+    )
+    parser.add_argument(
+        "--queue",
+        help="Work queue shared by coordinator and workers (SQLite file; overrides queue in config)",
+    )
+    parser.add_argument(
+        "--worker-id",
+        help="Name of this worker in the queue (defaults to host name and PID)",
+    )
+    parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="Coordinator only enqueues the input and exits instead of waiting to export",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Rewrite this file with Prometheus-format metrics while running (overrides metrics_file in config)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus-format metrics at http://127.0.0.1:PORT/metrics (overrides metrics_port in config)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=int,
+        metavar="N",
+        help="Profile every Nth ASIN with cProfile and tracemalloc; writes profile.txt to the output directory",
     )
     parser.add_argument(
         "-v",
@@ -209,6 +1302,38 @@ def main(argv: Optional[List[str]] = None) -> None:
     args = parse_args(argv)
     setup_logging(args.verbose)
     settings = load_settings(args.config)
+    if args.engine:
+        settings["engine"] = args.engine
+    if args.parser_backend:
+        settings["parser_backend"] = args.parser_backend
+    if args.prefilter:
+        settings["prefilter"] = args.prefilter
+    if args.no_prefilter_fallback:
+        settings["prefilter_fallback_fields"] = []
+    if args.normalize_batch_size is not None:
+        settings["normalize_batch_size"] = args.normalize_batch_size
+    if args.cache_dir:
+        settings["cache_dir"] = args.cache_dir
+    if args.cache_only:
+        settings["cache_only"] = True
+    if args.delta:
+        settings["delta"] = True
+    if args.marketplace:
+        settings.update(marketplace_settings(settings, args.marketplace))
+    if args.marketplaces:
+        settings["marketplaces"] = [code.strip().upper() for code in args.marketplaces.split(",") if code.strip()]
+    if args.shard:
+        settings["shard"] = args.shard
+    if args.monitor_rps is not None:
+        settings["monitor_requests_per_second"] = args.monitor_rps
+    if args.queue:
+        settings["queue"] = args.queue
+    if args.metrics_file:
+        settings["metrics_file"] = args.metrics_file
+    if args.metrics_port is not None:
+        settings["metrics_port"] = args.metrics_port
+    if args.profile is not None:
+        settings["profile_every"] = args.profile
 
     input_file = args.input or settings.get("input_file") or DEFAULT_CONFIG["input_file"]
     output_dir = args.output_dir or settings.get("output_dir") or DEFAULT_CONFIG["output_dir"]
@@ -221,17 +1346,47 @@ def main(argv: Optional[List[str]] = None) -> None:
             "csv",
         ]
 
-    valid_formats = {"json", "csv", "excel", "html"}
     for fmt in formats:
-        if fmt not in valid_formats:
-            raise ValueError(f"Unsupported export format '{fmt}'. Valid: {sorted(valid_formats)}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}'. Valid: {sorted(EXPORT_FORMATS)}")
 
-    run(
-        input_file=input_file,
-        output_dir=output_dir,
-        formats=formats,
-        settings=settings,
-    )
+    engine = str(settings.get("engine", "threads"))
+    if engine not in ENGINES:
+        raise ValueError(f"Unsupported engine '{engine}'. Valid: {list(ENGINES)}")
+    backend = str(settings.get("parser_backend", "bs4"))
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported parser backend '{backend}'. Valid: {list(BACKENDS)}")
+    prefilter = str(settings.get("prefilter", "none"))
+    if prefilter not in PREFILTER_MODES:
+        raise ValueError(f"Unsupported prefilter mode '{prefilter}'. Valid: {list(PREFILTER_MODES)}")
+    if settings.get("shard"):
+        parse_shard(str(settings["shard"]))
+    if settings.get("cache_only") and not settings.get("cache_dir"):
+        raise ValueError("--cache-only needs a cache directory (--cache-dir or cache_dir in config)")
+    if settings.get("marketplaces"):
+        if args.command != "run":
+            raise ValueError("Fan-out over marketplaces is only supported by the run command")
+        for code in settings["marketplaces"]:
+            marketplace_settings(settings, str(code))
+
+    if args.command == "coordinator":
+        coordinate(input_file, output_dir, formats, settings, wait=not args.no_wait)
+    elif args.command == "worker":
+        work(settings, output_dir, worker_id=args.worker_id)
+    elif args.command == "monitor":
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        monitor(input_file, output_dir, settings, stop=stop)
+    else:
+        run(
+            input_file=input_file,
+            output_dir=output_dir,
+            formats=formats,
+            settings=settings,
+            job_id=args.job_id,
+            resume=args.resume,
+        )
 
 if __name__ == "__main__":  # pragma: no cover - manual execution
     main()
\ No newline at end of file
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Mapping, Optional, Tuple
+
+from extractors.prefilter import slice_sections
+from extractors.records import Record
+
+logger = logging.getLogger(__name__)
+
+NEW = "new"
+CHANGED = "changed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS delta (
+    asin TEXT PRIMARY KEY,
+    region_hash BLOB NOT NULL,
+    product_hash BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+def _digest(data: str) -> bytes:
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest()
+
+def region_hash(html: str) -> bytes:
+    """
+    Hash of the page regions the extractors read.
+
+    The regions are the ones ``prefilter.slice_sections`` keeps, so ads,
+    scripts, recommendations and other churn outside them do not count as
+    a change. A field that is only found outside those regions, such as a
+    stray ``a-offscreen`` price, is not covered.
+    """
+    return _digest(slice_sections(html))
+
+def _hash_default(value: Any) -> Any:
+    return value.to_dict() if isinstance(value, Record) else str(value)
+
+def product_hash(product: Mapping[str, Any]) -> bytes:
+    # A record and the dict it exports to hash the same
+    return _digest(json.dumps(product, sort_keys=True, ensure_ascii=False, default=_hash_default))
+
+class DeltaTracker:
+    """
+    Per-ASIN region and product hashes from earlier runs, in a SQLite file.
+
+    ``page_unchanged`` runs before parsing: a page whose regions hash as
+    last time is not parsed at all. Pages that do get parsed go through
+    ``record_product``, which tells new and changed products from ones
+    that parse to the same record as last time; with ``change_log``, each
+    new or changed product also appends a JSON line there. Each ASIN takes
+    16 bytes of hashes. Writes are buffered and committed every
+    ``batch_size`` updates. Safe to share between fetch threads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = 500,
+        on_unchanged: Optional[Callable[[str], None]] = None,
+        change_log: Optional[Path] = None,
+        run_id: Optional[str] = None,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.on_unchanged = on_unchanged
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Writes not committed yet, by ASIN
+        self._buffer: Dict[str, Tuple[bytes, bytes]] = {}
+        # Region hashes of pages being parsed, until their product is recorded
+        self._parsing: Dict[str, bytes] = {}
+        self.run_id = run_id
+        self._log: Optional[IO[str]] = None
+        if change_log is not None:
+            change_log.parent.mkdir(parents=True, exist_ok=True)
+            self._log = change_log.open("a", encoding="utf-8", buffering=1)
+        self.counts = {"unchanged_pages": 0, "unchanged_products": 0, NEW: 0, CHANGED: 0}
+
+    def _lookup(self, asin: str) -> Optional[Tuple[bytes, bytes]]:
+        state = self._buffer.get(asin)
+        if state is None:
+            row = self._conn.execute(
+                "SELECT region_hash, product_hash FROM delta WHERE asin = ?",
+                (asin,),
+            ).fetchone()
+            state = (row[0], row[1]) if row else None
+        return state
+
+    def page_unchanged(self, asin: str, html: str) -> bool:
+        """True when ``html`` matches the last run's regions; the page need not be parsed."""
+        digest = region_hash(html)
+        with self._lock:
+            state = self._lookup(asin)
+            unchanged = state is not None and state[0] == digest
+            if unchanged:
+                self.counts["unchanged_pages"] += 1
+            else:
+                self._parsing[asin] = digest
+        if unchanged and self.on_unchanged is not None:
+            self.on_unchanged(asin)
+        return unchanged
+
+    def record_product(self, product: Mapping[str, Any]) -> Optional[str]:
+        """Store the hashes for ``product``; returns ``NEW``, ``CHANGED`` or None if unchanged."""
+        asin = str(product.get("asin"))
+        digest = product_hash(product)
+        with self._lock:
+            state = self._lookup(asin)
+            regions = self._parsing.pop(asin, None) or (state[0] if state else b"")
+            if state is None:
+                change: Optional[str] = NEW
+            elif state[1] != digest:
+                change = CHANGED
+            else:
+                change = None
+            self.counts[change or "unchanged_products"] += 1
+            self._buffer[asin] = (regions, digest)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+            if change is not None and self._log is not None:
+                entry = {
+                    "asin": asin,
+                    "change": change,
+                    "run": self.run_id,
+                    "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                }
+                self._log.write(json.dumps(entry) + "\n")
+        return change
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        now = time.time()
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO delta (asin, region_hash, product_hash, updated_at) VALUES (?, ?, ?, ?)",
+            [(asin, regions, digest, now) for asin, (regions, digest) in self._buffer.items()],
+        )
+        self._conn.execute("COMMIT")
+        self._buffer = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
+            if self._log is not None:
+                self._log.close()
+        logger.info(
+            "Delta: %d new, %d changed, %d unchanged pages skipped, %d parsed but unchanged",
+            self.counts[NEW],
+            self.counts[CHANGED],
+            self.counts["unchanged_pages"],
+            self.counts["unchanged_products"],
+        )
+
+    def __enter__(self) -> "DeltaTracker":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,213 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from extractors.records import json_default
+
+logger = logging.getLogger(__name__)
+
+# ASIN states: never handed to an engine, handed out without a product
+# coming back (failed, or cut off by a crash), or scraped
+PENDING = "pending"
+FAILED = "failed"
+DONE = "done"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    input_file TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_asins (
+    job_id TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    updated_at REAL,
+    PRIMARY KEY (job_id, asin)
+);
+CREATE INDEX IF NOT EXISTS job_asins_status ON job_asins (job_id, status);
+"""
+
+_PAGE_SIZE = 1000
+
+class JobStore:
+    """
+    Per-ASIN progress of scrape jobs in a SQLite database (WAL mode).
+
+    Status changes are buffered and committed together every
+    ``batch_size`` changes or ``flush_seconds``, whichever comes first, so
+    a transaction per ASIN never slows the scrape down. A crash loses at
+    most that last batch, and those ASINs are simply scraped again on
+    resume. Safe to share between engine threads.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 500, flush_seconds: float = 1.0) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.flush_seconds = float(flush_seconds)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._attempts: List[Tuple[float, str, str]] = []
+        self._done: List[Tuple[str, float, str, str]] = []
+        self._last_flush = time.monotonic()
+
+    def create_job(self, job_id: str, asins: Iterable[str], input_file: Optional[str] = None) -> int:
+        """Register a new job and its ASINs as pending; returns the ASIN count."""
+        with self._lock:
+            if self._job_exists(job_id):
+                raise ValueError(f"Job '{job_id}' already exists; use --resume to continue it")
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, input_file, created_at) VALUES (?, ?, ?)",
+                (job_id, input_file, time.time()),
+            )
+            batch: List[Tuple[str, str]] = []
+            for asin in asins:
+                batch.append((job_id, asin))
+                if len(batch) >= _PAGE_SIZE:
+                    self._insert_asins(batch)
+                    batch = []
+            self._insert_asins(batch)
+            self._conn.execute("COMMIT")
+        return self.total(job_id)
+
+    def _insert_asins(self, rows: List[Tuple[str, str]]) -> None:
+        # Duplicate ASINs in the input are scraped once
+        self._conn.executemany("INSERT OR IGNORE INTO job_asins (job_id, asin) VALUES (?, ?)", rows)
+
+    def _job_exists(self, job_id: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def job_exists(self, job_id: str) -> bool:
+        with self._lock:
+            return self._job_exists(job_id)
+
+    def claim_unfinished(self, job_id: str) -> Iterator[str]:
+        """
+        Yield the job's pending and failed ASINs in input order, counting an
+        attempt for each as it is handed out.
+
+        An ASIN stays ``failed`` until ``record_done`` sees its product, so
+        one that is in flight when the process dies is retried on resume.
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, asin FROM job_asins "
+                    "WHERE job_id = ? AND status != ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (job_id, DONE, last_rowid, _PAGE_SIZE),
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, asin in rows:
+                last_rowid = rowid
+                with self._lock:
+                    self._attempts.append((time.time(), job_id, asin))
+                    self._maybe_flush()
+                yield asin
+
+    def record_done(self, job_id: str, product: Mapping[str, Any]) -> None:
+        result = json.dumps(product, ensure_ascii=False, default=json_default)
+        with self._lock:
+            self._done.append((result, time.time(), job_id, str(product.get("asin"))))
+            self._maybe_flush()
+
+    def record_unchanged(self, job_id: str, asin: str) -> None:
+        """Mark ``asin`` done with no result, for delta runs where nothing changed."""
+        with self._lock:
+            self._done.append((None, time.time(), job_id, asin))
+            self._maybe_flush()
+
+    def iter_results(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield the products already scraped for ``job_id``, in input order."""
+        self.flush()
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, result FROM job_asins "
+                    "WHERE job_id = ? AND status = ? AND result IS NOT NULL AND rowid > ? "
+                    "ORDER BY rowid LIMIT ?",
+                    (job_id, DONE, last_rowid, _PAGE_SIZE),
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, result in rows:
+                last_rowid = rowid
+                yield json.loads(result)
+
+    def counts(self, job_id: str) -> Dict[str, int]:
+        self.flush()
+        counts = {PENDING: 0, FAILED: 0, DONE: 0}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_asins WHERE job_id = ? GROUP BY status",
+                (job_id,),
+            ).fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def total(self, job_id: str) -> int:
+        return sum(self.counts(job_id).values())
+
+    def attempts(self, job_id: str, asin: str) -> int:
+        self.flush()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM job_asins WHERE job_id = ? AND asin = ?",
+                (job_id, asin),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def _maybe_flush(self) -> None:
+        pending = len(self._attempts) + len(self._done)
+        if pending >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not (self._attempts or self._done):
+            return
+        self._conn.execute("BEGIN")
+        # An ASIN's attempt is always buffered before its result, so
+        # applying attempts first keeps the final state right
+        self._conn.executemany(
+            "UPDATE job_asins SET status = 'failed', attempts = attempts + 1, updated_at = ? "
+            "WHERE job_id = ? AND asin = ? AND status != 'done'",
+            self._attempts,
+        )
+        self._conn.executemany(
+            "UPDATE job_asins SET status = 'done', result = ?, updated_at = ? "
+            "WHERE job_id = ? AND asin = ?",
+            self._done,
+        )
+        self._conn.execute("COMMIT")
+        logger.debug("Job store: committed %d attempts, %d results", len(self._attempts), len(self._done))
+        self._attempts = []
+        self._done = []
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+    def __enter__(self) -> "JobStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
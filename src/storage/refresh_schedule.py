@@ -0,0 +1,297 @@
+import hashlib
+import heapq
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# What a check found, as far as the schedule is concerned
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+OUTCOMES = (NEW, CHANGED, UNCHANGED, FAILED)
+
+# Interval multipliers: an ASIN whose price or offers changed is checked
+# twice as often, one that did not a third less often, and one that could
+# not be fetched (dead listing, captcha, timeout) half as often
+_FACTORS = {NEW: 1.0, CHANGED: 0.5, UNCHANGED: 1.5, FAILED: 2.0}
+# Due times are spread by up to this fraction of the interval, so ASINs
+# added together do not stay in lockstep
+_JITTER = 0.1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS refresh (
+    asin TEXT PRIMARY KEY,
+    next_due REAL NOT NULL,
+    interval REAL NOT NULL,
+    fingerprint BLOB,
+    checks INTEGER NOT NULL DEFAULT 0,
+    changes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    checked_at REAL,
+    changed_at REAL
+);
+"""
+
+def fingerprint(product: Mapping[str, Any]) -> bytes:
+    """
+    Hash of the fields whose changes make an ASIN worth checking more
+    often: the price and the offers. Titles, descriptions and ratings
+    drift without that mattering.
+    """
+    fields = {
+        "price": [product.get("price.value"), product.get("price.max"), product.get("price_currency")],
+        "offers": [
+            [offer.get("price.value"), offer.get("seller"), offer.get("condition")]
+            for offer in product.get("offers") or ()
+        ],
+    }
+    return hashlib.blake2b(json.dumps(fields, ensure_ascii=False).encode("utf-8"), digest_size=8).digest()
+
+def next_interval(interval: float, outcome: str, min_interval: float, max_interval: float) -> float:
+    """The refresh interval after a check with ``outcome``, kept within the bounds."""
+    return min(max_interval, max(min_interval, interval * _FACTORS[outcome]))
+
+class _State:
+    __slots__ = ("next_due", "interval", "fingerprint", "checks", "changes", "failures", "checked_at", "changed_at")
+
+    def __init__(
+        self,
+        next_due: float,
+        interval: float,
+        fingerprint: Optional[bytes] = None,
+        checks: int = 0,
+        changes: int = 0,
+        failures: int = 0,
+        checked_at: Optional[float] = None,
+        changed_at: Optional[float] = None,
+    ) -> None:
+        self.next_due = next_due
+        self.interval = interval
+        self.fingerprint = fingerprint
+        self.checks = checks
+        self.changes = changes
+        self.failures = failures
+        self.checked_at = checked_at
+        self.changed_at = changed_at
+
+class RefreshSchedule:
+    """
+    When each monitored ASIN is next due, in a SQLite file, with a heap
+    ordered by due time in memory.
+
+    ``pop_due`` hands out the most overdue ASINs first; every ASIN handed
+    out goes back through ``record`` (with its product, or None when the
+    fetch failed) or ``requeue`` (when it was never fetched). ``record``
+    moves the interval by the outcome (see ``next_interval``) and makes
+    the ASIN due again one interval later. Writes are buffered and
+    committed every ``batch_size`` checks. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        min_interval: float,
+        max_interval: float,
+        initial_interval: Optional[float] = None,
+        batch_size: int = 100,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.min_interval = float(min_interval)
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.initial_interval = next_interval(
+            float(initial_interval if initial_interval is not None else min_interval), NEW, self.min_interval, self.max_interval
+        )
+        self.batch_size = max(1, int(batch_size))
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._states: Dict[str, _State] = {}
+        for row in self._conn.execute(
+            "SELECT asin, next_due, interval, fingerprint, checks, changes, failures, checked_at, changed_at FROM refresh"
+        ):
+            self._states[row[0]] = _State(*row[1:])
+        self._heap: List[Tuple[float, str]] = [(state.next_due, asin) for asin, state in self._states.items()]
+        heapq.heapify(self._heap)
+        # Handed out by pop_due and not recorded or requeued yet
+        self._out: Dict[str, float] = {}
+        self._dirty: Dict[str, Optional[_State]] = {}
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
+
+    def sync(self, asins: Iterable[str]) -> Tuple[int, int]:
+        """
+        Monitor exactly ``asins``: new ones are due at once, ones no longer
+        listed are dropped. Returns (added, removed).
+        """
+        wanted = dict.fromkeys(asins)
+        now = self.clock()
+        with self._lock:
+            added = [asin for asin in wanted if asin not in self._states]
+            removed = [asin for asin in self._states if asin not in wanted]
+            for asin in added:
+                state = self._states[asin] = _State(now, self.initial_interval)
+                heapq.heappush(self._heap, (now, asin))
+                self._dirty[asin] = state
+            for asin in removed:
+                # Its heap entry is skipped when it comes up
+                del self._states[asin]
+                self._out.pop(asin, None)
+                self._dirty[asin] = None
+            self._maybe_flush()
+        return len(added), len(removed)
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Seconds until the next ASIN is due (0 if one is overdue), or None if none is waiting."""
+        with self._lock:
+            self._drop_stale()
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - self.clock())
+
+    def _drop_stale(self) -> None:
+        # Entries of dropped ASINs and superseded due times
+        while self._heap:
+            due, asin = self._heap[0]
+            state = self._states.get(asin)
+            if state is not None and state.next_due == due and asin not in self._out:
+                return
+            heapq.heappop(self._heap)
+
+    def pop_due(self, limit: int) -> List[str]:
+        """Up to ``limit`` ASINs that are due, the most overdue first."""
+        now = self.clock()
+        due: List[str] = []
+        with self._lock:
+            while len(due) < limit:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                when, asin = heapq.heappop(self._heap)
+                self._out[asin] = when
+                due.append(asin)
+        return due
+
+    def requeue(self, asin: str) -> None:
+        """Put back an ASIN from ``pop_due`` that was not checked after all."""
+        with self._lock:
+            when = self._out.pop(asin, None)
+            if when is not None and asin in self._states:
+                heapq.heappush(self._heap, (when, asin))
+
+    def record(self, asin: str, product: Optional[Mapping[str, Any]]) -> str:
+        """Record a check of ``asin`` (``product`` None: the fetch failed); returns its outcome."""
+        now = self.clock()
+        with self._lock:
+            self._out.pop(asin, None)
+            state = self._states.get(asin)
+            if state is None:
+                # Dropped from the list while it was being checked
+                return FAILED if product is None else UNCHANGED
+            state.checks += 1
+            state.checked_at = now
+            if product is None:
+                outcome = FAILED
+                state.failures += 1
+            else:
+                digest = fingerprint(product)
+                if state.fingerprint is None:
+                    outcome = NEW
+                elif digest != state.fingerprint:
+                    outcome = CHANGED
+                    state.changes += 1
+                    state.changed_at = now
+                else:
+                    outcome = UNCHANGED
+                state.fingerprint = digest
+            state.interval = next_interval(state.interval, outcome, self.min_interval, self.max_interval)
+            state.next_due = now + state.interval * (1 + random.uniform(-_JITTER, _JITTER))
+            heapq.heappush(self._heap, (state.next_due, asin))
+            self.counts[outcome] += 1
+            self._dirty[asin] = state
+            self._maybe_flush()
+        return outcome
+
+    def interval(self, asin: str) -> Optional[float]:
+        """Current refresh interval of ``asin`` in seconds."""
+        with self._lock:
+            state = self._states.get(asin)
+            return state.interval if state is not None else None
+
+    def checks(self, asin: str) -> int:
+        with self._lock:
+            state = self._states.get(asin)
+            return state.checks if state is not None else 0
+
+    def _maybe_flush(self) -> None:
+        if len(self._dirty) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._dirty:
+            return
+        updates = [(asin, state) for asin, state in self._dirty.items() if state is not None]
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "DELETE FROM refresh WHERE asin = ?",
+            [(asin,) for asin, state in self._dirty.items() if state is None],
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO refresh "
+            "(asin, next_due, interval, fingerprint, checks, changes, failures, checked_at, changed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    asin,
+                    state.next_due,
+                    state.interval,
+                    state.fingerprint,
+                    state.checks,
+                    state.changes,
+                    state.failures,
+                    state.checked_at,
+                    state.changed_at,
+                )
+                for asin, state in updates
+            ],
+        )
+        self._conn.execute("COMMIT")
+        self._dirty = {}
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
+        logger.info(
+            "Monitor: %d checks (%d new, %d changed, %d unchanged, %d failed), %d ASINs",
+            sum(self.counts.values()),
+            self.counts[NEW],
+            self.counts[CHANGED],
+            self.counts[UNCHANGED],
+            self.counts[FAILED],
+            len(self._states),
+        )
+
+    def __enter__(self) -> "RefreshSchedule":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
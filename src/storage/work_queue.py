@@ -0,0 +1,217 @@
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from extractors.records import json_default
+
+logger = logging.getLogger(__name__)
+
+# ASIN states: waiting for a worker, leased to one, finished, or out of attempts
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_items (
+    asin TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'queued',
+    -- When a queued item may be leased, or when a lease runs out
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS queue_items_due ON queue_items (status, available_at);
+"""
+
+_PAGE_SIZE = 1000
+
+class WorkQueue:
+    """
+    Shared queue of ASINs between a coordinator and any number of workers.
+
+    Workers ``lease`` a batch, scrape it and ``complete`` it with a product
+    (or None) per ASIN. A lease that is not completed in time expires and
+    its ASINs go to the next worker, so a crashed worker loses nothing; a
+    late result from the original holder is still accepted. Failed ASINs
+    are requeued until they have had ``max_attempts`` leases.
+
+    ``SqliteWorkQueue`` is the local implementation; a networked queue
+    only has to provide these methods.
+    """
+
+    def enqueue(self, asins: Iterable[str]) -> int:
+        """Add ASINs not already in the queue; returns how many were added."""
+        raise NotImplementedError
+
+    def lease(self, worker_id: str, count: int, lease_seconds: float) -> List[str]:
+        """Up to ``count`` ASINs for ``worker_id``, held for ``lease_seconds``."""
+        raise NotImplementedError
+
+    def complete(self, worker_id: str, results: Mapping[str, Optional[Mapping[str, Any]]]) -> None:
+        """Report leased ASINs: a product marks one done, None marks it failed."""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        """Yield the scraped products in enqueue order."""
+        raise NotImplementedError
+
+    def unfinished(self) -> int:
+        """ASINs still queued or leased."""
+        counts = self.counts()
+        return counts[QUEUED] + counts[LEASED]
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    ``WorkQueue`` in a SQLite database shared by processes on one host.
+
+    Each process opens its own connection; leases and completions are
+    ``BEGIN IMMEDIATE`` transactions, so two workers never lease the same
+    ASIN. Keep the file on a local disk: SQLite locking is unreliable on
+    network filesystems. A failed ASIN waits ``retry_delay`` seconds before
+    it can be leased again.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = 3, retry_delay: float = 30.0) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = float(retry_delay)
+        # Wait up to 30s for another process's transaction instead of failing
+        self._conn = sqlite3.connect(str(path), timeout=30.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, asins: Iterable[str]) -> int:
+        added = 0
+        batch: List[tuple] = []
+
+        def insert() -> int:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.executemany("INSERT OR IGNORE INTO queue_items (asin) VALUES (?)", batch)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount
+
+        for asin in asins:
+            batch.append((asin,))
+            if len(batch) >= _PAGE_SIZE:
+                added += insert()
+                batch = []
+        if batch:
+            added += insert()
+        return added
+
+    def lease(self, worker_id: str, count: int, lease_seconds: float) -> List[str]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._conn.execute(
+                "SELECT asin, status, attempts FROM queue_items "
+                "WHERE status IN (?, ?) AND available_at <= ? ORDER BY available_at, rowid LIMIT ?",
+                (QUEUED, LEASED, now, max(1, int(count))),
+            ).fetchall()
+            leased: List[str] = []
+            exhausted: List[tuple] = []
+            for asin, status, attempts in rows:
+                if status == LEASED:
+                    logger.info("Lease on ASIN %s expired; requeueing it", asin)
+                if attempts >= self.max_attempts:
+                    exhausted.append((now, asin))
+                else:
+                    leased.append(asin)
+            self._conn.executemany(
+                "UPDATE queue_items SET status = 'failed', lease_owner = NULL, updated_at = ? WHERE asin = ?",
+                exhausted,
+            )
+            self._conn.executemany(
+                "UPDATE queue_items SET status = 'leased', lease_owner = ?, available_at = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE asin = ?",
+                [(worker_id, now + lease_seconds, now, asin) for asin in leased],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        for _, asin in exhausted:
+            logger.warning("Giving up on ASIN %s after %d attempts", asin, self.max_attempts)
+        return leased
+
+    def complete(self, worker_id: str, results: Mapping[str, Optional[Mapping[str, Any]]]) -> None:
+        now = time.time()
+        done = [
+            (json.dumps(product, ensure_ascii=False, default=json_default), now, asin)
+            for asin, product in results.items()
+            if product is not None
+        ]
+        failed = [
+            (self.max_attempts, now + self.retry_delay, now, asin, worker_id)
+            for asin, product in results.items()
+            if product is None
+        ]
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A result is kept even if the lease expired meanwhile
+            self._conn.executemany(
+                "UPDATE queue_items SET status = 'done', result = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE asin = ? AND status != 'done'",
+                done,
+            )
+            # A failure only counts if the lease is still ours
+            self._conn.executemany(
+                "UPDATE queue_items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "lease_owner = NULL, available_at = ?, updated_at = ? "
+                "WHERE asin = ? AND status = 'leased' AND lease_owner = ?",
+                failed,
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def counts(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM queue_items GROUP BY status").fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def iter_results(self) -> Iterator[Dict[str, Any]]:
+        last_rowid = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT rowid, result FROM queue_items WHERE status = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                (DONE, last_rowid, _PAGE_SIZE),
+            ).fetchall()
+            if not rows:
+                return
+            for rowid, result in rows:
+                last_rowid = rowid
+                yield json.loads(result)
+
+    def close(self) -> None:
+        self._conn.close()
+
+def open_work_queue(location: str, max_attempts: int = 3, retry_delay: float = 30.0) -> WorkQueue:
+    """The work queue at ``location``, for now always a SQLite file path."""
+    return SqliteWorkQueue(Path(location), max_attempts=max_attempts, retry_delay=retry_delay)
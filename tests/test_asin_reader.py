@@ -0,0 +1,76 @@
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from inputs.asin_reader import (  # noqa: E402
+    AsinSet,
+    clean_asins,
+    normalize_asin,
+    parse_shard,
+    read_asin_file,
+)
+from metrics.counters import COUNTERS  # noqa: E402
+
+def test_normalize_accepts_bare_asins_and_product_urls():
+    assert normalize_asin(" b07xj8c8f5 ") == "B07XJ8C8F5"
+    assert normalize_asin("https://www.amazon.com/Some-Title/dp/B07XJ8C8F5/ref=sr_1_1?th=1") == "B07XJ8C8F5"
+    assert normalize_asin("https://www.amazon.de/gp/product/0345391802") == "0345391802"
+    assert normalize_asin("https://www.amazon.com/dp/B07XJ8C8F5") == "B07XJ8C8F5"
+    for bad in ("B07XJ8C8F", "B07XJ8C8F55", "B07XJ-8C8F", "https://www.amazon.com/s?k=B07XJ8C8F5"):
+        assert normalize_asin(bad) is None
+
+def test_clean_asins_drops_invalid_lines_and_duplicates_in_order():
+    COUNTERS.reset()
+    lines = [
+        "B000000001\n",
+        "# comment\n",
+        "b000000001\n",
+        "\n",
+        "https://www.amazon.com/dp/B000000002?psc=1\n",
+        "not an asin\n",
+        "B000000003\n",
+        "B000000002\n",
+    ]
+    assert list(clean_asins(lines)) == ["B000000001", "B000000002", "B000000003"]
+    assert COUNTERS.get("asins.invalid") == 1
+    assert COUNTERS.get("asins.duplicate") == 2
+
+def test_read_asin_file_strips_bom(tmp_path: Path):
+    path = tmp_path / "asins.txt"
+    path.write_text("B000000001\r\nb000000001\r\nB000000002\r\n", encoding="utf-8-sig")
+    assert list(read_asin_file(path)) == ["B000000001", "B000000002"]
+    with pytest.raises(FileNotFoundError):
+        read_asin_file(tmp_path / "missing.txt")
+
+def test_asin_set_matches_a_python_set_through_growth():
+    rng = random.Random(7)
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    values = ["".join(rng.choice(alphabet) for _ in range(10)) for _ in range(5000)]
+    values += values[:1000] + ["0000000000", "ZZZZZZZZZZ"]
+    compact, reference = AsinSet(capacity=16), set()
+    for value in values:
+        assert compact.add(value) == (value not in reference)
+        reference.add(value)
+    assert len(compact) == len(reference)
+    assert all(value in compact for value in reference)
+
+def test_shards_partition_the_input_exactly():
+    asins = [f"B{i:09d}" for i in range(2000)]
+    shards = [list(clean_asins(asins, shard=(i, 4))) for i in range(4)]
+    assert sorted(sum(shards, [])) == asins
+    assert all(300 < len(shard) < 700 for shard in shards)
+    # Normalization happens first, so spellings of one ASIN share a shard
+    assert list(clean_asins([a.lower() for a in shards[2]], shard=(2, 4))) == shards[2]
+
+@pytest.mark.parametrize("spec", ["4/4", "-1/4", "1", "a/b", "0/0"])
+def test_parse_shard_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+    assert parse_shard("3/4") == (3, 4)
@@ -0,0 +1,56 @@
+from pathlib import Path
+import json
+import socket
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+pytest.importorskip("aiohttp")
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from runner import DEFAULT_CONFIG, run               # noqa: E402
+
+def _run(tmp_path: Path, base_url: str, asins, **overrides):
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(asins), encoding="utf-8")
+    settings = dict(DEFAULT_CONFIG, base_url=base_url, **overrides)
+    output_dir = tmp_path / "out"
+    if not run(str(input_file), str(output_dir), ["json"], settings):
+        return []
+    products = json.loads((output_dir / "amazon_products.json").read_text(encoding="utf-8"))
+    return sorted(products, key=lambda p: p["asin"])
+
+def test_async_engine_matches_thread_engine(tmp_path: Path):
+    asins = [f"B0ASYNC{i:03d}" for i in range(200)]
+    with StubAmazonServer() as server:
+        threaded = _run(tmp_path, server.base_url, asins, engine="threads", concurrency=8)
+        async_products = _run(
+            tmp_path,
+            server.base_url,
+            asins,
+            engine="async",
+            async_concurrency=64,
+            per_host_concurrency=16,
+            parse_workers=2,
+        )
+
+    assert len(async_products) == 200
+    assert async_products == threaded
+    # The per-host limit also caps the connections opened against the stub
+    assert server.connections <= 8 + 16
+
+def test_async_engine_skips_failed_fetches(tmp_path: Path):
+    # Grab a free port and release it so nothing is listening there
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    products = _run(tmp_path, f"http://127.0.0.1:{port}", ["B0MISSING1"], engine="async")
+    assert products == []
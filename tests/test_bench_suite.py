@@ -0,0 +1,56 @@
+from pathlib import Path
+import json
+import sys
+
+import requests
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks import bench_suite                    # noqa: E402
+from benchmarks.corpus import LOCALES, build_corpus, build_product_page  # noqa: E402
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from extractors.page import parse_page               # noqa: E402
+
+def test_locale_variants_change_prices_and_labels():
+    german = build_product_page("B000000001", target_bytes=30_000, locale="de_DE")
+    japanese = build_product_page("B000000001", target_bytes=30_000, locale="ja_JP")
+    assert '<html lang="de-de">' in german and "von 5 Sternen" in german and "\xa0€</span>" in german
+    assert "5つ星のうち" in japanese and "￥" in japanese
+    corpus = build_corpus(len(LOCALES), target_bytes=30_000, locales=list(LOCALES))
+    for html, locale in zip(corpus, LOCALES):
+        assert f'lang="{LOCALES[locale].lang}"' in html
+        assert parse_page(html, asin="X", url="u")["title"]
+
+def test_stub_server_injects_errors_at_the_configured_rate():
+    with StubAmazonServer(error_rate=0.3, seed=1) as server, requests.Session() as session:
+        statuses = [session.get(f"{server.base_url}/dp/B0000000{i:02d}").status_code for i in range(100)]
+    assert statuses.count(500) == server.errors
+    assert 15 <= server.errors <= 45
+    assert set(statuses) == {200, 500}
+
+def test_suite_runs_each_stage_in_its_own_process_and_writes_json(tmp_path: Path, capsys):
+    output = tmp_path / "results.json"
+    argv = [
+        "--pages", "2", "--page-bytes", "30000", "--requests", "10", "--records", "50",
+        "--latency", "0", "--latency-jitter", "0", "--error-rate", "0",
+        "--backends", "lxml", "--prefilters", "none", "--engines", "threads", "--formats", "jsonl,csv",
+        "--output", str(output),
+    ]
+    bench_suite.main(argv)
+    results = json.loads(output.read_text(encoding="utf-8"))
+    stages = {result["stage"]: result for result in results["stages"]}
+    assert list(stages) == ["parse:lxml:none", "fetch", "scrape:threads", "export:jsonl", "export:csv"]
+    assert stages["parse:lxml:none"]["items"] == 2
+    assert stages["fetch"]["items"] == 10 and stages["scrape:threads"]["items"] == 10
+    assert stages["export:csv"]["items"] == 50 and stages["export:csv"]["bytes"] > 0
+    assert all(result["items_per_sec"] > 0 for result in stages.values())
+    if sys.platform != "win32":
+        assert all(result["peak_rss_mb"] >= result["start_rss_mb"] > 0 for result in stages.values())
+
+    bench_suite.main(argv[:-2] + ["--stages", "export", "--output", str(tmp_path / "again.json"), "--compare", str(output)])
+    assert "export:jsonl" in capsys.readouterr().out.split("compared with")[1]
@@ -0,0 +1,85 @@
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from network.cache import ResponseCache, conditional_headers  # noqa: E402
+from runner import DEFAULT_CONFIG, run               # noqa: E402
+
+ASINS = [f"B0{i:08d}" for i in range(20)]
+
+def _small_page(asin: str) -> str:
+    return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+def _run(tmp_path: Path, settings: dict, name: str) -> list:
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(ASINS), encoding="utf-8")
+    run(input_file=str(input_file), output_dir=str(tmp_path / name), formats=["json"], settings=settings)
+    return json.loads((tmp_path / name / "amazon_products.json").read_text(encoding="utf-8"))
+
+def test_cache_round_trip_and_lru_eviction(tmp_path: Path):
+    body = "<html>" + "x" * 50_000 + "</html>"
+    with ResponseCache(tmp_path / "pages.sqlite3", ttl_seconds=60, max_bytes=10_000) as cache:
+        cache.store("a", body, etag='"1"')
+        page = cache.lookup("a")
+        assert page.body == body and page.fresh
+        assert cache.total_bytes < len(body) // 10
+        assert conditional_headers(page) == {"If-None-Match": '"1"'}
+
+        # Push "a" out of a budget that only fits a few compressed pages
+        for i in range(200):
+            cache.store(f"k{i}", f"<html>{i}</html>" * 500)
+        assert cache.lookup("a") is None
+        assert cache.total_bytes <= 10_000
+
+    with ResponseCache(tmp_path / "pages.sqlite3", ttl_seconds=0) as cache:
+        assert cache.lookup("k199").fresh is False
+
+@pytest.mark.parametrize("engine", ["threads", "async", "pipeline"])
+def test_cached_pages_are_reused_and_revalidated(tmp_path: Path, engine: str):
+    if engine == "async":
+        pytest.importorskip("aiohttp")
+    with StubAmazonServer(page_for=_small_page, etags=True) as server:
+        settings = dict(
+            DEFAULT_CONFIG,
+            base_url=server.base_url,
+            engine=engine,
+            parse_workers=1,
+            cache_dir=str(tmp_path / "cache"),
+        )
+        first = _run(tmp_path, settings, "first")
+        assert server.requests == len(ASINS)
+
+        # Within the TTL nothing is requested again
+        _run(tmp_path, settings, "second")
+        assert server.requests == len(ASINS)
+
+        # Past the TTL every page is revalidated and comes back 304
+        stale = _run(tmp_path, dict(settings, cache_ttl_seconds=0), "stale")
+        assert server.requests == 2 * len(ASINS)
+        assert server.not_modified == len(ASINS)
+
+    assert sorted(p["title"] for p in stale) == sorted(p["title"] for p in first)
+
+def test_cache_only_runs_without_network(tmp_path: Path):
+    with StubAmazonServer(page_for=_small_page) as server:
+        settings = dict(DEFAULT_CONFIG, base_url=server.base_url, cache_dir=str(tmp_path / "cache"))
+        _run(tmp_path, settings, "first")
+        base_url = server.base_url
+
+    # The server is gone; expired entries are still served in cache-only mode
+    offline = dict(settings, base_url=base_url, cache_only=True, cache_ttl_seconds=0)
+    products = _run(tmp_path, offline, "offline")
+    assert len(products) == len(ASINS)
+
+    with pytest.raises(ValueError):
+        _run(tmp_path, dict(DEFAULT_CONFIG, cache_only=True), "no_cache")
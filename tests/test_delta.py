@@ -0,0 +1,89 @@
+from pathlib import Path
+import json
+import sys
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import runner                                         # noqa: E402
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from runner import DEFAULT_CONFIG, run               # noqa: E402
+from storage.delta_state import CHANGED, NEW, DeltaTracker, region_hash  # noqa: E402
+from storage.job_store import JobStore               # noqa: E402
+
+ASINS = [f"B0{i:08d}" for i in range(12)]
+
+def _page(asin: str, price: str, noise: str) -> str:
+    return (
+        f"<html><head><script>var requestId = '{noise}';</script></head><body>"
+        f'<span id="productTitle">Product {asin}</span>'
+        f'<div id="corePrice_feature_div"><span class="a-offscreen">{price}</span></div>'
+        f'<div id="rhf">Recommended for you: {noise}</div>'
+        "</body></html>"
+    )
+
+def test_region_hash_ignores_churn_outside_product_sections():
+    assert region_hash(_page("B000000001", "$5.00", "a")) == region_hash(_page("B000000001", "$5.00", "b"))
+    assert region_hash(_page("B000000001", "$5.00", "a")) != region_hash(_page("B000000001", "$6.00", "a"))
+
+def test_tracker_tells_new_changed_and_unchanged(tmp_path: Path):
+    unchanged = []
+    with DeltaTracker(tmp_path / "delta.sqlite3", batch_size=2) as delta:
+        for asin in ("A1", "A2", "A3"):
+            assert not delta.page_unchanged(asin, f"<span id='productTitle'>{asin}</span>")
+            assert delta.record_product({"asin": asin, "title": asin}) == NEW
+
+    with DeltaTracker(tmp_path / "delta.sqlite3", on_unchanged=unchanged.append) as delta:
+        assert delta.page_unchanged("A1", "<span id='productTitle'>A1</span>")
+        # New markup, same record
+        assert not delta.page_unchanged("A2", "<span id='productTitle'> A2 </span>")
+        assert delta.record_product({"asin": "A2", "title": "A2"}) is None
+        assert not delta.page_unchanged("A3", "<span id='productTitle'>A3 v2</span>")
+        assert delta.record_product({"asin": "A3", "title": "A3 v2"}) == CHANGED
+    assert unchanged == ["A1"]
+
+def test_delta_runs_skip_parsing_and_export_only_changes(tmp_path: Path, monkeypatch):
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(ASINS), encoding="utf-8")
+    prices = {asin: "$10.00" for asin in ASINS}
+    noise = {"value": "run-1"}
+
+    parsed = []
+    parse_page = runner.parse_page
+
+    def counting_parse_page(html, **kwargs):
+        parsed.append(kwargs["asin"])
+        return parse_page(html, **kwargs)
+
+    monkeypatch.setattr(runner, "parse_page", counting_parse_page)
+
+    out = tmp_path / "out"
+    with StubAmazonServer(page_for=lambda asin: _page(asin, prices[asin], noise["value"])) as server:
+        settings = dict(DEFAULT_CONFIG, base_url=server.base_url, concurrency=4, max_attempts=1, delta=True)
+
+        assert run(str(input_file), str(out), ["jsonl"], settings, job_id="first") == len(ASINS)
+        assert len(parsed) == len(ASINS)
+
+        # Only scripts and recommendations differ: nothing is parsed or exported
+        parsed.clear()
+        noise["value"] = "run-2"
+        assert run(str(input_file), str(out), ["jsonl"], settings, job_id="second") == 0
+        assert parsed == []
+        with JobStore(out / "jobs.sqlite3") as store:
+            assert store.counts("second")["done"] == len(ASINS)
+
+        prices[ASINS[2]] = "$8.50"
+        prices[ASINS[7]] = "$12.00"
+        assert run(str(input_file), str(out), ["jsonl"], settings, job_id="third") == 2
+        assert sorted(parsed) == [ASINS[2], ASINS[7]]
+
+    lines = (out / "amazon_products.jsonl").read_text(encoding="utf-8").splitlines()
+    assert sorted(json.loads(line)["asin"] for line in lines) == [ASINS[2], ASINS[7]]
+
+    changes = [json.loads(line) for line in (out / "amazon_products.changes.jsonl").read_text().splitlines()]
+    assert [c["change"] for c in changes] == [NEW] * len(ASINS) + [CHANGED, CHANGED]
+    assert {c["asin"] for c in changes if c["run"] == "third"} == {ASINS[2], ASINS[7]}
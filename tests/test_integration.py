@@ -1,4 +1,4 @@
-thonfrom pathlib import Path
+from pathlib import Path
 import sys
 import json
 
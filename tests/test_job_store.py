@@ -0,0 +1,70 @@
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from runner import DEFAULT_CONFIG, run               # noqa: E402
+from storage.job_store import JobStore               # noqa: E402
+
+ASINS = [f"B0{i:08d}" for i in range(30)]
+
+def test_interrupted_job_hands_out_only_unfinished_asins(tmp_path: Path):
+    db = tmp_path / "jobs.sqlite3"
+    with JobStore(db, batch_size=7) as store:
+        assert store.create_job("j1", ASINS + ASINS[:5]) == len(ASINS)
+        claimed = store.claim_unfinished("j1")
+        for asin in [next(claimed) for _ in range(10)]:
+            if asin != ASINS[3]:
+                store.record_done("j1", {"asin": asin})
+        # Killed here: ASINS[3] was in flight, the rest never started
+
+    with JobStore(db) as store:
+        assert store.counts("j1") == {"pending": 20, "failed": 1, "done": 9}
+        remaining = list(store.claim_unfinished("j1"))
+        assert remaining == [ASINS[3]] + ASINS[10:]
+        assert store.attempts("j1", ASINS[3]) == 2
+        assert [p["asin"] for p in store.iter_results("j1")] == [a for a in ASINS[:10] if a != ASINS[3]]
+        with pytest.raises(ValueError):
+            store.create_job("j1", ASINS)
+
+def test_resume_retries_failed_asins_and_exports_everything(tmp_path: Path):
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(ASINS), encoding="utf-8")
+    broken = set(ASINS[::3])
+
+    def flaky_page(asin: str) -> str:
+        if asin in broken:
+            raise RuntimeError("upstream error")
+        return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+    with StubAmazonServer(page_for=flaky_page) as server:
+        settings = dict(DEFAULT_CONFIG, base_url=server.base_url, concurrency=4, max_attempts=1)
+        out = tmp_path / "out"
+        exported = run(str(input_file), str(out), ["json"], settings, job_id="nightly")
+        assert exported == len(ASINS) - len(broken)
+
+        requests_before = server.requests
+        broken.clear()
+        exported = run("unused.txt", str(out), ["json"], settings, resume="nightly")
+        # Only the failed ASINs were fetched again
+        assert server.requests - requests_before == len(ASINS[::3])
+
+    assert exported == len(ASINS)
+    data = json.loads((out / "amazon_products.json").read_text(encoding="utf-8"))
+    assert sorted(p["asin"] for p in data) == ASINS
+
+    with JobStore(out / "jobs.sqlite3") as store:
+        assert store.counts("nightly") == {"pending": 0, "failed": 0, "done": len(ASINS)}
+        assert store.attempts("nightly", ASINS[0]) == 2
+
+    with pytest.raises(ValueError):
+        run("unused.txt", str(out), ["json"], settings, resume="missing")
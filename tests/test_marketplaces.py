@@ -0,0 +1,135 @@
+from contextlib import ExitStack
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.corpus import build_product_page       # noqa: E402
+from benchmarks.stub_server import StubAmazonServer    # noqa: E402
+from extractors.normalize import (                     # noqa: E402
+    parse_count,
+    parse_counts,
+    parse_price,
+    parse_prices,
+    parse_rating,
+    parse_ratings,
+)
+from metrics.counters import COUNTERS                  # noqa: E402
+from network.marketplaces import accept_language, decimal_mark, marketplace_settings  # noqa: E402
+from runner import DEFAULT_CONFIG, _merge, iter_products, plan_partitions, run  # noqa: E402
+
+LOCALE_FOR = {"US": "en_US", "DE": "de_DE", "JP": "ja_JP"}
+CURRENCY_FOR = {"US": "$", "DE": "€", "JP": "￥"}
+
+# (marketplace, rating text, review text, rating, review count)
+STOREFRONT_RATINGS = [
+    ("US", "4.5 out of 5 stars", "1,234 ratings", 4.5, 1234),
+    ("DE", "4,3 von 5 Sternen", "1.234 Sternebewertungen", 4.3, 1234),
+    ("FR", "4,5 sur 5 étoiles", "2\u202f345 évaluations", 4.5, 2345),
+    ("JP", "5つ星のうち3.8", "1,234個の評価", 3.8, 1234),
+    ("ES", "4,1 de 5 estrellas", "1.234 valoraciones", 4.1, 1234),
+    ("IT", "4,6 su 5 stelle", "1.234 voti", 4.6, 1234),
+    ("NL", "4,2 van 5 sterren", "1.234 beoordelingen", 4.2, 1234),
+    # Listings without ratings yet: the scale alone is not a rating
+    ("US", "out of 5 stars", "No customer reviews", None, None),
+    ("DE", "von 5 Sternen", "Noch keine Bewertungen", None, None),
+    ("FR", "sur 5 étoiles", "Aucun commentaire", None, None),
+    ("JP", "5つ星のうち", "カスタマーレビューはありません", None, None),
+]
+
+def _small_page(asin: str) -> str:
+    return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+def test_marketplace_settings_take_the_storefront_then_the_overrides():
+    settings = dict(DEFAULT_CONFIG, marketplace_settings={"JP": {"concurrency": 2}, "XX": {"base_url": "http://x"}})
+    jp = marketplace_settings(settings, "jp")
+    assert jp["base_url"] == "https://www.amazon.co.jp" and jp["concurrency"] == 2
+    assert accept_language(jp).startswith("ja-JP") and decimal_mark(jp) == "."
+    de = marketplace_settings(settings, "DE")
+    assert de["base_url"] == "https://www.amazon.de" and de["concurrency"] == settings["concurrency"]
+    assert decimal_mark(de) == "," and accept_language(dict(de, accept_language="en")) == "en"
+    assert marketplace_settings(settings, "XX")["base_url"] == "http://x"
+    with pytest.raises(ValueError):
+        marketplace_settings(settings, "ZZ")
+
+    partitions = plan_partitions(dict(settings, marketplaces=["US", "de", "US"]), Path("out"), "job")
+    assert [(p.marketplace, p.job_id, p.export_dir) for p in partitions] == [
+        ("US", "job.US", Path("out/US")),
+        ("DE", "job.DE", Path("out/DE")),
+    ]
+    assert plan_partitions(settings, Path("out"), "job")[0].job_id == "job"
+
+def test_the_storefront_decimal_mark_settles_ambiguous_prices():
+    assert parse_price("1.234 €", ",") == (1234.0, None, "€")
+    assert parse_price("$1.234", ".") == (1.234, None, "$")
+    assert parse_price("1,234", ",")[0] == 1.234
+    # Unambiguous amounts read the same whatever the storefront
+    texts = ["12,99 €", "$12.99", "1.234,56 €", "￥1,234,567"]
+    for decimal in (None, ".", ","):
+        assert [price[0] for price in parse_prices(texts, decimal)] == [12.99, 12.99, 1234.56, 1234567.0]
+
+@pytest.mark.parametrize("code, rating, reviews, stars, count", STOREFRONT_RATINGS)
+def test_ratings_and_review_counts_read_in_each_storefront_language(code, rating, reviews, stars, count):
+    assert (parse_rating(rating), parse_count(reviews)) == (stars, count)
+
+def test_batched_ratings_match_across_storefronts():
+    ratings = [row[1] for row in STOREFRONT_RATINGS]
+    reviews = [row[2] for row in STOREFRONT_RATINGS]
+    assert parse_ratings(ratings) == [row[3] for row in STOREFRONT_RATINGS]
+    assert parse_counts(reviews) == [row[4] for row in STOREFRONT_RATINGS]
+
+def test_fan_out_scrapes_every_marketplace_into_its_own_partition(tmp_path: Path):
+    asins = [f"B0000000{i:02d}" for i in range(6)]
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(asins))
+    with ExitStack() as stack:
+        servers = {
+            code: stack.enter_context(
+                StubAmazonServer(page_for=lambda asin, locale=locale: build_product_page(asin, 20_000, locale=locale))
+            )
+            for code, locale in LOCALE_FOR.items()
+        }
+        settings = dict(
+            DEFAULT_CONFIG,
+            concurrency=2,
+            job_db=str(tmp_path / "jobs.sqlite3"),
+            marketplaces=list(servers),
+            marketplace_settings={code: {"base_url": server.base_url} for code, server in servers.items()},
+        )
+        exported = run(str(input_file), str(tmp_path / "out"), ["json"], settings, job_id="fan")
+        assert {code: COUNTERS.snapshot("products.").get(f"products.{code}") for code in servers} == {
+            code: len(asins) for code in servers
+        }
+        assert all(server.requests == len(asins) for server in servers.values())
+
+        # Everything is done: a resumed run exports the stored results and fetches nothing
+        resumed = run(str(input_file), str(tmp_path / "again"), ["json"], settings, resume="fan")
+        assert all(server.requests == len(asins) for server in servers.values())
+
+    assert exported == resumed == len(asins) * len(servers)
+    for code in servers:
+        products = json.loads((tmp_path / "out" / code / "amazon_products.json").read_text(encoding="utf-8"))
+        assert sorted(product["asin"] for product in products) == asins
+        assert all(product["price.value"] and product["stars"] and product["reviewsCount"] for product in products)
+        assert {product["price_currency"] for product in products} == {CURRENCY_FOR[code]}
+
+def test_a_slow_marketplace_does_not_hold_up_the_others():
+    asins = [f"B0000000{i:02d}" for i in range(8)]
+    with StubAmazonServer(page_for=_small_page, latency=0.5) as slow, StubAmazonServer(page_for=_small_page) as fast:
+        streams = {
+            code: iter_products(iter(asins), dict(DEFAULT_CONFIG, base_url=server.base_url, concurrency=2))
+            for code, server in (("JP", slow), ("US", fast))
+        }
+        order = [code for code, _ in _merge(streams, maxsize=4)]
+
+    assert sorted(order) == ["JP"] * len(asins) + ["US"] * len(asins)
+    # Every fast product arrives before the slow marketplace's first two are done
+    assert order.index("JP") >= len(asins)
@@ -0,0 +1,105 @@
+from pathlib import Path
+import sys
+import urllib.request
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from metrics.counters import Counters                # noqa: E402
+from metrics.histograms import Histogram, Histograms  # noqa: E402
+from metrics.profiling import SamplingProfiler       # noqa: E402
+from metrics.report import StatsReporter, render_prometheus  # noqa: E402
+from runner import DEFAULT_CONFIG, run               # noqa: E402
+
+ASINS = [f"B0{i:08d}" for i in range(20)]
+
+def test_histogram_quantiles_come_from_bucket_bounds():
+    histogram = Histogram(bounds=(0.1, 0.5, 1.0))
+    for value in (0.05, 0.05, 0.2, 0.3, 0.4, 0.7, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 3, 1, 1]
+    assert histogram.count == 7 and abs(histogram.sum - 3.7) < 1e-9
+    assert histogram.quantile(0.25) == 0.1
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(0.99) == float("inf")
+    assert Histogram().quantile(0.5) == 0.0
+
+def test_prometheus_text_labels_error_classes_and_accumulates_buckets():
+    histogram = Histogram(bounds=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    text = render_prometheus(
+        {"errors.timeout": 2, "errors.http_404": 1, "fetch.bytes": 1000},
+        {"fetch_seconds": histogram},
+        {"fetch_in_flight": 3},
+    )
+    lines = text.splitlines()
+    assert lines.count("# TYPE amazon_scraper_errors_total counter") == 1
+    assert 'amazon_scraper_errors_total{class="timeout"} 2' in lines
+    assert 'amazon_scraper_errors_total{class="http_404"} 1' in lines
+    assert "amazon_scraper_fetch_bytes_total 1000" in lines
+    assert 'amazon_scraper_fetch_seconds_bucket{le="0.1"} 1' in lines
+    assert 'amazon_scraper_fetch_seconds_bucket{le="1"} 2' in lines
+    assert 'amazon_scraper_fetch_seconds_bucket{le="+Inf"} 2' in lines
+    assert "amazon_scraper_fetch_seconds_count 2" in lines
+    assert "amazon_scraper_fetch_in_flight 3" in lines
+
+def test_reporter_rewrites_the_stats_file_and_serves_metrics(tmp_path: Path):
+    counters, histograms = Counters(), Histograms()
+    path = tmp_path / "metrics" / "scraper.prom"
+    with StatsReporter(path=path, port=0, interval=0, counters=counters, histograms=histograms) as reporter:
+        counters.inc("fetch.started", 3)
+        counters.inc("fetch.finished", 2)
+        histograms.observe("fetch_seconds", 0.2)
+        with urllib.request.urlopen(f"http://127.0.0.1:{reporter.server_port}/metrics") as response:
+            served = response.read().decode("utf-8")
+        assert "amazon_scraper_fetch_finished_total 2" in served
+        text = reporter.snapshot()
+        assert "amazon_scraper_fetch_in_flight 1" in text
+        assert path.read_text(encoding="utf-8") == text
+    assert not path.with_name("scraper.prom.tmp").exists()
+
+def test_profiler_samples_by_asin_hash_and_writes_a_report(tmp_path: Path):
+    profiler = SamplingProfiler(every=4)
+    sampled = [asin for asin in ASINS if profiler.sampled(asin)]
+    assert 0 < len(sampled) < len(ASINS)
+    assert SamplingProfiler(every=0).sampled(ASINS[0]) is False
+
+    for asin in ASINS:
+        with profiler.sample(asin, "parse"):
+            sum(range(1000))
+    assert profiler.samples == len(sampled)
+    report = profiler.report(tmp_path)
+    assert report is not None and "samples, one ASIN in 4" in report.read_text(encoding="utf-8")
+    assert SamplingProfiler(every=0).report(tmp_path / "none") is None
+
+def test_run_publishes_fetch_latency_bytes_and_error_classes(tmp_path: Path):
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(ASINS), encoding="utf-8")
+    metrics_file = tmp_path / "scraper.prom"
+    out = tmp_path / "out"
+    with StubAmazonServer(error_rate=0.3, seed=7) as server:
+        settings = dict(
+            DEFAULT_CONFIG,
+            base_url=server.base_url,
+            concurrency=4,
+            max_attempts=1,
+            metrics_file=str(metrics_file),
+            profile_every=5,
+        )
+        exported = run(str(input_file), str(out), ["jsonl"], settings, job_id="metrics")
+    assert 0 < exported < len(ASINS)
+
+    lines = metrics_file.read_text(encoding="utf-8").splitlines()
+    assert f"amazon_scraper_fetch_finished_total {len(ASINS)}" in lines
+    assert f'amazon_scraper_errors_total{{class="server_error"}} {server.errors}' in lines
+    assert f"amazon_scraper_export_records_total {exported}" in lines
+    assert f'amazon_scraper_fetch_seconds_bucket{{le="+Inf"}} {len(ASINS)}' in lines
+    assert any(line.startswith("amazon_scraper_parse_seconds_count") for line in lines)
+    assert any(line.startswith("amazon_scraper_export_jsonl_seconds_count") for line in lines)
+    assert (out / "profile.txt").exists()
@@ -0,0 +1,177 @@
+from pathlib import Path
+import json
+import sys
+import threading
+import time
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.corpus import build_product_page       # noqa: E402
+from benchmarks.stub_server import StubAmazonServer    # noqa: E402
+from metrics.counters import COUNTERS                  # noqa: E402
+from runner import DEFAULT_CONFIG, monitor             # noqa: E402
+from storage.refresh_schedule import (                 # noqa: E402
+    CHANGED,
+    FAILED,
+    NEW,
+    UNCHANGED,
+    RefreshSchedule,
+    fingerprint,
+    next_interval,
+)
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def _product(asin: str, price: float) -> dict:
+    return {"asin": asin, "title": f"Product {asin}", "price.value": price, "offers": []}
+
+def test_intervals_follow_changes_within_bounds():
+    assert next_interval(100, CHANGED, 60, 1000) == 60
+    assert next_interval(100, UNCHANGED, 60, 1000) == 150
+    assert next_interval(800, FAILED, 60, 1000) == 1000
+    assert next_interval(100, NEW, 60, 1000) == 100
+    # Only price and offers count as a change
+    assert fingerprint(_product("A", 1.0)) == fingerprint(dict(_product("A", 1.0), title="Renamed"))
+    assert fingerprint(_product("A", 1.0)) != fingerprint(_product("A", 2.0))
+
+def test_due_asins_come_out_most_overdue_first(tmp_path: Path):
+    clock = FakeClock()
+    with RefreshSchedule(tmp_path / "monitor.sqlite3", 10, 1000, initial_interval=100, clock=clock) as schedule:
+        assert schedule.sync(["A", "B", "C"]) == (3, 0)
+        assert schedule.pop_due(2) == ["A", "B"]
+        # Handed out ASINs are not handed out twice
+        assert schedule.pop_due(10) == ["C"]
+        assert schedule.seconds_until_due() is None
+
+        assert schedule.record("A", _product("A", 1.0)) == NEW
+        assert schedule.record("B", _product("B", 1.0)) == NEW
+        schedule.requeue("C")
+        assert schedule.pop_due(10) == ["C"]
+        assert schedule.record("C", None) == FAILED
+        assert schedule.interval("C") == 200
+
+        clock.now += 120
+        assert sorted(schedule.pop_due(10)) == ["A", "B"]
+        assert schedule.record("A", _product("A", 2.0)) == CHANGED
+        assert schedule.record("B", _product("B", 1.0)) == UNCHANGED
+        assert (schedule.interval("A"), schedule.interval("B")) == (50, 150)
+        assert 0 < schedule.seconds_until_due() <= 55
+
+        clock.now += 56
+        assert schedule.pop_due(10) == ["A"]
+
+def test_the_schedule_survives_a_restart_and_follows_the_input(tmp_path: Path):
+    clock = FakeClock()
+    state = tmp_path / "monitor.sqlite3"
+    with RefreshSchedule(state, 10, 1000, initial_interval=100, clock=clock) as schedule:
+        schedule.sync(["A", "B"])
+        for asin in schedule.pop_due(10):
+            schedule.record(asin, _product(asin, 1.0))
+
+    with RefreshSchedule(state, 10, 1000, initial_interval=100, clock=clock) as schedule:
+        assert len(schedule) == 2 and schedule.checks("A") == 1
+        assert schedule.pop_due(10) == []
+        assert schedule.sync(["B", "C"]) == (1, 1)
+        assert schedule.pop_due(10) == ["C"]
+        clock.now += 200
+        assert schedule.pop_due(10) == ["B"]
+        assert schedule.record("B", _product("B", 1.0)) == UNCHANGED
+
+    with RefreshSchedule(state, 10, 1000, clock=clock) as schedule:
+        assert len(schedule) == 2 and schedule.checks("A") == 0 and schedule.checks("B") == 2
+
+def test_monitor_checks_changing_asins_more_often_within_the_budget(tmp_path: Path):
+    fast = ["B000000001", "B000000002"]
+    stable = ["B000000003", "B000000004"]
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(fast + stable))
+    fetches = {asin: 0 for asin in fast + stable}
+    lock = threading.Lock()
+
+    def page_for(asin: str) -> str:
+        with lock:
+            fetches[asin] += 1
+            seed = fetches[asin] if asin in fast else 0
+        return build_product_page(asin, seed=seed, target_bytes=20_000)
+
+    rate = 20.0
+    settings = dict(
+        DEFAULT_CONFIG,
+        concurrency=2,
+        monitor_requests_per_second=rate,
+        monitor_min_interval_seconds=0.05,
+        monitor_initial_interval_seconds=0.2,
+        monitor_max_interval_seconds=2.0,
+        monitor_batch_size=4,
+        monitor_poll_seconds=0.05,
+    )
+    stop = threading.Event()
+    with StubAmazonServer(page_for=page_for) as server:
+        settings["base_url"] = server.base_url
+        timer = threading.Timer(2.0, stop.set)
+        start = time.monotonic()
+        timer.start()
+        checks = monitor(str(input_file), str(tmp_path / "out"), settings, stop=stop)
+        elapsed = time.monotonic() - start
+        timer.cancel()
+
+    assert checks == server.requests == sum(fetches.values())
+    assert server.requests <= rate * elapsed + 2
+    # One keep-alive pool for the whole run, not one per batch
+    assert server.connections <= settings["concurrency"]
+    assert min(fetches[asin] for asin in fast) > max(fetches[asin] for asin in stable) >= 3
+    counts = COUNTERS.snapshot("monitor.")
+    assert counts["monitor.new"] == 4 and counts["monitor.changed"] and counts["monitor.unchanged"]
+
+    with RefreshSchedule(tmp_path / "out" / "monitor.sqlite3", 0.05, 2.0) as schedule:
+        assert all(schedule.interval(asin) < 0.2 for asin in fast)
+        assert all(schedule.interval(asin) > 0.2 for asin in stable)
+
+    lines = [json.loads(line) for line in (tmp_path / "out" / "amazon_products.monitor.jsonl").read_text().splitlines()]
+    assert {line["asin"] for line in lines if line["change"] == NEW} == set(fast + stable)
+    assert {line["asin"] for line in lines if line["change"] == CHANGED} == set(fast)
+    assert all(line["product"]["price.value"] for line in lines)
+
+def test_monitor_revalidates_cached_pages_instead_of_serving_them(tmp_path: Path):
+    fast, stable = "B000000001", "B000000002"
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text(f"{fast}\n{stable}")
+    fetches = {fast: 0, stable: 0}
+
+    def page_for(asin: str) -> str:
+        fetches[asin] += 1
+        return build_product_page(asin, seed=fetches[asin] if asin == fast else 0, target_bytes=20_000)
+
+    settings = dict(
+        DEFAULT_CONFIG,
+        concurrency=1,
+        cache_dir=str(tmp_path / "cache"),
+        cache_ttl_seconds=86400,
+        monitor_requests_per_second=50.0,
+        monitor_min_interval_seconds=0.05,
+        monitor_initial_interval_seconds=0.1,
+        monitor_max_interval_seconds=0.2,
+        monitor_poll_seconds=0.05,
+    )
+    stop = threading.Event()
+    with StubAmazonServer(page_for=page_for, etags=True) as server:
+        settings["base_url"] = server.base_url
+        timer = threading.Timer(1.0, stop.set)
+        timer.start()
+        checks = monitor(str(input_file), str(tmp_path / "out"), settings, stop=stop)
+        timer.cancel()
+
+    # Every check went to the server, the unchanged page as a 304
+    assert checks == server.requests >= 6 and server.not_modified
+    counts = COUNTERS.snapshot("monitor.")
+    assert counts["monitor.changed"] and counts["monitor.unchanged"]
@@ -0,0 +1,125 @@
+from pathlib import Path
+import sys
+from unittest import mock
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks import bench_normalize                 # noqa: E402
+from benchmarks.corpus import LOCALES, build_product_page  # noqa: E402
+from benchmarks.stub_server import StubAmazonServer    # noqa: E402
+from extractors import normalize                       # noqa: E402
+from extractors.normalize import (                     # noqa: E402
+    normalize_in_batches,
+    normalize_product,
+    parse_count,
+    parse_counts,
+    parse_price,
+    parse_prices,
+    parse_rating,
+    parse_ratings,
+)
+from extractors.page import parse_page                 # noqa: E402
+from runner import DEFAULT_CONFIG, iter_products       # noqa: E402
+
+PRICES = [
+    ("$19.99", (19.99, None, "$")),
+    ("$1,234.56", (1234.56, None, "$")),
+    ("1.234,56 €", (1234.56, None, "€")),
+    ("1 234,56\xa0€", (1234.56, None, "€")),
+    ("9,99€", (9.99, None, "€")),
+    ("EUR 12,99", (12.99, None, "EUR")),
+    ("R$ 1.299,90", (1299.9, None, "R$")),
+    ("CHF 1'299.50", (1299.5, None, "CHF")),
+    ("￥1,234", (1234.0, None, "￥")),
+    ("£1,299", (1299.0, None, "£")),
+    ("₹ 1,23,456.00", (123456.0, None, "₹")),
+    ("$10.99 - $24.99", (10.99, 24.99, "$")),
+    ("12,50 € – 20,00 €", (12.5, 20.0, "€")),
+    ("12.5", (12.5, None, None)),
+    ("Currently unavailable", (None, None, None)),
+    ("", (None, None, None)),
+    (None, (None, None, None)),
+]
+RATINGS = [
+    ("4.5 out of 5 stars", 4.5),
+    ("4,3 von 5 Sternen", 4.3),
+    ("5つ星のうち3.8", 3.8),
+    ("no rating yet", None),
+    # Only the scale: the listing has no rating yet
+    ("out of 5 stars", None),
+    ("5 stars", None),
+    ("5つ星のうち", None),
+    (None, None),
+]
+COUNTS = [
+    ("1,234 ratings", 1234),
+    ("1.234 Sternebewertungen", 1234),
+    ("2 345 évaluations", 2345),
+    ("12個の評価", 12),
+    ("", None),
+    (None, None),
+]
+
+@pytest.mark.parametrize("text, expected", PRICES)
+def test_parse_price_handles_locales_codes_and_ranges(text, expected):
+    assert parse_price(text) == expected
+
+def test_batches_match_the_per_record_parsers():
+    texts = [text for text, _ in PRICES]
+    assert parse_prices(texts) == [expected for _, expected in PRICES]
+    assert parse_ratings([text for text, _ in RATINGS]) == [expected for _, expected in RATINGS]
+    assert parse_rating("4.5 out of 5 stars") == 4.5
+    assert parse_counts([text for text, _ in COUNTS]) == [expected for _, expected in COUNTS]
+    assert parse_count("1,234 ratings") == 1234
+    # Values spanning lines still take one row each
+    assert parse_prices(["$1\n$2", None, "$3"]) == [(1.0, None, "$"), (None, None, None), (3.0, None, "$")]
+    assert parse_prices([]) == parse_ratings([]) == parse_counts([]) == []
+
+def test_counts_too_long_for_an_int64_match_the_scalar_parser():
+    texts = ["12345678901234567890 ratings", "1,234 ratings", "999999999999999999 ratings", None]
+    assert parse_counts(texts) == [parse_count(text) for text in texts]
+    assert parse_counts(texts)[0] == 12345678901234567890
+
+def test_pure_python_fallback_matches_numpy():
+    pytest.importorskip("numpy")
+    products = bench_normalize.build_products(200)
+    with_numpy = [product.to_dict() for product in normalize_in_batches(products, 64)]
+    products = bench_normalize.build_products(200)
+    with mock.patch.object(normalize, "_numpy", lambda: None):
+        without = [product.to_dict() for product in normalize_in_batches(products, 64)]
+    assert with_numpy == without
+    assert all(product["price.value"] is not None and product["stars"] for product in with_numpy)
+
+@pytest.mark.parametrize("locale", sorted(LOCALES))
+def test_batch_normalization_matches_per_page_parsing(locale):
+    pages = [build_product_page(f"B00000000{i}", target_bytes=20_000, locale=locale) for i in range(4)]
+    per_page = [parse_page(html) for html in pages]
+    raw = [parse_page(html, normalize=False) for html in pages]
+    assert all(product.price_value is None and product.price_raw for product in raw)
+
+    assert list(normalize_in_batches(raw, 3)) == per_page
+    for product in per_page:
+        assert product.price_value and product.price_currency and product.stars and product.reviews_count
+        assert all(offer.price_value for offer in product.offers)
+
+def test_normalizing_twice_changes_nothing():
+    product = parse_page(build_product_page("B000000001", target_bytes=20_000, locale="de_DE"))
+    exported = product.to_dict()
+    assert normalize_product(product).to_dict() == exported
+    assert "price.max" not in exported and "stars_raw" not in exported
+
+@pytest.mark.parametrize("batch_size", [0, 4])
+def test_scraped_products_are_normalized_with_or_without_batches(batch_size):
+    asins = [f"B00000000{i}" for i in range(6)]
+    with StubAmazonServer(page_for=lambda asin: build_product_page(asin, target_bytes=20_000, locale="fr_FR")) as server:
+        settings = dict(DEFAULT_CONFIG, base_url=server.base_url, concurrency=2, normalize_batch_size=batch_size)
+        products = list(iter_products(asins, settings))
+    assert sorted(product["asin"] for product in products) == asins
+    assert all(product["price.value"] and product["price_currency"] == "€" for product in products)
@@ -0,0 +1,86 @@
+from pathlib import Path
+import sys
+import threading
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.corpus import build_product_page       # noqa: E402
+from benchmarks.stub_server import StubAmazonServer    # noqa: E402
+from extractors.page_classifier import (  # noqa: E402
+    CAPTCHA,
+    ERROR,
+    NOT_FOUND,
+    PRODUCT,
+    classify_page,
+)
+from metrics.counters import COUNTERS                  # noqa: E402
+from runner import DEFAULT_CONFIG, iter_products       # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+NOT_FOUND_PAGE = """<html><head><title>Page Not Found</title></head><body>
+<a href="/ref=cs_404_logo"><img alt="Amazon"></a>
+<b>Looking for something?</b> We're sorry. The Web address you entered is not a functioning page on our site.
+<img src="https://images-na.ssl-images-amazon.com/images/G/01/error/133._TTD_.jpg" alt="Dogs of Amazon">
+</body></html>"""
+
+ERROR_PAGE = """<html><head><title>Sorry! Something went wrong!</title></head><body>
+<a href="/ref=cs_503_logo"><img alt="Amazon"></a><b>Sorry! Something went wrong!</b>
+</body></html>"""
+
+def _read(name: str) -> str:
+    return (CORPUS_DIR / name).read_text(encoding="utf-8")
+
+@pytest.mark.parametrize(
+    "html, kind",
+    [
+        (_read("robot_check.html"), CAPTCHA),
+        (_read("full_product.html"), PRODUCT),
+        (_read("fragment.html"), PRODUCT),
+        (NOT_FOUND_PAGE, NOT_FOUND),
+        (ERROR_PAGE, ERROR),
+        ("", ERROR),
+        (build_product_page("B000000001", target_bytes=1_000_000), PRODUCT),
+    ],
+)
+def test_classify_page(html: str, kind: str):
+    assert classify_page(html) == kind
+
+def test_non_product_pages_are_retried_or_skipped_not_exported():
+    asins = [f"B0{i:08d}" for i in range(12)]
+    missing = set(asins[:3])
+    served = set()
+    lock = threading.Lock()
+
+    def page_for(asin: str) -> str:
+        if asin in missing:
+            return NOT_FOUND_PAGE
+        with lock:
+            first = asin not in served
+            served.add(asin)
+        if first and asin in asins[3:6]:
+            return _read("robot_check.html")
+        return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+    COUNTERS.reset()
+    with StubAmazonServer(page_for=page_for) as server:
+        settings = dict(
+            DEFAULT_CONFIG,
+            base_url=server.base_url,
+            concurrency=4,
+            max_attempts=3,
+            retry_base_delay=0.01,
+        )
+        products = list(iter_products(asins, settings))
+        # Captchas are retried, not-found pages are not
+        assert server.requests == len(asins) + 3
+
+    assert sorted(p["asin"] for p in products) == asins[3:]
+    assert COUNTERS.snapshot("pages.") == {"pages.product": 9, "pages.captcha": 3, "pages.not_found": 3}
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from outputs.exporters import ParquetWriter, export_products  # noqa: E402
+
+def test_parquet_export_is_typed(tmp_path: Path):
+    products = [
+        {
+            "asin": "A1",
+            "title": "One",
+            "price.value": 9.99,
+            "stars": "4.5",
+            "reviewsCount": 100,
+            "offers": [{"price_raw": "$9.99", "seller": "Shop", "condition": "New"}],
+        },
+        {"asin": "A2", "title": "Two", "price.value": None, "reviewsCount": "n/a", "offers": []},
+    ]
+    export_products(products, tmp_path, ["parquet"])
+
+    table = pq.read_table(tmp_path / "amazon_products.parquet")
+    assert str(table.schema.field("price.value").type) == "double"
+    assert str(table.schema.field("reviewsCount").type) == "int64"
+    assert str(table.schema.field("offers").type).startswith("list<")
+
+    rows = table.to_pylist()
+    assert rows[0]["stars"] == 4.5
+    assert rows[0]["offers"] == [
+        {"price_raw": "$9.99", "seller": "Shop", "condition": "New", "price.value": None, "price_currency": None}
+    ]
+    assert rows[1]["price.value"] is None
+    assert rows[1]["reviewsCount"] is None
+    assert rows[1]["offers"] == []
+
+def test_parquet_writer_flushes_row_groups(tmp_path: Path):
+    path = tmp_path / "out.parquet"
+    writer = ParquetWriter(path)
+    writer.row_group_size = 4
+    with writer:
+        for i in range(10):
+            writer.write({"asin": f"A{i}", "offers": [], "extra": "ignored"})
+
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == 10
+    assert metadata.num_row_groups == 3
+    assert "extra" not in pq.read_table(path).column_names
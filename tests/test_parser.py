@@ -1,4 +1,5 @@
-thonfrom pathlib import Path
+from pathlib import Path
+import re
 import sys
 
 import pytest
@@ -9,8 +10,9 @@ SRC_DIR = ROOT_DIR / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from extractors.amazon_parser import parse_product_page  # noqa: E402
-from extractors.offer_extractor import parse_offers      # noqa: E402
+from extractors.amazon_parser import extract_product, parse_product_page  # noqa: E402
+from extractors.document import parse_document                            # noqa: E402
+from extractors.offer_extractor import extract_offers, parse_offers       # noqa: E402
 
 SAMPLE_HTML = """
 <html>
@@ -81,4 +83,27 @@ def test_parse_offers_from_html():
     offer = offers[0]
     assert offer["price_raw"] == "$18.99"
     assert offer["seller"] == "Third-Party Seller"
-    assert "Used" in (offer["condition"] or "")
\ No newline at end of file
+    assert "Used" in (offer["condition"] or "")
+
+def test_shared_document_matches_string_wrappers():
+    doc = parse_document(SAMPLE_HTML)
+
+    product = extract_product(doc, asin="TESTASIN123", url="u")
+    offers = extract_offers(doc)
+
+    assert product == parse_product_page(SAMPLE_HTML, asin="TESTASIN123", url="u")
+    assert offers == parse_offers(SAMPLE_HTML)
+
+def test_selector_index_resolves_like_soup_find():
+    doc = parse_document(SAMPLE_HTML)
+    selectors = [
+        ("span", {"id": "productTitle"}),
+        ("span", {"class": "a-list-item"}),
+        ("div", {"class": "offer"}),
+        ("img", {"class": re.compile(r"image|img", re.I)}),
+        ("a", {}),
+        ("span", {"data-hook": "rating-out-of-text"}),
+    ]
+    for name, attrs in selectors:
+        assert doc.find(name, attrs) is doc.soup.find(name, attrs=attrs)
+        assert doc.find_all(name, attrs) == doc.soup.find_all(name, attrs=attrs)
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.corpus import build_product_page            # noqa: E402
+from extractors.amazon_parser import extract_product         # noqa: E402
+from extractors.document import parse_document               # noqa: E402
+from extractors.offer_extractor import extract_offers        # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+def _corpus():
+    pages = [(p.name, p.read_text(encoding="utf-8")) for p in sorted(CORPUS_DIR.glob("*.html"))]
+    pages += [
+        (f"synthetic-{i}", build_product_page(f"B0TEST{i:04d}", seed=i, target_bytes=150_000))
+        for i in range(3)
+    ]
+    return pages
+
+CORPUS = _corpus()
+
+def _extract(html: str, backend: str):
+    doc = parse_document(html, backend=backend)
+    return extract_product(doc, asin="B0TEST", url="https://example.com"), extract_offers(doc)
+
+@pytest.mark.parametrize("name,html", CORPUS, ids=[name for name, _ in CORPUS])
+def test_lxml_backend_matches_bs4_reference(name, html):
+    assert _extract(html, "lxml") == _extract(html, "bs4")
+
+def test_corpus_exercises_fallbacks():
+    results = {name: _extract(html, "bs4") for name, html in CORPUS}
+
+    product, offers = results["full_product.html"]
+    assert product["title"] == "Logitech G502 HERO High Performance Wired Gaming Mouse"
+    assert product["price.value"] == pytest.approx(42.99)
+    assert len(offers) == 3
+
+    product, _ = results["brand_table.html"]
+    assert product["brand"] == "ZebraCo"
+    assert product["thumbnailImage"] == "https://example.com/fallback.png"
+
+    product, _ = results["nested_brand_header.html"]
+    assert product["brand"] == "Nested string wins"
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        parse_document("<html></html>", backend="html5lib")
@@ -0,0 +1,65 @@
+from pathlib import Path
+import json
+import sys
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.corpus import build_product_page   # noqa: E402
+from engines.pipeline import run_pipeline          # noqa: E402
+from extractors.page import parse_page             # noqa: E402
+
+def _page(asin: str) -> str:
+    return build_product_page(asin, target_bytes=30_000)
+
+def test_pipeline_parses_every_fetched_page_in_worker_processes():
+    asins = [f"B0PIPE{i:04d}" for i in range(40)]
+    jobs = [(asin, f"https://example.com/dp/{asin}") for asin in asins]
+
+    def fetch(asin, url):
+        # One failed fetch must not stall the stages
+        return None if asin == "B0PIPE0007" else _page(asin)
+
+    products = []
+    stats = run_pipeline(
+        jobs,
+        {"fetch_workers": 3, "parse_workers": 2, "pipeline_queue_size": 2},
+        fetch=fetch,
+        parse_options={"backend": "lxml"},
+        emit=products.append,
+    )
+
+    expected = {
+        asin: parse_page(_page(asin), asin=asin, url=url, backend="lxml")
+        for asin, url in jobs
+        if asin != "B0PIPE0007"
+    }
+    assert {p["asin"]: p for p in products} == expected
+
+    assert stats["fetch"]["pages"] == 39
+    assert stats["parse"]["pages"] == 39
+    for stage in ("fetch", "parse"):
+        assert 0.0 <= stats[stage]["utilization"] <= 1.0
+
+def test_run_with_pipeline_engine(tmp_path: Path):
+    from benchmarks.stub_server import StubAmazonServer
+    from runner import DEFAULT_CONFIG, run
+
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(f"B0PIPE{i:04d}" for i in range(20)), encoding="utf-8")
+    with StubAmazonServer() as server:
+        settings = dict(
+            DEFAULT_CONFIG,
+            base_url=server.base_url,
+            engine="pipeline",
+            fetch_workers=4,
+            parse_workers=2,
+        )
+        assert run(str(input_file), str(tmp_path / "out"), ["json"], settings) == 20
+
+    products = json.loads((tmp_path / "out" / "amazon_products.json").read_text(encoding="utf-8"))
+    assert sorted(p["asin"] for p in products) == [f"B0PIPE{i:04d}" for i in range(20)]
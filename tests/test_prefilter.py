@@ -0,0 +1,45 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.corpus import build_product_page              # noqa: E402
+from extractors.page import parse_page                         # noqa: E402
+from extractors.prefilter import slice_sections, strip_noise   # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+@pytest.mark.parametrize("mode", ["strip", "sections"])
+def test_prefiltered_parse_matches_full_parse(mode):
+    html = build_product_page("B0PREFILT1", target_bytes=300_000)
+    assert parse_page(html, prefilter=mode, fallback_fields=None) == parse_page(html)
+
+def test_sections_shrink_page_to_product_regions():
+    html = build_product_page("B0PREFILT1", target_bytes=300_000)
+    sliced = slice_sections(html)
+
+    assert len(sliced) < len(html) // 20
+    assert "<script" not in sliced
+    assert 'id="productTitle"' in sliced
+    assert 'class="offer"' in sliced
+
+def test_strip_noise_keeps_text_boundaries():
+    html = "<p>a<!-- x -->b<script>c</script>d<style>e</style></p>"
+    assert strip_noise(html) == "<p>a<!---->b<!---->d<!----></p>"
+
+def test_empty_field_falls_back_to_full_parse():
+    # The brand <th> and the class-matched image live outside any section
+    html = (CORPUS_DIR / "brand_table.html").read_text(encoding="utf-8")
+    full = parse_page(html)
+
+    restricted = parse_page(html, prefilter="sections", fallback_fields=None)
+    assert restricted["brand"] is None
+
+    assert parse_page(html, prefilter="sections", fallback_fields=["brand"]) == full
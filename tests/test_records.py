@@ -0,0 +1,112 @@
+from pathlib import Path
+import pickle
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks import bench_records                   # noqa: E402
+from benchmarks.corpus import build_product_page       # noqa: E402
+from extractors.page import parse_page                 # noqa: E402
+from extractors.records import Offer, Product          # noqa: E402
+from outputs.exporters import EXPORT_FORMATS, ExportSession  # noqa: E402
+from storage.delta_state import product_hash           # noqa: E402
+
+EXPORT_KEYS = [
+    "asin",
+    "url",
+    "title",
+    "brand",
+    "thumbnailImage",
+    "price_raw",
+    "price.value",
+    "price_currency",
+    "stars",
+    "reviewsCount",
+    "description",
+    "breadCrumbs",
+    "offers",
+]
+
+def _product(asin: str = "B000000001") -> Product:
+    return Product(
+        asin=asin,
+        url=f"https://www.amazon.com/dp/{asin}",
+        title="Widget, large",
+        price_raw="$19.99",
+        price_value=19.99,
+        price_currency="$",
+        stars=4.5,
+        reviews_count=1234,
+        offers=[Offer(price_raw="$18.99", seller="Third <Party>"), Offer(condition="Used")],
+    )
+
+def test_records_read_like_the_dicts_they_replace():
+    product = _product()
+    assert list(product) == EXPORT_KEYS
+    assert product["price.value"] == 19.99 and product.get("reviewsCount") == 1234
+    assert product.get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        product["price_value"]
+    exported = product.to_dict()
+    assert list(exported) == EXPORT_KEYS
+    assert exported["offers"] == [
+        {
+            "price_raw": "$18.99",
+            "seller": "Third <Party>",
+            "condition": None,
+            "price.value": None,
+            "price_currency": None,
+        },
+        {"price_raw": None, "seller": None, "condition": "Used", "price.value": None, "price_currency": None},
+    ]
+    assert product == exported and exported == product
+    assert not hasattr(product, "__dict__") and not hasattr(product.offers[0], "__dict__")
+
+def test_offers_key_only_appears_once_offers_are_extracted():
+    product = Product(asin="A1")
+    assert "offers" not in product and len(product) == len(EXPORT_KEYS) - 1
+    product.offers = []
+    assert product["offers"] == []
+
+def test_parsed_pages_are_records_that_pickle_and_hash_like_their_dicts():
+    product = parse_page(build_product_page("B000000001", target_bytes=30_000), asin="B000000001", url="u")
+    assert isinstance(product, Product) and all(isinstance(offer, Offer) for offer in product["offers"])
+    assert pickle.loads(pickle.dumps(product)) == product
+    assert product_hash(product) == product_hash(product.to_dict())
+
+@pytest.mark.parametrize("fmt", EXPORT_FORMATS)
+def test_exporters_write_records_exactly_as_their_dicts(tmp_path: Path, fmt: str):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    products = [_product(f"B00000000{i}") for i in range(3)]
+    with ExportSession(tmp_path / "records", [fmt]) as export:
+        for product in products:
+            export.write(product)
+    with ExportSession(tmp_path / "dicts", [fmt]) as export:
+        for product in products:
+            export.write(product.to_dict())
+    name = next((tmp_path / "dicts").iterdir()).name
+    records_file = (tmp_path / "records" / name).read_bytes()
+    if fmt == "excel":
+        # xlsx files embed their creation time
+        from openpyxl import load_workbook
+
+        def rows(path: Path):
+            return [list(row) for row in load_workbook(path).active.iter_rows(values_only=True)]
+
+        assert rows(tmp_path / "records" / name) == rows(tmp_path / "dicts" / name)
+    else:
+        assert records_file == (tmp_path / "dicts" / name).read_bytes()
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs the resource module")
+def test_memory_benchmark_shows_records_hold_less_than_dicts():
+    dicts, records = bench_records.run(50_000)
+    assert dicts["records"] == records["records"] == 50_000
+    assert records["bytes_per_record"] < dicts["bytes_per_record"]
@@ -0,0 +1,147 @@
+from pathlib import Path
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+import requests
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from network import retry                             # noqa: E402
+from network.retry import (  # noqa: E402
+    CONNECTION,
+    SERVER_ERROR,
+    THROTTLED,
+    TIMEOUT,
+    CircuitBreaker,
+    RetryBudget,
+    classify_error,
+)
+from runner import DEFAULT_CONFIG, iter_products      # noqa: E402
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+def test_classify_error():
+    assert classify_error(requests.ReadTimeout()) == TIMEOUT
+    assert classify_error(requests.ConnectionError()) == CONNECTION
+    assert classify_error(ConnectionResetError()) == CONNECTION
+    assert classify_error(_http_error(429)) == THROTTLED
+    assert classify_error(_http_error(503)) == THROTTLED
+    assert classify_error(_http_error(500)) == SERVER_ERROR
+    assert classify_error(_http_error(404)) is None
+    assert classify_error(ValueError("bad page")) is None
+
+def test_retry_budget_limits_retries_to_a_share_of_traffic():
+    budget = RetryBudget(ratio=0.5, reserve=2)
+    assert budget.withdraw() and budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert not budget.withdraw()
+    budget.deposit()
+    assert budget.withdraw()
+
+def test_circuit_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(failure_rate=0.5, min_requests=4, cooldown=0.05)
+    for failed in (False, True, True, False):
+        assert breaker.blocked_for() == 0
+        breaker.record(failed)
+    assert breaker.blocked_for() > 0
+
+    time.sleep(0.06)
+    # One probe goes through; everyone else keeps waiting for its outcome
+    assert breaker.blocked_for() == 0
+    assert breaker.blocked_for() > 0
+    breaker.record(False)
+    assert breaker.blocked_for() == 0
+
+def _settings(server: StubAmazonServer, engine: str, **overrides: object) -> dict:
+    settings = dict(
+        DEFAULT_CONFIG,
+        base_url=server.base_url,
+        engine=engine,
+        concurrency=4,
+        parse_workers=1,
+        max_attempts=3,
+        retry_base_delay=0.01,
+    )
+    settings.update(overrides)
+    return settings
+
+@pytest.mark.parametrize("engine", ["threads", "async", "pipeline"])
+def test_transient_failures_are_retried(engine: str):
+    if engine == "async":
+        pytest.importorskip("aiohttp")
+    asins = [f"B0{i:08d}" for i in range(40)]
+    seen = set()
+    lock = threading.Lock()
+
+    def flaky_page(asin: str) -> str:
+        # Every fourth ASIN fails on its first request only
+        with lock:
+            first = asin not in seen
+            seen.add(asin)
+        if first and asins.index(asin) % 4 == 0:
+            raise RuntimeError("transient")
+        return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+    with StubAmazonServer(page_for=flaky_page) as server:
+        products = list(iter_products(asins, _settings(server, engine)))
+        assert server.requests == len(asins) + len(asins) // 4
+
+    assert sorted(p["asin"] for p in products) == asins
+
+def test_open_circuit_stops_traffic_to_a_failing_host():
+    def broken_page(asin: str) -> str:
+        raise RuntimeError("down")
+
+    asins = [f"B0{i:08d}" for i in range(200)]
+    with StubAmazonServer(page_for=broken_page) as server:
+        settings = _settings(
+            server,
+            "threads",
+            breaker_min_requests=10,
+            breaker_cooldown_seconds=0.05,
+            retry_budget_reserve=5,
+        )
+        products = list(iter_products(asins, settings))
+
+    assert products == []
+    # Without the breaker every ASIN would be requested at least once
+    assert server.requests < len(asins)
+
+def test_a_retry_in_backoff_does_not_hold_up_finished_asins():
+    asins = [f"B0{i:08d}" for i in range(6)]
+    seen = set()
+    lock = threading.Lock()
+
+    def page(asin: str) -> str:
+        with lock:
+            first = asin not in seen
+            seen.add(asin)
+        if first and asin == asins[0]:
+            raise RuntimeError("throttled")
+        time.sleep(0.05)
+        return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+    # The full backoff, without jitter
+    with StubAmazonServer(page_for=page) as server, mock.patch.object(retry.random, "uniform", lambda low, high: high):
+        # The source runs dry while the first ASIN waits out its backoff
+        settings = _settings(
+            server, "threads", concurrency=2, retry_base_delay=1.5, retry_max_delay=1.5, normalize_batch_size=0
+        )
+        start = time.monotonic()
+        arrivals = {product["asin"]: time.monotonic() - start for product in iter_products(asins, settings)}
+
+    assert sorted(arrivals) == asins
+    assert max(arrivals[asin] for asin in asins[1:]) < 1.0 < 1.5 <= arrivals[asins[0]]
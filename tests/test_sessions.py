@@ -0,0 +1,45 @@
+from pathlib import Path
+import json
+import sys
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from network.sessions import build_session           # noqa: E402
+from runner import DEFAULT_CONFIG, run               # noqa: E402
+
+def _small_page(asin: str) -> str:
+    return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+def test_run_reuses_pooled_connections(tmp_path: Path):
+    asins = [f"B0{i:08d}" for i in range(1000)]
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(asins), encoding="utf-8")
+
+    with StubAmazonServer(page_for=_small_page) as server:
+        settings = dict(DEFAULT_CONFIG, base_url=server.base_url, concurrency=8, pool_size=8)
+        exported_count = run(
+            input_file=str(input_file),
+            output_dir=str(tmp_path / "out"),
+            formats=["json"],
+            settings=settings,
+        )
+
+    assert exported_count == 1000
+    assert server.requests == 1000
+    # One connection per pooled slot instead of one per ASIN
+    assert server.connections <= 8
+
+    exported = json.loads((tmp_path / "out" / "amazon_products.json").read_text(encoding="utf-8"))
+    assert {p["title"] for p in exported} == {f"Product {asin}" for asin in asins}
+
+def test_session_requests_compressed_responses():
+    with build_session(4, user_agent="test-agent") as session:
+        assert "gzip" in session.headers["Accept-Encoding"]
+        assert session.headers["User-Agent"] == "test-agent"
+        assert session.get_adapter("https://www.amazon.com")._pool_maxsize == 4
@@ -0,0 +1,52 @@
+from pathlib import Path
+import sys
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks import startup                        # noqa: E402
+
+def test_importing_the_runner_loads_no_optional_heavy_modules():
+    result = startup.measure(runs=1)
+    assert result["lazy_modules_loaded"] == []
+    assert result["import_ms"] > 0
+    assert result["slowest"][0]["module"] == "runner"
+
+def test_json_and_csv_exports_do_not_load_openpyxl(tmp_path: Path):
+    statement = (
+        "from pathlib import Path\n"
+        "from outputs.exporters import ExportSession\n"
+        f"with ExportSession(Path({str(tmp_path)!r}), ['json', 'csv']) as export:\n"
+        "    export.write({'asin': 'B000000001', 'title': 'Product'})\n"
+    )
+    assert startup.measure(statement, runs=1)["lazy_modules_loaded"] == []
+
+def test_cache_only_runs_do_not_load_requests(tmp_path: Path):
+    statement = (
+        "from runner import DEFAULT_CONFIG, iter_products\n"
+        "from network.cache import ResponseCache, cache_key\n"
+        f"settings = dict(DEFAULT_CONFIG, cache_dir={str(tmp_path)!r}, cache_only=True, parser_backend='lxml')\n"
+        f"with ResponseCache(__import__('pathlib').Path({str(tmp_path)!r}) / 'pages.sqlite3') as cache:\n"
+        "    cache.store(cache_key(settings['marketplace'], settings['base_url'], 'B000000001'),\n"
+        "                '<html><body><span id=\"productTitle\">One</span></body></html>')\n"
+        "products = list(iter_products(['B000000001', 'B000000002'], settings))\n"
+        "assert [p['asin'] for p in products] == ['B000000001'], products\n"
+    )
+    assert "requests" not in startup.measure(statement, runs=1)["lazy_modules_loaded"]
+
+def test_budget_check_fails_when_startup_is_too_slow(capsys):
+    # Generous here; CI passes its own budget to the benchmark
+    assert startup.main(["--runs", "1", "--budget-ms", "5000"]) == 0
+    assert startup.main(["--runs", "1", "--budget-ms", "0.001"]) == 1
+    assert "over budget" in capsys.readouterr().out
+
+def test_imported_runner_loads_the_example_settings_without_a_config():
+    import runner
+
+    settings = runner.load_settings(None)
+    assert runner.CURRENT_DIR == SRC_DIR
+    assert settings["base_url"] and set(runner.DEFAULT_CONFIG) <= set(settings)
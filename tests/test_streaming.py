@@ -0,0 +1,69 @@
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from outputs.exporters import ExportSession          # noqa: E402
+from runner import DEFAULT_CONFIG, iter_products     # noqa: E402
+
+def _small_page(asin: str) -> str:
+    return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+@pytest.mark.parametrize("engine", ["threads", "pipeline"])
+def test_iter_products_pulls_asins_lazily(engine):
+    pulled = []
+
+    def asins():
+        for i in range(100_000):
+            pulled.append(i)
+            yield f"B0LAZY{i:04d}"
+
+    with StubAmazonServer(page_for=_small_page) as server:
+        settings = dict(
+            DEFAULT_CONFIG,
+            base_url=server.base_url,
+            engine=engine,
+            concurrency=4,
+            max_in_flight=8,
+            parse_workers=1,
+            pipeline_queue_size=4,
+            normalize_batch_size=16,
+        )
+        products = iter_products(asins(), settings)
+        first = [next(products) for _ in range(5)]
+        products.close()
+
+    assert len(first) == 5
+    # Bounded by the in-flight window plus the stage buffers and one
+    # normalization batch, not the input
+    assert len(pulled) < 50 + settings["normalize_batch_size"]
+
+def test_export_session_fans_out_to_writers(tmp_path: Path):
+    with ExportSession(tmp_path, ["json", "jsonl", "csv"], base_filename="p") as export:
+        export.write({"asin": "A1", "title": "One"})
+        export.write({"asin": "A2", "title": "Two", "brand": "Late field"})
+        # JSONL is line buffered, so products are on disk before close
+        assert (tmp_path / "p.jsonl").read_text(encoding="utf-8").count("\n") == 2
+
+    data = json.loads((tmp_path / "p.json").read_text(encoding="utf-8"))
+    assert [p["asin"] for p in data] == ["A1", "A2"]
+    assert (tmp_path / "p.csv").read_text(encoding="utf-8").splitlines()[0] == "asin,title,brand"
+
+def test_export_session_finalizes_files_when_run_crashes(tmp_path: Path):
+    with pytest.raises(RuntimeError):
+        with ExportSession(tmp_path, ["json", "csv"], base_filename="p") as export:
+            export.write({"asin": "A1"})
+            raise RuntimeError("killed at 99%")
+
+    data = json.loads((tmp_path / "p.json").read_text(encoding="utf-8"))
+    assert [p["asin"] for p in data] == ["A1"]
+    assert (tmp_path / "p.csv").read_text(encoding="utf-8").splitlines() == ["asin", "A1"]
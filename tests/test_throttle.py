@@ -0,0 +1,81 @@
+from pathlib import Path
+import sys
+import time
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from network.throttle import OK, THROTTLED, AimdController, TokenBucket  # noqa: E402
+from runner import DEFAULT_CONFIG, iter_products      # noqa: E402
+
+def _small_page(asin: str) -> str:
+    return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+def test_aimd_grows_on_healthy_rounds_and_halves_on_throttling():
+    controller = AimdController(max_limit=16, min_limit=2, latency_target=0.5)
+    assert controller.limit == 8
+
+    for _ in range(8 + 9):
+        controller.record(controller.epoch, 0.1, OK)
+    assert controller.limit == 10
+
+    epoch = controller.epoch
+    controller.record(epoch, 0.1, THROTTLED)
+    assert controller.limit == 5
+    # Requests started before the cut do not cut again
+    controller.record(epoch, 0.1, THROTTLED)
+    assert controller.limit == 5
+
+    for _ in range(5):
+        controller.record(controller.epoch, 0.1, THROTTLED)
+    assert controller.limit == 2
+
+    # Slow responses hold the limit where it is
+    for _ in range(20):
+        controller.record(controller.epoch, 2.0, OK)
+    assert controller.limit == 2
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=100, burst=2)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2:] == pytest.approx([0.01, 0.02, 0.03], abs=0.005)
+
+def _scrape(server: StubAmazonServer, count: int, **overrides: object) -> int:
+    settings = dict(
+        DEFAULT_CONFIG,
+        base_url=server.base_url,
+        concurrency=16,
+        per_host_concurrency=16,
+        parse_workers=2,
+        # Measure the controller alone, without retries hiding the 503s
+        max_attempts=1,
+    )
+    settings.update(overrides)
+    return sum(1 for _ in iter_products((f"B0{i:08d}" for i in range(count)), settings))
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_adaptive_concurrency_backs_off_a_throttling_host(engine: str):
+    if engine == "async":
+        pytest.importorskip("aiohttp")
+    with StubAmazonServer(page_for=_small_page, latency=0.01, capacity=4) as fixed:
+        fixed_products = _scrape(fixed, 300, engine=engine)
+    with StubAmazonServer(page_for=_small_page, latency=0.01, capacity=4) as adaptive:
+        adaptive_products = _scrape(adaptive, 300, engine=engine, adaptive_concurrency=True)
+
+    assert adaptive.throttled < fixed.throttled / 4
+    assert adaptive_products > fixed_products
+
+def test_requests_per_second_caps_request_rate():
+    with StubAmazonServer(page_for=_small_page) as server:
+        started = time.perf_counter()
+        assert _scrape(server, 30, requests_per_second=100) == 30
+        elapsed = time.perf_counter() - started
+    assert elapsed >= 0.28
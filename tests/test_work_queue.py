@@ -0,0 +1,102 @@
+from pathlib import Path
+import json
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+for path in (SRC_DIR, ROOT_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.stub_server import StubAmazonServer  # noqa: E402
+from runner import DEFAULT_CONFIG, coordinate        # noqa: E402
+from storage.work_queue import SqliteWorkQueue       # noqa: E402
+
+ASINS = [f"B0{i:08d}" for i in range(40)]
+
+def test_leases_are_exclusive_expire_and_give_up_after_max_attempts(tmp_path: Path):
+    path = tmp_path / "queue.sqlite3"
+    with SqliteWorkQueue(path, max_attempts=2, retry_delay=0) as coordinator:
+        assert coordinator.enqueue(ASINS[:6]) == 6
+        assert coordinator.enqueue(ASINS[:8]) == 2
+
+    with SqliteWorkQueue(path, max_attempts=2, retry_delay=0) as a, SqliteWorkQueue(path, max_attempts=2, retry_delay=0) as b:
+        crashed = a.lease("a", 3, lease_seconds=0.2)
+        alive = b.lease("b", 10, lease_seconds=60)
+        assert crashed == ASINS[:3]
+        assert alive == ASINS[3:8]
+        assert b.lease("b", 10, lease_seconds=60) == []
+
+        b.complete("b", {asin: {"asin": asin} for asin in alive[:-1]} | {alive[-1]: None})
+        assert b.counts() == {"queued": 1, "leased": 3, "done": 4, "failed": 0}
+
+        time.sleep(0.25)
+        # a's lease ran out: its ASINs and the failed one go to b
+        again = b.lease("b", 10, lease_seconds=60)
+        assert sorted(again) == sorted(crashed + [alive[-1]])
+        # a comes back late: its failure no longer counts, its result does
+        a.complete("a", {crashed[0]: {"asin": crashed[0]}, crashed[1]: None})
+        b.complete("b", {asin: None for asin in again})
+
+        assert b.counts() == {"queued": 0, "leased": 0, "done": 5, "failed": 3}
+        assert [p["asin"] for p in b.iter_results()] == [crashed[0]] + alive[:-1]
+
+def test_a_failed_enqueue_leaves_the_queue_usable(tmp_path: Path):
+    with SqliteWorkQueue(tmp_path / "queue.sqlite3") as work_queue:
+        with pytest.raises(sqlite3.Error):
+            work_queue.enqueue([ASINS[0], ["not", "an", "asin"]])
+        # The failed batch was rolled back and the connection is out of its transaction
+        assert work_queue.enqueue(ASINS[:3]) == 3
+        assert work_queue.lease("w", 10, lease_seconds=60) == ASINS[:3]
+
+def test_workers_in_separate_processes_drain_the_queue(tmp_path: Path):
+    input_file = tmp_path / "asins.txt"
+    input_file.write_text("\n".join(ASINS), encoding="utf-8")
+    out = tmp_path / "out"
+
+    def page(asin: str) -> str:
+        return f'<html><body><span id="productTitle">Product {asin}</span></body></html>'
+
+    with StubAmazonServer(page_for=page) as server:
+        settings = {
+            "base_url": server.base_url,
+            "concurrency": 2,
+            "max_attempts": 2,
+            "queue_batch_size": 5,
+            "queue_poll_seconds": 0.2,
+        }
+        config = tmp_path / "settings.json"
+        config.write_text(json.dumps(settings), encoding="utf-8")
+        coordinator_settings = dict(DEFAULT_CONFIG, **settings)
+
+        assert coordinate(str(input_file), str(out), ["json"], coordinator_settings, wait=False) == 0
+        # A worker that leased a batch and died
+        with SqliteWorkQueue(out / "queue.sqlite3") as dead:
+            assert len(dead.lease("dead", 5, lease_seconds=1.0)) == 5
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, str(SRC_DIR / "runner.py"), "worker", "--config", str(config),
+                 "--output-dir", str(out), "--worker-id", f"w{i}"],
+                cwd=str(ROOT_DIR),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            for i in range(3)
+        ]
+        for worker in workers:
+            assert worker.wait(timeout=60) == 0
+
+        exported = coordinate(str(input_file), str(out), ["json"], coordinator_settings)
+        # Every ASIN fetched exactly once, including the dead worker's
+        assert server.requests == len(ASINS)
+
+    assert exported == len(ASINS)
+    data = json.loads((out / "amazon_products.json").read_text(encoding="utf-8"))
+    assert sorted(p["asin"] for p in data) == ASINS
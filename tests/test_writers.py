@@ -0,0 +1,112 @@
+from pathlib import Path
+import csv
+import json
+import sys
+from unittest import mock
+
+import pytest
+from openpyxl import load_workbook
+
+# Ensure src is on sys.path so imports work when running tests from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from outputs.exporters import (  # noqa: E402
+    CsvWriter,
+    ExcelWriter,
+    ExportSession,
+    HtmlWriter,
+    JsonWriter,
+    JsonlWriter,
+)
+
+# The brand column first appears on the third product, rating on the last
+PRODUCTS = [
+    {"asin": "A1", "title": "One", "offers": []},
+    {"asin": "A2", "title": "Two, with comma", "offers": [{"price_raw": "$1"}]},
+    {"asin": "A3", "title": "Three", "brand": "Late <b>", "offers": []},
+    {"asin": "A4", "title": None, "offers": [], "stars": 4.5},
+]
+HEADER = ["asin", "title", "offers", "brand", "stars"]
+
+def _write_all(writer_cls, path: Path) -> None:
+    with writer_cls(path) as writer:
+        for product in PRODUCTS:
+            writer.write(product)
+
+def test_json_writer_matches_json_dump(tmp_path: Path):
+    path = tmp_path / "out.json"
+    _write_all(JsonWriter, path)
+    assert path.read_text(encoding="utf-8") == json.dumps(PRODUCTS, indent=2, ensure_ascii=False)
+
+    empty = tmp_path / "empty.json"
+    with JsonWriter(empty):
+        pass
+    assert json.loads(empty.read_text(encoding="utf-8")) == []
+
+def test_jsonl_writer_one_product_per_line(tmp_path: Path):
+    path = tmp_path / "out.jsonl"
+    _write_all(JsonlWriter, path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == PRODUCTS
+
+def test_csv_writer_pads_rows_written_before_late_fields(tmp_path: Path):
+    path = tmp_path / "out.csv"
+    _write_all(CsvWriter, path)
+    with path.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0] == HEADER
+    assert all(len(row) == len(HEADER) for row in rows)
+    assert rows[1] == ["A1", "One", "[]", "", ""]
+    assert rows[2][1] == "Two, with comma"
+    assert rows[3][3] == "Late <b>"
+    assert rows[4] == ["A4", "", "[]", "", "4.5"]
+
+def test_html_writer_pads_rows_and_escapes_values(tmp_path: Path):
+    path = tmp_path / "out.html"
+    _write_all(HtmlWriter, path)
+    content = path.read_text(encoding="utf-8")
+
+    assert "".join(f"        <th>{name}</th>\n" for name in HEADER) in content
+    assert content.count("<td>") == len(PRODUCTS) * len(HEADER)
+    assert "Late &lt;b&gt;" in content
+    assert content.endswith("</html>")
+
+def test_excel_writer_uses_final_header(tmp_path: Path):
+    path = tmp_path / "out.xlsx"
+    _write_all(ExcelWriter, path)
+    ws = load_workbook(path)["Products"]
+    rows = [list(row) for row in ws.iter_rows(values_only=True)]
+
+    assert rows[0] == HEADER
+    assert rows[1] == ["A1", "One", "[]", None, None]
+    # Nested values are stored as JSON text rather than rejected
+    assert json.loads(rows[2][2]) == [{"price_raw": "$1"}]
+    assert rows[4] == ["A4", None, "[]", None, 4.5]
+
+def test_session_closes_every_writer_when_one_fails(tmp_path: Path):
+    session = ExportSession(tmp_path, ["json", "jsonl", "csv"])
+    for product in PRODUCTS:
+        session.write(product)
+    first = session.writers[0]
+    with mock.patch.object(first, "close", side_effect=OSError("disk full")):
+        with pytest.raises(OSError, match="disk full"):
+            session.close()
+
+    lines = (tmp_path / "amazon_products.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["asin"] for line in lines] == [p["asin"] for p in PRODUCTS]
+    with (tmp_path / "amazon_products.csv").open(newline="", encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == len(PRODUCTS) + 1
+    first.close()
+
+def test_excel_writer_closes_its_spool_when_a_row_fails(tmp_path: Path):
+    writer = ExcelWriter(tmp_path / "out.xlsx").open()
+    for product in PRODUCTS:
+        writer.write(product)
+    with mock.patch("openpyxl.worksheet._write_only.WriteOnlyWorksheet.append", side_effect=ValueError("bad cell")):
+        with pytest.raises(ValueError, match="bad cell"):
+            writer.close()
+    assert writer._rows.closed